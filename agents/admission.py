@@ -0,0 +1,318 @@
+"""
+CTAE-Green Admission Control
+Per-white-agent rate and concurrency limits, and a bounded queue of pending scenarios
+
+Three limits protect white agents and the green server from overload:
+
+    token bucket     each white agent URL starts at most `rate` calls per
+                     second on average, in bursts of up to `burst`
+    concurrency cap  at most `concurrency` calls in flight per white agent
+                     URL, shared by every evaluation that targets it
+    pending queue    at most `max_pending` scenarios admitted but not yet
+                     scored across the server; an evaluation that would
+                     overflow it is rejected up front (HTTP 429 with a
+                     Retry-After estimated from the recent drain rate)
+
+Overload is turned away at the door instead of piling up in the queue, so
+admitted work keeps finishing at the rate the white agents sustain rather
+than everything slowing down and timing out together.
+
+Time a call spends waiting on its white agent's limits is reported as
+`throttle_seconds`, which is part of the call's `queue_seconds`. Neither
+counts towards `response_time_seconds`, and a call's time limit starts only
+once it is let through. AsyncAgentLimiter serves the server's dispatcher;
+AgentLimiter is the blocking equivalent used by the launcher.
+"""
+
+import abc
+import asyncio
+import math
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager, asynccontextmanager
+from typing import Dict, Any, Iterator, AsyncIterator, Optional
+
+from metrics import admission_rejected_total, throttle_wait_seconds, throttled_calls
+
+# Calls per second and burst size allowed per white agent URL (None: no rate limit)
+DEFAULT_AGENT_RATE = 10.0
+DEFAULT_AGENT_BURST = 10
+
+# Calls in flight per white agent URL, across all evaluations
+DEFAULT_AGENT_CONCURRENCY = 8
+
+# Scenarios admitted but not yet scored, across the server
+DEFAULT_MAX_PENDING = 256
+
+# Retry-After bounds (seconds); the default applies before anything has drained
+DEFAULT_RETRY_AFTER_SECONDS = 5
+MAX_RETRY_AFTER_SECONDS = 60
+
+# Completions remembered for the drain-rate estimate
+DRAIN_WINDOW = 256
+
+
+class AdmissionRejected(Exception):
+    """The pending queue is full; try again after `retry_after` seconds"""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket
+
+    reserve() takes a token and returns how long to wait before using it.
+    The balance can go negative, so concurrent callers queue up in order
+    instead of polling.
+    """
+
+    def __init__(self, rate: Optional[float], burst: int = 1):
+        if rate is not None and rate <= 0:
+            raise ValueError("rate must be positive (or None for no limit)")
+        if burst < 1:
+            raise ValueError("burst must be at least 1")
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Take one token; returns the seconds to wait before it may be used (0 if available now)"""
+        if self.rate is None:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+
+class _AgentLimits:
+    """A white agent's token bucket and concurrency cap, plus calls waiting on them"""
+
+    __slots__ = ("bucket", "semaphore", "waiting", "in_flight")
+
+    def __init__(self, bucket: TokenBucket, semaphore):
+        self.bucket = bucket
+        self.semaphore = semaphore
+        self.waiting = 0
+        self.in_flight = 0
+
+
+class _AgentLimiterBase(abc.ABC):
+    """Per-URL limits created on first use; subclasses supply the semaphore type and the slot"""
+
+    def __init__(
+        self,
+        rate: Optional[float] = DEFAULT_AGENT_RATE,
+        burst: int = DEFAULT_AGENT_BURST,
+        concurrency: int = DEFAULT_AGENT_CONCURRENCY
+    ):
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        if rate is not None and rate <= 0:
+            raise ValueError("rate must be positive (or None for no limit)")
+        self.rate = rate
+        self.burst = burst
+        self.concurrency = concurrency
+        self._agents: Dict[str, _AgentLimits] = {}
+        self._lock = threading.Lock()
+
+    @abc.abstractmethod
+    def _semaphore(self):
+        """A new concurrency semaphore of `self.concurrency` slots"""
+
+    def _limits_for(self, url: str) -> _AgentLimits:
+        key = url.rstrip("/")
+        limits = self._agents.get(key)
+        if limits is None:
+            with self._lock:
+                limits = self._agents.get(key)
+                if limits is None:
+                    limits = self._agents[key] = _AgentLimits(TokenBucket(self.rate, self.burst), self._semaphore())
+        return limits
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "rate": self.rate,
+            "burst": self.burst,
+            "concurrency": self.concurrency,
+            "agents": {
+                url: {"in_flight": limits.in_flight, "waiting": limits.waiting}
+                for url, limits in list(self._agents.items())
+            }
+        }
+
+
+class AgentLimiter(_AgentLimiterBase):
+    """Blocking per-white-agent limits (safe to share across threads)"""
+
+    def _semaphore(self):
+        return threading.BoundedSemaphore(self.concurrency)
+
+    @contextmanager
+    def slot(self, url: str) -> Iterator[float]:
+        """Hold one call slot for `url`; yields the seconds spent waiting for it"""
+        limits = self._limits_for(url)
+        started = time.monotonic()
+        limits.waiting += 1
+        throttled_calls.inc()
+        try:
+            limits.semaphore.acquire()
+            try:
+                delay = limits.bucket.reserve()
+                if delay:
+                    time.sleep(delay)
+            except BaseException:
+                limits.semaphore.release()
+                raise
+        finally:
+            limits.waiting -= 1
+            throttled_calls.dec()
+        waited = time.monotonic() - started
+        throttle_wait_seconds.observe(waited)
+
+        limits.in_flight += 1
+        try:
+            yield waited
+        finally:
+            limits.in_flight -= 1
+            limits.semaphore.release()
+
+
+class AsyncAgentLimiter(_AgentLimiterBase):
+    """Asyncio per-white-agent limits (use from a single event loop)"""
+
+    def _semaphore(self):
+        return asyncio.Semaphore(self.concurrency)
+
+    @asynccontextmanager
+    async def slot(self, url: str) -> AsyncIterator[float]:
+        """Hold one call slot for `url`; yields the seconds spent waiting for it"""
+        limits = self._limits_for(url)
+        started = time.monotonic()
+        limits.waiting += 1
+        throttled_calls.inc()
+        try:
+            await limits.semaphore.acquire()
+            try:
+                delay = limits.bucket.reserve()
+                if delay:
+                    await asyncio.sleep(delay)
+            except BaseException:
+                limits.semaphore.release()
+                raise
+        finally:
+            limits.waiting -= 1
+            throttled_calls.dec()
+        waited = time.monotonic() - started
+        throttle_wait_seconds.observe(waited)
+
+        limits.in_flight += 1
+        try:
+            yield waited
+        finally:
+            limits.in_flight -= 1
+            limits.semaphore.release()
+
+
+class AdmissionTicket:
+    """Queue slots held by one admitted evaluation; each scored scenario returns one"""
+
+    def __init__(self, queue: "AdmissionQueue", scenarios: int):
+        self._queue = queue
+        self.remaining = scenarios
+
+    def release(self, scenarios: int = 1):
+        scenarios = min(scenarios, self.remaining)
+        if scenarios > 0:
+            self.remaining -= scenarios
+            self._queue._release(scenarios)
+
+    def close(self):
+        """Return every slot still held (the evaluation finished or failed)"""
+        self.release(self.remaining)
+
+
+class AdmissionQueue:
+    """
+    Bounded count of scenarios admitted but not yet scored
+
+    Usage:
+        ticket = queue.admit(len(scenarios))   # raises AdmissionRejected when full
+        try:
+            ...                                # ticket.release() per scored scenario
+        finally:
+            ticket.close()
+    """
+
+    def __init__(self, max_pending: int = DEFAULT_MAX_PENDING):
+        if max_pending < 1:
+            raise ValueError("max_pending must be at least 1")
+        self.max_pending = max_pending
+        self.pending = 0
+        self.admitted = 0
+        self.rejected = 0
+        self._drained: deque = deque(maxlen=DRAIN_WINDOW)
+        self._lock = threading.Lock()
+
+    def admit(self, scenarios: int) -> AdmissionTicket:
+        """
+        Reserve queue slots for an evaluation of `scenarios` scenarios
+
+        Raises:
+            ValueError: The evaluation is larger than the whole queue
+            AdmissionRejected: The queue is too full right now
+        """
+        if scenarios > self.max_pending:
+            raise ValueError(f"{scenarios} scenarios exceed the admission limit of {self.max_pending}")
+        with self._lock:
+            excess = self.pending + scenarios - self.max_pending
+            if excess > 0:
+                self.rejected += 1
+                retry_after = self._retry_after(excess)
+            else:
+                self.pending += scenarios
+                self.admitted += 1
+                retry_after = None
+        if retry_after is not None:
+            admission_rejected_total.inc()
+            raise AdmissionRejected(
+                f"Server busy: {self.pending} scenarios pending (limit {self.max_pending})", retry_after
+            )
+        return AdmissionTicket(self, scenarios)
+
+    def _release(self, scenarios: int):
+        now = time.monotonic()
+        with self._lock:
+            self.pending -= scenarios
+            self._drained.extend([now] * min(scenarios, DRAIN_WINDOW))
+
+    def drain_rate(self) -> Optional[float]:
+        """Scenarios finished per second over the recent window (None until there is one)"""
+        if len(self._drained) < 2:
+            return None
+        span = time.monotonic() - self._drained[0]
+        return (len(self._drained) - 1) / span if span > 0 else None
+
+    def _retry_after(self, excess: int) -> int:
+        rate = self.drain_rate()
+        if rate is None:
+            return DEFAULT_RETRY_AFTER_SECONDS
+        return min(MAX_RETRY_AFTER_SECONDS, max(1, math.ceil(excess / rate)))
+
+    def stats(self) -> Dict[str, Any]:
+        rate = self.drain_rate()
+        return {
+            "pending": self.pending,
+            "max_pending": self.max_pending,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "drain_rate": round(rate, 2) if rate is not None else None
+        }
@@ -0,0 +1,141 @@
+"""
+CTAE-Green Batch Scoring
+Scores many white agent responses at once with the evaluate_response formulas
+"""
+
+from typing import Dict, Any, List, Sequence, Callable
+
+from rubric import CompiledRubric
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; fall back to per-row Python math
+    np = None
+
+# Response time limit used by evaluate_response (seconds)
+TIME_LIMIT = 30
+
+# Column order of CompiledRubric.tally() / the denominators below
+(MATCHED, EXTRACTED, TYPES_FOUND, SEVERITY_CORRECT,
+ ACTIONS_COVERED, RECOMMENDATIONS, WITH_RATIONALE) = range(7)
+(N_FACTS, N_RISK_TYPES, N_RISKS, N_ACTIONS) = range(4)
+
+
+def _pct(numerator, denominator):
+    """(numerator / denominator) * 100 where denominator > 0, else 0"""
+    safe = np.where(denominator > 0, denominator, 1)
+    return np.where(denominator > 0, (numerator / safe) * 100, 0.0)
+
+
+def _compute_numpy(counts: List[tuple], sizes: List[tuple], times: Sequence[float]):
+    """Vectorized metric math over all rows; returns unrounded component arrays"""
+    c = np.asarray(counts, dtype=np.float64).reshape(-1, 7)
+    n = np.asarray(sizes, dtype=np.float64).reshape(-1, 4)
+    t = np.asarray(times, dtype=np.float64)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        precision = _pct(c[:, MATCHED], c[:, EXTRACTED])
+        recall = (c[:, MATCHED] / n[:, N_FACTS]) * 100
+        denom = precision + recall
+        f1 = np.where(denom > 0, 2 * (precision * recall) / np.where(denom > 0, denom, 1), 0.0)
+
+        risk_recall = _pct(c[:, TYPES_FOUND], n[:, N_RISK_TYPES])
+        severity_accuracy = _pct(c[:, SEVERITY_CORRECT], n[:, N_RISKS])
+        reasoning = (risk_recall + severity_accuracy) / 2
+
+        action_coverage = _pct(c[:, ACTIONS_COVERED], n[:, N_ACTIONS])
+        rationale_score = _pct(c[:, WITH_RATIONALE], c[:, RECOMMENDATIONS])
+        coherence = (action_coverage + rationale_score) / 2
+
+        time_raw = 100 - (t / TIME_LIMIT * 100)
+
+    return f1.tolist(), reasoning.tolist(), coherence.tolist(), time_raw.tolist()
+
+
+def _compute_python(counts: List[tuple], sizes: List[tuple], times: Sequence[float]):
+    """Per-row fallback with the same operation order as the NumPy path"""
+    f1s, reasonings, coherences, time_raws = [], [], [], []
+    for c, n, t in zip(counts, sizes, times):
+        precision = (c[MATCHED] / c[EXTRACTED]) * 100 if c[EXTRACTED] else 0
+        recall = (c[MATCHED] / n[N_FACTS]) * 100
+        f1s.append(2 * (precision * recall) / (precision + recall) if (precision + recall) > 0 else 0)
+
+        risk_recall = c[TYPES_FOUND] / n[N_RISK_TYPES] * 100 if n[N_RISK_TYPES] else 0
+        severity_accuracy = (c[SEVERITY_CORRECT] / n[N_RISKS]) * 100 if n[N_RISKS] else 0
+        reasonings.append((risk_recall + severity_accuracy) / 2)
+
+        action_coverage = (c[ACTIONS_COVERED] / n[N_ACTIONS]) * 100 if n[N_ACTIONS] else 0
+        rationale_score = (c[WITH_RATIONALE] / c[RECOMMENDATIONS]) * 100 if c[RECOMMENDATIONS] else 0
+        coherences.append((action_coverage + rationale_score) / 2)
+
+        time_raws.append(100 - (t / TIME_LIMIT * 100))
+    return f1s, reasonings, coherences, time_raws
+
+
+def score_batch(
+    rubric_for: Callable[[str], CompiledRubric],
+    scenario_ids: Sequence[str],
+    responses: Sequence[Dict[str, Any]],
+    response_times: Sequence[float]
+) -> List[Dict[str, Any]]:
+    """
+    Score a batch of responses; each row equals evaluate_response() for the same inputs
+
+    Args:
+        rubric_for: Returns the compiled rubric for a scenario id
+        scenario_ids: Scenario id per response
+        responses: Parsed white agent responses
+        response_times: Response time per response (seconds)
+    """
+    if not (len(scenario_ids) == len(responses) == len(response_times)):
+        raise ValueError("scenario_ids, responses and response_times must have the same length")
+
+    rubrics: Dict[str, CompiledRubric] = {}
+    fact_memos: Dict[str, Dict[str, frozenset]] = {}
+    counts, sizes = [], []
+    for scenario_id, response in zip(scenario_ids, responses):
+        rubric = rubrics.get(scenario_id)
+        if rubric is None:
+            rubric = rubrics[scenario_id] = rubric_for(scenario_id)
+            fact_memos[scenario_id] = {}
+        counts.append(rubric.tally(response, fact_memos[scenario_id]))
+        sizes.append((rubric.n_facts, rubric.n_risk_types, rubric.n_risks, rubric.n_actions))
+
+    if any(n[N_FACTS] == 0 for n in sizes):
+        # evaluate_response divides by the number of critical facts unconditionally
+        raise ZeroDivisionError("division by zero")
+
+    compute = _compute_numpy if np is not None else _compute_python
+    f1s, reasonings, coherences, time_raws = compute(counts, sizes, response_times)
+
+    # Python round() per element: np.round can differ in the last digit
+    extraction = [round(float(f1), 2) if c[MATCHED] else 0 for c, f1 in zip(counts, f1s)]
+    reasoning = [round(float(x), 2) for x in reasonings]
+    coherence = [round(float(x), 2) for x in coherences]
+    # Keep evaluate_response's int 0 for non-positive scores, as max(0, x) does
+    time_score = [round(float(x), 2) if x > 0 else 0 for x in time_raws]
+
+    if np is not None:
+        overall_raw = (
+            np.asarray(extraction, dtype=np.float64) * 0.30 +
+            np.asarray(reasoning, dtype=np.float64) * 0.35 +
+            np.asarray(coherence, dtype=np.float64) * 0.25 +
+            np.asarray(time_score, dtype=np.float64) * 0.10
+        ).tolist()
+    else:
+        overall_raw = [
+            e * 0.30 + r * 0.35 + c * 0.25 + t * 0.10
+            for e, r, c, t in zip(extraction, reasoning, coherence, time_score)
+        ]
+
+    return [
+        {
+            "data_extraction_accuracy": extraction[i],
+            "risk_reasoning_quality": reasoning[i],
+            "recommendation_coherence": coherence[i],
+            "response_time_seconds": round(response_times[i], 2),
+            "response_time_score": time_score[i],
+            "overall_score": round(overall_raw[i], 2)
+        }
+        for i in range(len(counts))
+    ]
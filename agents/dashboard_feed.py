@@ -0,0 +1,282 @@
+"""
+CTAE-Green Dashboard Feed
+Cached dashboard page and a single broadcast loop for live dashboard updates
+
+StaticPage reads the dashboard template once and keeps it in memory along
+with its ETag and a gzip copy compressed ahead of time. A request with a
+matching If-None-Match gets a 304; any other request gets the cached bytes.
+No disk read or compression happens per request.
+
+Evaluations report to DashboardFeed as they run. publish() only appends to a
+pending list. Once per tick a single broadcast loop:
+
+    1. takes the pending events plus a server metrics snapshot (if it changed)
+    2. encodes them into one server-sent-events frame
+    3. appends the frame to a short ring shared by every viewer and wakes them
+
+Each viewer's stream writes the already-encoded frames it has not seen yet.
+Each tick costs the same however many dashboards are open: there are no
+per-viewer queues, and no viewer polls. A viewer that falls more than the
+ring's length behind skips to the oldest frame still held. New viewers start
+from a snapshot of the recent evaluations and the latest metrics.
+
+Each server worker has its own feed, covering the evaluations it runs.
+"""
+
+import asyncio
+import gzip
+import hashlib
+import json
+import time
+from collections import OrderedDict, deque
+from pathlib import Path
+from typing import Dict, Any, AsyncIterator, Callable, Optional, Union
+
+# Seconds between broadcasts (events are batched within a tick)
+BROADCAST_INTERVAL_SECONDS = 0.5
+
+# Encoded frames kept for viewers that are momentarily behind
+FEED_HISTORY_FRAMES = 64
+
+# Events held between ticks; older ones are dropped if evaluations outpace the loop
+MAX_PENDING_EVENTS = 1000
+
+# Evaluations (with their per-scenario scores) shown to a newly connected dashboard
+RECENT_EVALUATIONS = 20
+
+# Seconds between keep-alive comments on an idle stream
+KEEPALIVE_SECONDS = 15
+
+SCORE_FIELDS = (
+    "overall_score", "data_extraction_accuracy", "risk_reasoning_quality",
+    "recommendation_coherence", "response_time_score"
+)
+
+
+def accepts_gzip(accept_encoding: Optional[str]) -> bool:
+    """Whether an Accept-Encoding header allows gzip (q=0 refuses it)"""
+    for part in (accept_encoding or "").split(","):
+        coding, _, params = part.strip().partition(";")
+        if coding.strip().lower() in ("gzip", "*"):
+            quality = params.strip().replace(" ", "")
+            return quality not in ("q=0", "q=0.0", "q=0.00", "q=0.000")
+    return False
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header names `etag` (weak comparison)"""
+    if not if_none_match:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or etag in (tag[2:] if tag.startswith("W/") else tag for tag in tags)
+
+
+def sse_event(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+
+class StaticPage:
+    """An HTML page held in memory, served with an ETag and a pre-compressed gzip body"""
+
+    def __init__(self, path: Union[str, Path], fallback: str = ""):
+        self.path = Path(path)
+        self.fallback = fallback
+        self.body = b""
+        self.gzipped = b""
+        self.etag = ""
+        self._loaded = False
+
+    def load(self):
+        """(Re)read the page from disk"""
+        body = self.path.read_bytes() if self.path.exists() else self.fallback.encode("utf-8")
+        self.body = body
+        self.gzipped = gzip.compress(body, compresslevel=9, mtime=0)
+        self.etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+        self._loaded = True
+
+    def render(self, if_none_match: Optional[str] = None, accept_encoding: Optional[str] = None):
+        """
+        (status, headers, body) for a request with these headers
+
+        Viewers revalidate on each visit (Cache-Control: no-cache); an
+        unchanged page costs a 304 with no body.
+        """
+        if not self._loaded:
+            self.load()
+        headers = {"ETag": self.etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+        if etag_matches(if_none_match, self.etag):
+            return 304, headers, b""
+        if accepts_gzip(accept_encoding):
+            headers["Content-Encoding"] = "gzip"
+            return 200, headers, self.gzipped
+        return 200, headers, self.body
+
+
+class DashboardFeed:
+    """
+    Live evaluation progress and server metrics for every connected dashboard
+
+    Usage:
+        feed = DashboardFeed(snapshot=lambda: {"queue_depth": 0})
+        await feed.start()
+        feed.evaluation_started("job-1", url, scenario_ids)
+        StreamingResponse(feed.subscribe(), media_type="text/event-stream")
+    """
+
+    def __init__(
+        self,
+        snapshot: Callable[[], Dict[str, Any]],
+        interval: float = BROADCAST_INTERVAL_SECONDS,
+        history: int = FEED_HISTORY_FRAMES,
+        keepalive: float = KEEPALIVE_SECONDS
+    ):
+        self.snapshot = snapshot
+        self.interval = interval
+        self.keepalive = keepalive
+        self.viewers = 0
+        self.frames_broadcast = 0
+        self.evaluations_run = 0
+        self._pending: deque = deque(maxlen=MAX_PENDING_EVENTS)
+        self._frames: deque = deque(maxlen=history)
+        self._seq = 0
+        self._metrics: Optional[Dict[str, Any]] = None
+        self._recent: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._welcome: Optional[bytes] = None
+        self._condition: Optional[asyncio.Condition] = None
+        self._task: Optional[asyncio.Task] = None
+
+    # -- Publishing (called from request handlers; never blocks) --
+
+    def publish(self, event: str, data: Dict[str, Any]):
+        self._pending.append((event, data))
+        self._welcome = None
+
+    def evaluation_started(self, evaluation_id: str, white_agent_url: Optional[str], scenario_ids: list):
+        evaluation = {
+            "id": evaluation_id,
+            "white_agent_url": white_agent_url,
+            "status": "running",
+            "completed": 0,
+            "total": len(scenario_ids),
+            "scores": {},
+            "summary": None,
+            "error": None,
+            "started_at": time.time()
+        }
+        self._recent[evaluation_id] = evaluation
+        while len(self._recent) > RECENT_EVALUATIONS:
+            self._recent.popitem(last=False)
+        self.publish("evaluation", _progress(evaluation))
+
+    def scenario_scored(self, evaluation_id: str, result: Dict[str, Any]):
+        scores = {field: result['scores'][field] for field in SCORE_FIELDS}
+        evaluation = self._recent.get(evaluation_id)
+        if evaluation is not None:
+            evaluation['completed'] += 1
+            evaluation['scores'][result['scenario_id']] = scores['overall_score']
+        payload = {"evaluation_id": evaluation_id, "scenario_id": result['scenario_id'], "scores": scores}
+        if evaluation is not None:
+            payload.update(completed=evaluation['completed'], total=evaluation['total'])
+        if "error" in result:
+            payload["error"] = result["error"]
+        self.publish("result", payload)
+
+    def evaluation_finished(self, evaluation_id: str, summary: Optional[Dict[str, Any]] = None, error: Optional[str] = None):
+        self.evaluations_run += 1
+        evaluation = self._recent.get(evaluation_id)
+        if evaluation is None:
+            return
+        evaluation.update(status="failed" if error else "completed", summary=summary, error=error)
+        self.publish("evaluation", _progress(evaluation))
+
+    # -- Broadcast loop --
+
+    async def start(self):
+        """Start the broadcast loop on the running event loop"""
+        self._condition = asyncio.Condition()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.broadcast()
+
+    async def broadcast(self):
+        """Encode everything since the last tick into one frame and wake the viewers"""
+        events = [self._pending.popleft() for _ in range(len(self._pending))]
+        if not self.viewers:
+            # Nobody to send to; new viewers start from the welcome snapshot
+            self._metrics = None
+            return
+
+        parts = [sse_event(event, data) for event, data in events]
+        metrics = self._server_metrics()
+        if metrics != self._metrics:
+            self._metrics = metrics
+            self._welcome = None
+            parts.append(sse_event("metrics", metrics))
+        if not parts:
+            return
+
+        self._seq += 1
+        self._frames.append((self._seq, f"id: {self._seq}\n{''.join(parts)}".encode("utf-8")))
+        self.frames_broadcast += 1
+        async with self._condition:
+            self._condition.notify_all()
+
+    def _server_metrics(self) -> Dict[str, Any]:
+        metrics = dict(self.snapshot())
+        metrics["viewers"] = self.viewers
+        metrics["evaluations_run"] = self.evaluations_run
+        return metrics
+
+    def welcome(self) -> bytes:
+        """Snapshot frame for a newly connected viewer (encoded once per change)"""
+        if self._welcome is None:
+            metrics = self._metrics if self._metrics is not None else self._server_metrics()
+            self._welcome = sse_event("snapshot", {
+                "metrics": metrics,
+                "evaluations": [_progress(evaluation, scores=True) for evaluation in reversed(self._recent.values())]
+            }).encode("utf-8")
+        return self._welcome
+
+    async def subscribe(self) -> AsyncIterator[bytes]:
+        """One viewer's event stream: the welcome snapshot, then every broadcast frame"""
+        self.viewers += 1
+        try:
+            seen = self._seq
+            yield self.welcome()
+            while True:
+                async with self._condition:
+                    try:
+                        await asyncio.wait_for(
+                            self._condition.wait_for(lambda: self._seq > seen),
+                            timeout=self.keepalive
+                        )
+                    except asyncio.TimeoutError:
+                        pass
+                frames = [frame for seq, frame in self._frames if seq > seen]
+                if not frames:
+                    yield b": keep-alive\n\n"
+                    continue
+                seen = self._seq
+                yield b"".join(frames)
+        finally:
+            self.viewers -= 1
+
+
+def _progress(evaluation: Dict[str, Any], scores: bool = False) -> Dict[str, Any]:
+    """Evaluation state for an event (per-scenario scores only in snapshots; results carry them otherwise)"""
+    progress = {key: value for key, value in evaluation.items() if key != "scores"}
+    if scores:
+        progress["scores"] = dict(evaluation['scores'])
+    return progress
@@ -0,0 +1,196 @@
+"""
+CTAE-Green Dispatch Engine
+Sends scenario prompts to a white agent concurrently and scores replies as they arrive
+"""
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, Any, List, Optional, Callable
+
+from green_agent import CTAEGreenAgent, mock_white_agent_response
+from prompt_builder import prompt_stats
+from white_agent_client import AsyncWhiteAgentClient, WhiteAgentReply, WhiteAgentError, CallTiming
+from admission import AsyncAgentLimiter, AdmissionTicket
+from metrics import stage, queue_wait_seconds, dispatch_queue_depth, dispatch_in_flight, prompt_tokens
+
+# Default number of scenarios in flight against one white agent
+DEFAULT_MAX_CONCURRENCY = 8
+
+
+@asynccontextmanager
+async def dispatch_slot(semaphore: asyncio.Semaphore, queued_at: float):
+    """Hold one concurrency slot, recording queue depth, queue wait and in-flight scenarios"""
+    dispatch_queue_depth.inc()
+    try:
+        await semaphore.acquire()
+    finally:
+        dispatch_queue_depth.dec()
+    queue_wait_seconds.observe(time.monotonic() - queued_at)
+
+    dispatch_in_flight.inc()
+    try:
+        yield
+    finally:
+        dispatch_in_flight.dec()
+        semaphore.release()
+
+
+class ScenarioDispatcher:
+    """
+    Dispatches scenarios to one white agent with bounded concurrency
+
+    When `agent_version` is given, replies are cached per (agent id, agent
+    version, prompt) in the green agent's evaluation cache, and a repeated
+    prompt is answered from the cache instead of the white agent.
+    `compact_prompts` overrides the green agent's prompt mode.
+
+    `max_concurrency` bounds this dispatch alone. A shared `limiter` (see
+    admission) also caps the call rate and calls in flight per white agent
+    URL across every dispatch using it.
+    """
+
+    def __init__(
+        self,
+        green_agent: CTAEGreenAgent,
+        white_agent_url: Optional[str] = None,
+        client: Optional[AsyncWhiteAgentClient] = None,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        agent_id: Optional[str] = None,
+        agent_version: Optional[str] = None,
+        compact_prompts: Optional[bool] = None,
+        limiter: Optional[AsyncAgentLimiter] = None
+    ):
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+
+        self.green_agent = green_agent
+        self.white_agent_url = white_agent_url
+        self.client = client
+        self.max_concurrency = max_concurrency
+        self.agent_id = agent_id or white_agent_url
+        self.agent_version = agent_version
+        self.compact_prompts = compact_prompts
+        self.limiter = limiter
+
+    def _response_key(self, prompt: str) -> Optional[str]:
+        """Response cache key, or None when replies from this white agent are not cached"""
+        cache = self.green_agent.cache
+        if cache is None or not self.white_agent_url or not self.agent_version:
+            return None
+        return cache.response_key(self.agent_id, self.agent_version, prompt)
+
+    async def _call_white_agent(self, scenario: Dict[str, Any], prompt: str, queued_at: float) -> WhiteAgentReply:
+        """Send one prompt to the white agent (or the mock if no URL is set)"""
+        if not self.white_agent_url:
+            started = time.monotonic()
+            response = mock_white_agent_response(prompt)
+            return WhiteAgentReply(response, CallTiming.measure(queued_at, 0.0, started, 1))
+
+        if self.limiter is None:
+            return await self.client.call(self.white_agent_url, scenario, prompt, queued_at)
+
+        async with self.limiter.slot(self.white_agent_url) as throttled:
+            try:
+                reply = await self.client.call(self.white_agent_url, scenario, prompt, queued_at)
+            except WhiteAgentError as e:
+                if e.timing is not None:
+                    e.timing.throttle_seconds = throttled
+                raise
+        reply.timing.throttle_seconds = throttled
+        return reply
+
+    async def _run_scenario(self, scenario: Dict[str, Any], semaphore: asyncio.Semaphore) -> Dict[str, Any]:
+        """Prompt, await and score a single scenario"""
+        queued_at = time.monotonic()
+        async with dispatch_slot(semaphore, queued_at):
+            compact = self.green_agent.compact_prompts if self.compact_prompts is None else self.compact_prompts
+            prompt = self.green_agent.create_scenario_prompt(scenario, compact=compact)
+            prompt_size = prompt_stats(prompt)
+            prompt_tokens.labels("compact" if compact else "full").observe(prompt_size['estimated_tokens'])
+            error = None
+            digest = None
+
+            key = self._response_key(prompt)
+            cached = self.green_agent.cache.get_reply(key) if key is not None else None
+            if cached is not None:
+                white_response, timing, digest = cached[0], CallTiming.replayed(cached[1]), cached[2]
+            else:
+                try:
+                    with stage("white_agent_call"):
+                        reply = await self._call_white_agent(scenario, prompt, queued_at)
+                    white_response, timing = reply.response, reply.timing
+                    if key is not None:
+                        digest = self.green_agent.cache.put_reply(key, white_response, timing.server_seconds)
+                except WhiteAgentError as e:
+                    white_response, timing = {}, e.timing
+                    error = str(e)
+
+        # Only the white agent's own time counts towards response_time_score
+        response_time = timing.server_seconds
+        scores = self.green_agent.evaluate_response(
+            scenario['id'],
+            white_response,
+            response_time,
+            response_digest=digest
+        )
+
+        result = {
+            "scenario_id": scenario['id'],
+            "scenario_name": scenario['name'],
+            "difficulty": scenario['difficulty'],
+            "scores": scores,
+            "timing": timing.to_dict(),
+            "prompt": prompt_size
+        }
+        if error:
+            result["error"] = error
+        return result
+
+    async def run(
+        self,
+        scenarios: List[Dict[str, Any]],
+        on_result: Optional[Callable[[Dict[str, Any]], None]] = None,
+        ticket: Optional[AdmissionTicket] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Run all scenarios concurrently
+
+        Args:
+            scenarios: Scenarios to send to the white agent
+            on_result: Optional callback (sync or async) invoked with each result as soon as it is scored
+            ticket: Admission queue slots for these scenarios; one is returned per scored
+                    scenario and the rest when the run ends
+
+        Returns:
+            Results in the same order as `scenarios`
+        """
+        owns_client = self.white_agent_url and self.client is None
+        if owns_client:
+            self.client = AsyncWhiteAgentClient(connections_per_agent=self.max_concurrency)
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        tasks = [
+            asyncio.ensure_future(self._run_scenario(scenario, semaphore))
+            for scenario in scenarios
+        ]
+
+        try:
+            for finished in asyncio.as_completed(tasks):
+                result = await finished
+                if ticket is not None:
+                    ticket.release()
+                if on_result is not None:
+                    pending = on_result(result)
+                    if asyncio.iscoroutine(pending):
+                        await pending
+        finally:
+            for task in tasks:
+                task.cancel()
+            if ticket is not None:
+                ticket.close()
+            if owns_client:
+                await self.client.aclose()
+                self.client = None
+
+        return [task.result() for task in tasks]
@@ -0,0 +1,288 @@
+"""
+CTAE-Green Email Store
+Memory-mapped email corpus with an offset index, decoded lazily
+
+The corpus file (a JSON array of email objects, or JSONL with one email per
+line) is memory-mapped rather than parsed. A one-off scan records each
+email's byte span and `id`. The result is saved as a binary index under
+<data_dir>/.cache and reused while the corpus file's size and mtime are
+unchanged. Scenarios then hold EmailRecord views, which know their id from
+the index and decode the email JSON only when a field other than "id" is
+read (e.g. when a prompt renders it).
+
+The index is memory-mapped too, and lookups read it in place: an id is
+found by binary search over a table of (id hash, position) pairs sorted by
+hash, so resident memory does not grow with the size of the corpus. Decoded
+emails are kept in a small LRU shared by every record of a store.
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import re
+from array import array
+from bisect import bisect_left
+from collections.abc import Mapping
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, List, Iterator, Optional, Tuple, Union
+
+from scenario_repository import freeze, CACHE_DIR
+
+INDEX_FORMAT = 2
+INDEX_SUFFIX = ".idx"
+
+# Decoded emails kept per store (records themselves hold no decoded data)
+DEFAULT_DECODED_EMAILS = 1024
+
+# A JSON string (escapes included) or a bracket; everything else is skipped
+_TOKEN = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*"|[\[\]{}]', re.S)
+
+_OPENERS = (ord("{"), ord("["))
+_QUOTE = ord('"')
+
+
+def _aligned(size: int) -> int:
+    return size + -size % 8
+
+
+def _encode_id(email_id: Any) -> bytes:
+    return json.dumps(email_id).encode()
+
+
+def _id_hash(encoded_id: bytes) -> int:
+    """Stable signed 64-bit hash of a JSON-encoded id"""
+    return int.from_bytes(hashlib.blake2b(encoded_id, digest_size=8).digest(), "little", signed=True)
+
+
+def _array_spans(buffer) -> Iterator[Tuple[int, int]]:
+    """(offset, length) of each top-level element of a JSON array of objects"""
+    depth = 0
+    start = 0
+    for match in _TOKEN.finditer(buffer):
+        ch = buffer[match.start()]
+        if ch == _QUOTE:
+            continue
+        if ch in _OPENERS:
+            depth += 1
+            if depth == 2:
+                start = match.start()
+        else:
+            depth -= 1
+            if depth == 1:
+                yield start, match.end() - start
+
+
+def _line_spans(buffer) -> Iterator[Tuple[int, int]]:
+    """(offset, length) of each non-blank line of a JSONL file"""
+    size = len(buffer)
+    pos = 0
+    while pos < size:
+        end = buffer.find(b"\n", pos)
+        if end < 0:
+            end = size
+        if buffer[pos:end].strip():
+            yield pos, end - pos
+        pos = end + 1
+
+
+class EmailRecord(Mapping):
+    """Read-only email whose JSON is decoded on access to a field other than "id" """
+
+    __slots__ = ("_store", "_position")
+
+    def __init__(self, store: "EmailStore", position: int):
+        self._store = store
+        self._position = position
+
+    @property
+    def email(self) -> Mapping:
+        return self._store.decoded(self._position)
+
+    def __getitem__(self, key: str) -> Any:
+        if key == "id":
+            email_id = self._store.id_at(self._position)
+            if email_id is not None:
+                return email_id
+        return self.email[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.email)
+
+    def __len__(self) -> int:
+        return len(self.email)
+
+    def __repr__(self) -> str:
+        return repr(self.email)
+
+
+class EmailStore:
+    """
+    Memory-mapped, indexed email corpus
+
+    Usage:
+        store = EmailStore(data_dir / "logistics_emails.json")
+        store.select(["email_001", "email_003"])   # tuple of EmailRecord
+        store.select("*")                          # every email, file order
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        cache_dir: Optional[Path] = None,
+        decoded_emails: int = DEFAULT_DECODED_EMAILS
+    ):
+        self.path = Path(path)
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else self.path.parent / CACHE_DIR
+        self.index_path = self.cache_dir / (self.path.name + INDEX_SUFFIX)
+
+        stat = self.path.stat()
+        self._signature = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+        with open(self.path, 'rb') as f:
+            self._buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if stat.st_size else b""
+
+        self._index_buffer = None
+        self.decoded = lru_cache(maxsize=decoded_emails)(self.decode)
+        if not self._open_index():
+            self._build_index()
+
+    # -- Index --
+
+    def _open_index(self) -> bool:
+        """Map a saved index if it matches the corpus file; False if it must be rebuilt"""
+        try:
+            with open(self.index_path, 'rb') as f:
+                header_line = f.readline()
+                header = json.loads(header_line)
+                if (header.get("format") != INDEX_FORMAT
+                        or {k: header.get(k) for k in self._signature} != self._signature):
+                    return False
+                buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return False
+
+        tables_offset = _aligned(len(header_line))
+        if len(buffer) < tables_offset + 48 * header["count"] + header["id_bytes"]:
+            buffer.close()
+            return False
+        self._index_buffer = buffer
+        self._set_tables(memoryview(buffer)[tables_offset:], header["count"])
+        return True
+
+    def _set_tables(self, tables: memoryview, count: int):
+        """
+        Point the lookup tables into `tables`, laid out as int64 arrays:
+
+            spans       (offset, length) of each email in the corpus, file order
+            id_spans    (offset, length) of each email's JSON-encoded id in the id blob
+            hashes      id hashes, sorted
+            positions   email position for each entry of `hashes`
+            id blob     the JSON-encoded ids, concatenated
+        """
+        words = tables[:48 * count].cast("q")
+        self._spans = words[:2 * count]
+        self._id_spans = words[2 * count:4 * count]
+        self._hashes = words[4 * count:5 * count]
+        self._sorted_positions = words[5 * count:6 * count]
+        self._id_blob = tables[48 * count:]
+
+    def _build_index(self):
+        """Scan the corpus once, recording spans and ids, and save the index if possible"""
+        scan = _line_spans if self.path.suffix == ".jsonl" else _array_spans
+        tables = array("q")
+        encoded_ids: List[bytes] = []
+        for offset, length in scan(self._buffer):
+            email = json.loads(self._buffer[offset:offset + length])
+            tables.extend((offset, length))
+            encoded_ids.append(_encode_id(email.get("id") if isinstance(email, dict) else None))
+
+        id_offset = 0
+        for encoded in encoded_ids:
+            tables.extend((id_offset, len(encoded)))
+            id_offset += len(encoded)
+        hashes = [_id_hash(encoded) for encoded in encoded_ids]
+        order = sorted(range(len(hashes)), key=lambda i: (hashes[i], i))
+        tables.extend(hashes[i] for i in order)
+        tables.extend(order)
+        id_blob = b"".join(encoded_ids)
+
+        try:
+            self._save_index(tables, id_blob, len(encoded_ids))
+            if self._open_index():
+                return
+        except OSError:
+            pass  # read-only data directory: keep the index in memory
+        self._set_tables(memoryview(tables.tobytes() + id_blob), len(encoded_ids))
+
+    def _save_index(self, tables: array, id_blob: bytes, count: int):
+        # Layout: JSON header line, padding, the int64 tables, the id blob (see _set_tables)
+        header = {"format": INDEX_FORMAT, **self._signature, "count": count, "id_bytes": len(id_blob)}
+        header_line = json.dumps(header).encode() + b"\n"
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.index_path.with_name(f"{self.index_path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, 'wb') as f:
+            f.write(header_line.ljust(_aligned(len(header_line)), b" "))
+            tables.tofile(f)
+            f.write(id_blob)
+        os.replace(tmp_path, self.index_path)
+
+    def _encoded_id_at(self, position: int) -> bytes:
+        offset = self._id_spans[2 * position]
+        return bytes(self._id_blob[offset:offset + self._id_spans[2 * position + 1]])
+
+    def id_at(self, position: int) -> Any:
+        """Id of the email at `position` (read from the index)"""
+        return json.loads(self._encoded_id_at(position))
+
+    def position(self, email_id: Any) -> int:
+        """Position of an email id (KeyError if unknown; later duplicates win)"""
+        try:
+            encoded = _encode_id(email_id)
+        except (TypeError, ValueError):
+            raise KeyError(email_id)
+        key = _id_hash(encoded)
+        found = None
+        i = bisect_left(self._hashes, key)
+        while i < len(self._hashes) and self._hashes[i] == key:
+            position = self._sorted_positions[i]
+            if self._encoded_id_at(position) == encoded:
+                found = position
+            i += 1
+        if found is None:
+            raise KeyError(email_id)
+        return found
+
+    # -- Records --
+
+    def __len__(self) -> int:
+        return len(self._spans) // 2
+
+    def __iter__(self) -> Iterator[EmailRecord]:
+        return (EmailRecord(self, i) for i in range(len(self)))
+
+    def __contains__(self, email_id) -> bool:
+        try:
+            self.position(email_id)
+        except KeyError:
+            return False
+        return True
+
+    def get(self, email_id: Any) -> EmailRecord:
+        return EmailRecord(self, self.position(email_id))
+
+    def decode(self, position: int) -> Mapping:
+        """Parse and freeze the email at `position`"""
+        offset = self._spans[2 * position]
+        length = self._spans[2 * position + 1]
+        return freeze(json.loads(self._buffer[offset:offset + length]))
+
+    def select(self, email_ids) -> tuple:
+        """Records by id ("*" selects every email in file order)"""
+        if email_ids == "*":
+            return tuple(self)
+        missing = [email_id for email_id in email_ids if email_id not in self]
+        if missing:
+            raise KeyError(f"Unknown record ids referenced by scenario: {missing}")
+        return tuple(self.get(email_id) for email_id in email_ids)
@@ -0,0 +1,364 @@
+"""
+CTAE-Green Evaluation Cache
+Content-addressed caches for white agent responses and their scores
+
+Two levels, each keyed by a hash of everything its value depends on:
+
+    response  (agent id, agent version, prompt hash)              -> white agent reply
+    score     (scenario id, ground-truth version, response hash)  -> content scores
+
+The ground-truth version is a hash of the scenario's resolved ground truth
+(ScenarioCatalog.ground_truth_version) taken with rubric.RUBRIC_VERSION, so
+editing a scenario's answers, or the records its derived facts come from,
+yields new keys. Content scores leave out the response-time component, which
+is recomputed from each call's own timing.
+
+The response hash of raw reply text is cheap to take. A parsed response is
+only hashed when its reply is stored in the response level: canonical JSON
+encoding costs about as much as scoring it, so parsed responses that did not
+come through the response cache are scored directly.
+
+Each level has an in-memory LRU tier and an on-disk tier, both bounded in
+bytes and evicting the least recently used entries first. The disk tier is a
+SQLite file under <data_dir>/.cache, shared by every process evaluating that
+data directory (launcher workers, server workers). When a green agent loads
+a data version other than the one the cache was filled under, both levels
+are cleared; `invalidate()` clears them on demand. Lookups are counted in
+ctae_cache_lookups_total and `stats()`.
+
+Set CTAE_CACHE=0 to disable caching.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Any, Optional, Tuple, Union
+
+from metrics import cache_lookups_total
+from rubric import RUBRIC_VERSION
+from scenario_repository import CACHE_DIR
+from server_state import SQLiteDatabase
+
+CACHE_DB_NAME = "evaluation_cache.sqlite3"
+
+# Byte budgets per level (encoded value sizes)
+DEFAULT_MEMORY_BYTES = 32 << 20
+DEFAULT_DISK_BYTES = 256 << 20
+
+# Disk eviction frees down to this fraction of the budget, so it runs in batches
+DISK_LOW_WATER = 0.9
+
+CACHE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache_entries (
+    level TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    used_at REAL NOT NULL,
+    PRIMARY KEY (level, key)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS cache_entries_lru ON cache_entries (level, used_at);
+
+CREATE TABLE IF NOT EXISTS cache_usage (
+    level TEXT PRIMARY KEY,
+    entries INTEGER NOT NULL,
+    bytes INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS cache_meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+
+CREATE TRIGGER IF NOT EXISTS cache_entries_added AFTER INSERT ON cache_entries
+BEGIN
+    INSERT INTO cache_usage (level, entries, bytes) VALUES (NEW.level, 1, NEW.size)
+    ON CONFLICT (level) DO UPDATE SET entries = entries + 1, bytes = bytes + excluded.bytes;
+END;
+
+CREATE TRIGGER IF NOT EXISTS cache_entries_removed AFTER DELETE ON cache_entries
+BEGIN
+    UPDATE cache_usage SET entries = entries - 1, bytes = bytes - OLD.size WHERE level = OLD.level;
+END;
+"""
+
+
+def _digest(*parts: Union[str, bytes]) -> str:
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode() if isinstance(part, str) else part)
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def _encode(value: Any) -> bytes:
+    return json.dumps(value, separators=(",", ":")).encode()
+
+
+def response_hash(response: Union[Dict[str, Any], str]) -> str:
+    """Hash of a white agent response: raw reply text as-is, parsed responses in canonical JSON"""
+    if isinstance(response, str):
+        return _digest("text", response)
+    return _digest("json", json.dumps(response, sort_keys=True, separators=(",", ":"), default=str))
+
+
+class CacheDatabase(SQLiteDatabase):
+    """On-disk tier of both cache levels"""
+
+    schema = CACHE_SCHEMA
+
+    def get(self, level: str, key: str) -> Optional[bytes]:
+        row = self.execute(
+            "SELECT value FROM cache_entries WHERE level = ? AND key = ?", (level, key)
+        ).fetchone()
+        if row is None:
+            return None
+        self.execute(
+            "UPDATE cache_entries SET used_at = ? WHERE level = ? AND key = ?", (time.time(), level, key)
+        )
+        return row[0]
+
+    def put(self, level: str, key: str, value: bytes, max_bytes: int):
+        """Store an entry, then evict least recently used entries while the level is over `max_bytes`"""
+        with self.transaction() as db:
+            db.execute(
+                "INSERT INTO cache_entries (level, key, value, size, used_at) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (level, key) DO NOTHING",
+                (level, key, value, len(value), time.time())
+            )
+            used = db.execute("SELECT bytes FROM cache_usage WHERE level = ?", (level,)).fetchone()
+            if used is None or used[0] <= max_bytes:
+                return
+            excess = used[0] - int(max_bytes * DISK_LOW_WATER)
+            victims, freed = [], 0
+            for victim, size in db.execute(
+                "SELECT key, size FROM cache_entries WHERE level = ? ORDER BY used_at", (level,)
+            ):
+                victims.append((level, victim))
+                freed += size
+                if freed >= excess:
+                    break
+            db.executemany("DELETE FROM cache_entries WHERE level = ? AND key = ?", victims)
+
+    def usage(self, level: str) -> Dict[str, int]:
+        """Entry count and bytes of a level (kept up to date by triggers)"""
+        row = self.execute("SELECT entries, bytes FROM cache_usage WHERE level = ?", (level,)).fetchone()
+        return {"entries": row[0] if row else 0, "bytes": row[1] if row else 0}
+
+    def clear(self, data_version: Optional[str] = None):
+        """Drop every entry and record the data version the cache is now filled under"""
+        with self.transaction() as db:
+            db.execute("DELETE FROM cache_entries")
+            db.execute("DELETE FROM cache_usage")
+            if data_version is None:
+                db.execute("DELETE FROM cache_meta WHERE key = 'data_version'")
+            else:
+                db.execute(
+                    "INSERT INTO cache_meta (key, value) VALUES ('data_version', ?) "
+                    "ON CONFLICT (key) DO UPDATE SET value = excluded.value",
+                    (data_version,)
+                )
+
+    def data_version(self) -> Optional[str]:
+        row = self.execute("SELECT value FROM cache_meta WHERE key = 'data_version'").fetchone()
+        return row[0] if row else None
+
+
+class TieredCache:
+    """
+    One cache level: an in-memory LRU in front of the shared disk tier
+
+    Values are stored JSON-encoded, so every hit returns a fresh copy that
+    callers may modify.
+    """
+
+    def __init__(
+        self,
+        level: str,
+        disk: Optional[CacheDatabase],
+        memory_bytes: int = DEFAULT_MEMORY_BYTES,
+        disk_bytes: int = DEFAULT_DISK_BYTES
+    ):
+        self.level = level
+        self.disk = disk
+        self.memory_bytes = memory_bytes
+        self.disk_bytes = disk_bytes
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.counts = {"memory_hit": 0, "disk_hit": 0, "miss": 0}
+        self._counters = {result: cache_lookups_total.labels(level, result) for result in self.counts}
+
+    def _count(self, result: str):
+        self.counts[result] += 1
+        self._counters[result].inc()
+
+    def _remember(self, key: str, value: bytes):
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous)
+            if len(value) > self.memory_bytes:
+                return
+            self._entries[key] = value
+            self._size += len(value)
+            while self._size > self.memory_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+    def _disk_failed(self, error: Exception):
+        # Best effort, like the digest cache: a read-only or broken file leaves the memory tier
+        print(f"✗ Evaluation cache disk tier disabled ({self.disk.path}): {error}")
+        self.disk = None
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+        if value is not None:
+            self._count("memory_hit")
+            return json.loads(value)
+
+        if self.disk is not None:
+            try:
+                value = self.disk.get(self.level, key)
+            except (sqlite3.Error, OSError) as e:
+                self._disk_failed(e)
+            if value is not None:
+                self._count("disk_hit")
+                self._remember(key, value)
+                return json.loads(value)
+
+        self._count("miss")
+        return None
+
+    def put(self, key: str, value: Any):
+        encoded = _encode(value)
+        self._remember(key, encoded)
+        if self.disk is not None:
+            try:
+                self.disk.put(self.level, key, encoded, self.disk_bytes)
+            except (sqlite3.Error, OSError) as e:
+                self._disk_failed(e)
+
+    def clear_memory(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = sum(self.counts.values())
+        hits = lookups - self.counts["miss"]
+        stats = {
+            **self.counts,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "memory": {"entries": len(self._entries), "bytes": self._size, "max_bytes": self.memory_bytes}
+        }
+        if self.disk is not None:
+            try:
+                stats["disk"] = {**self.disk.usage(self.level), "max_bytes": self.disk_bytes}
+            except sqlite3.Error:
+                pass
+        return stats
+
+
+class EvaluationCache:
+    """
+    Response and score caches for one data directory
+
+    Usage:
+        cache = evaluation_cache(data_dir)
+        cache.validate(data_version)
+        key = cache.score_key(scenario_id, ground_truth_version, response_hash(response))
+        scores = cache.scores.get(key)
+    """
+
+    def __init__(
+        self,
+        path: Optional[Union[str, Path]] = None,
+        memory_bytes: int = DEFAULT_MEMORY_BYTES,
+        disk_bytes: int = DEFAULT_DISK_BYTES
+    ):
+        disk = CacheDatabase(path) if path is not None else None
+        self.responses = TieredCache("response", disk, memory_bytes, disk_bytes)
+        self.scores = TieredCache("score", disk, memory_bytes, disk_bytes)
+        self.data_version: Optional[str] = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def response_key(agent_id: str, agent_version: str, prompt: str) -> str:
+        return _digest(agent_id, agent_version, _digest(prompt))
+
+    @staticmethod
+    def score_key(scenario_id: str, ground_truth_version: str, response_digest: str) -> str:
+        return _digest(scenario_id, ground_truth_version, RUBRIC_VERSION, response_digest)
+
+    def get_reply(self, key: str) -> Optional[Tuple[Any, float, str]]:
+        """Cached (response, server seconds, response hash) for a response key, or None"""
+        cached = self.responses.get(key)
+        if cached is None:
+            return None
+        return cached["response"], cached["server_seconds"], cached["response_hash"]
+
+    def put_reply(self, key: str, response: Any, server_seconds: float) -> str:
+        """Cache a white agent reply; returns its response hash (for score_key)"""
+        digest = response_hash(response)
+        self.responses.put(key, {"response": response, "server_seconds": server_seconds, "response_hash": digest})
+        return digest
+
+    def validate(self, data_version: str):
+        """Clear both levels if they were filled under another data version (ground truth or data files changed)"""
+        if data_version == self.data_version:
+            return
+        with self._lock:
+            if data_version == self.data_version:
+                return
+            disk = self.responses.disk
+            try:
+                if disk is not None and disk.data_version() != data_version:
+                    disk.clear(data_version)
+            except (sqlite3.Error, OSError) as e:
+                self.responses._disk_failed(e)
+                self.scores.disk = None
+            if self.data_version is not None:
+                self.responses.clear_memory()
+                self.scores.clear_memory()
+            self.data_version = data_version
+
+    def invalidate(self):
+        """Drop every cached response and score, in memory and on disk"""
+        with self._lock:
+            self.responses.clear_memory()
+            self.scores.clear_memory()
+            if self.responses.disk is not None:
+                self.responses.disk.clear(self.data_version)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"response": self.responses.stats(), "score": self.scores.stats()}
+
+
+_caches: Dict[Path, EvaluationCache] = {}
+_caches_lock = threading.Lock()
+
+
+def caching_enabled() -> bool:
+    return os.environ.get("CTAE_CACHE", "1").lower() not in ("0", "false", "no", "off")
+
+
+def evaluation_cache(data_dir: Union[str, Path]) -> Optional[EvaluationCache]:
+    """The process-wide cache for a data directory (None when CTAE_CACHE=0)"""
+    if not caching_enabled():
+        return None
+    key = Path(data_dir).resolve()
+    with _caches_lock:
+        cache = _caches.get(key)
+        if cache is None:
+            cache = EvaluationCache(key / CACHE_DIR / CACHE_DB_NAME)
+            _caches[key] = cache
+        return cache
@@ -0,0 +1,74 @@
+"""
+CTAE-Green Fact Matcher
+Aho-Corasick multi-pattern substring matcher for rubric facts and actions
+"""
+
+from collections import deque
+from typing import Dict, List, Sequence, FrozenSet
+
+
+class AhoCorasickMatcher:
+    """
+    Finds which of a fixed set of patterns occur in a text, in one linear pass
+
+    Matching is plain substring containment (same as `pattern in text`),
+    case-sensitive; callers lowercase both sides. An empty pattern matches
+    every text, including the empty string.
+    """
+
+    def __init__(self, patterns: Sequence[str]):
+        self.patterns = tuple(patterns)
+        self._always: FrozenSet[int] = frozenset(i for i, p in enumerate(self.patterns) if p == "")
+
+        goto: List[Dict[str, int]] = [{}]
+        outputs: List[set] = [set()]
+        for index, pattern in enumerate(self.patterns):
+            if not pattern:
+                continue
+            state = 0
+            for ch in pattern:
+                next_state = goto[state].get(ch)
+                if next_state is None:
+                    next_state = len(goto)
+                    goto[state][ch] = next_state
+                    goto.append({})
+                    outputs.append(set())
+                state = next_state
+            outputs[state].add(index)
+
+        # Breadth-first failure links; each state's output absorbs its fail chain
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, child in goto[state].items():
+                queue.append(child)
+                link = fail[state]
+                while link and ch not in goto[link]:
+                    link = fail[link]
+                fail[child] = goto[link].get(ch, 0)
+                outputs[child] |= outputs[fail[child]]
+
+        self._goto = goto
+        self._fail = fail
+        self._outputs = [frozenset(out) for out in outputs]
+        self._searchable = len(self.patterns) - len(self._always)
+
+    def find(self, text: str) -> FrozenSet[int]:
+        """Indices of all patterns that occur in `text`"""
+        goto, fail, outputs = self._goto, self._fail, self._outputs
+        hits = set(self._always)
+        remaining = self._searchable
+        state = 0
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            out = outputs[state]
+            if out:
+                before = len(hits)
+                hits |= out
+                remaining -= len(hits) - before
+                if remaining <= 0:
+                    break
+        return frozenset(hits)
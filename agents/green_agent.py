@@ -3,15 +3,30 @@ CTAE-Green Agent Implementation
 Orchestrates and evaluates commodity trade agent performance
 """
 
-import json
 import time
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional, Union
 from pathlib import Path
 
+from scenario_repository import repository
+from scenario_catalog import CatalogIndex, ScenarioCatalog, SOURCE_FILES
+from scenario_snapshot import open_snapshot, default_snapshot_path
+from prompt_builder import prompt_builder
+from prompt_relevance import RelevanceFilter
+from report_writer import iter_text_report
+from response_parser import parse_response
+from metrics import stage
+from evaluation_cache import evaluation_cache, response_hash
+
 class CTAEGreenAgent:
     """Green Agent for Commodity Trade Agent Evaluation"""
     
-    def __init__(self, data_dir: str = None):
+    def __init__(
+        self,
+        data_dir: str = None,
+        use_cache: bool = True,
+        compact_prompts: bool = False,
+        snapshot: Union[str, bool, None] = None
+    ):
         # Auto-detect data directory
         if data_dir is None:
             # Try parent directory first (if running from agents/)
@@ -24,252 +39,150 @@ class CTAEGreenAgent:
                 raise FileNotFoundError("Cannot find data directory. Please run from ctae-green/ or ctae-green/agents/")
         
         self.data_dir = Path(data_dir)
+        
+        # Parsed once per process and shared read-only; rebuilt only when the shared files or
+        # the index change (each scenario file is re-checked on its next use). A snapshot
+        # (see scenario_snapshot) is mapped instead while it matches the data.
+        with stage("data_load"):
+            self.catalog: CatalogIndex = None
+            if snapshot:
+                path = default_snapshot_path(self.data_dir) if snapshot is True else Path(snapshot)
+                self.catalog = open_snapshot(path, self.data_dir)
+            if self.catalog is None:
+                self.catalog = repository.get(self.data_dir, SOURCE_FILES, ScenarioCatalog)
+            self.catalog.recheck_files()
         self.scenarios = self.load_scenarios()
         self.ground_truth = self.load_ground_truth()
         
-    def load_scenarios(self) -> List[Dict[str, Any]]:
-        """Load evaluation scenarios from data files"""
-        scenarios = []
-        
-        # Load emails
-        emails_path = self.data_dir / "logistics_emails.json"
-        with open(emails_path, 'r') as f:
-            emails = json.load(f)
-        
-        # Load shipments
-        shipments_path = self.data_dir / "shipment_manifest.csv"
-        with open(shipments_path, 'r') as f:
-            shipments = f.read()
-        
-        # Load risk alerts
-        risks_path = self.data_dir / "risk_alerts.json"
-        with open(risks_path, 'r') as f:
-            risks = json.load(f)
-        
-        # Create scenario 1: Port Delay Crisis
-        scenarios.append({
-            "id": "scenario_01",
-            "name": "Shanghai Port Delay - Oil Shipment Crisis",
-            "difficulty": "medium",
-            "description": "Analyze delayed oil shipment and assess impact",
-            "data": {
-                "emails": [emails[0], emails[2]],  # Port delay + price update
-                "shipments": shipments,
-                "risk_alerts": [risks[1]]  # Shanghai congestion
-            },
-            "task": "Analyze the Shanghai port delay for shipment SHP-2025-1042. Extract key details, assess financial and operational risks, and provide actionable recommendations.",
-            "time_limit": 30
-        })
-        
-        # Create scenario 2: Hurricane Warning
-        scenarios.append({
-            "id": "scenario_02",
-            "name": "Hurricane Risk - Gulf Operations",
-            "difficulty": "hard",
-            "description": "Evaluate hurricane threat to Gulf shipping operations",
-            "data": {
-                "emails": [emails[1]],  # Hurricane alert
-                "shipments": shipments,
-                "risk_alerts": [risks[0]]  # Hurricane risk
-            },
-            "task": "A Category 3 hurricane is approaching the Gulf of Mexico. Identify which shipments are at risk, assess severity, and recommend mitigation actions.",
-            "time_limit": 30
-        })
-        
-        # Create scenario 3: Multi-risk Integration
-        scenarios.append({
-            "id": "scenario_03",
-            "name": "Multi-Risk Assessment - Global View",
-            "difficulty": "hard",
-            "description": "Synthesize multiple risk factors across global operations",
-            "data": {
-                "emails": emails,
-                "shipments": shipments,
-                "risk_alerts": risks
-            },
-            "task": "Provide a comprehensive risk assessment across all active shipments. Prioritize the top 3 risks and recommend resource allocation for the operations team.",
-            "time_limit": 45
-        })
+        # Compact prompts keep only the emails, alerts and shipments relevant to each task
+        self.compact_prompts = compact_prompts
+        self.relevance = RelevanceFilter(self.catalog)
+        
+        # Response and score cache for this data directory, cleared if the data changed
+        self.cache = evaluation_cache(self.data_dir) if use_cache else None
+        if self.cache is not None:
+            self.cache.validate(self.data_version)
+    
+    @property
+    def data_version(self) -> str:
+        """Catalog version (moves on if a scenario file turns out to be edited after indexing)"""
+        return self.catalog.version
+    
+    def get_scenario(self, scenario_id: str) -> Dict[str, Any]:
+        """Look up a scenario by id"""
+        return self.catalog.get(scenario_id)
+    
+    def list_scenarios(self, difficulty: str = None, category: str = None) -> List[Dict[str, Any]]:
+        """List scenario index entries without loading scenario bodies"""
+        return self.catalog.list(difficulty=difficulty, category=category)
         
-        return scenarios
+    def load_scenarios(self) -> CatalogIndex:
+        """Load evaluation scenarios from the scenario catalog (bodies resolve lazily)"""
+        return self.catalog
     
     def load_ground_truth(self) -> Dict[str, Any]:
-        """Load ground truth for evaluation"""
-        return {
-            "scenario_01": {
-                "critical_facts": [
-                    "SHP-2025-1042",
-                    "50,000 barrels",
-                    "crude oil",
-                    "delayed 5 days",
-                    "Shanghai Port",
-                    "$3,925,000 value"
-                ],
-                "risks": [
-                    {"type": "delay", "severity": "high", "shipment": "SHP-2025-1042"},
-                    {"type": "financial", "severity": "medium", "impact": "storage costs"}
-                ],
-                "optimal_actions": [
-                    "reroute",
-                    "alternative port",
-                    "customer notification"
-                ]
-            },
-            "scenario_02": {
-                "critical_facts": [
-                    "Category 3 hurricane",
-                    "Gulf of Mexico",
-                    "Oct 24 landfall",
-                    "Houston to Miami lane affected"
-                ],
-                "risks": [
-                    {"type": "weather", "severity": "critical", "region": "Gulf Coast"},
-                    {"type": "operational", "severity": "high", "impact": "delays"}
-                ],
-                "optimal_actions": [
-                    "delay departures",
-                    "reroute via Atlantic",
-                    "secure vessels"
-                ]
-            },
-            "scenario_03": {
-                "critical_facts": [
-                    "Multiple concurrent risks",
-                    "Shanghai delay",
-                    "Hurricane threat",
-                    "Suez concerns",
-                    "Total exposure > $50M"
-                ],
-                "risks": [
-                    {"type": "weather", "severity": "critical"},
-                    {"type": "port_congestion", "severity": "high"},
-                    {"type": "geopolitical", "severity": "medium"}
-                ],
-                "optimal_actions": [
-                    "prioritize hurricane response",
-                    "establish contingency routes",
-                    "enhance monitoring"
-                ]
-            }
-        }
+        """Load ground truth for evaluation from the scenario catalog"""
+        return self.catalog.ground_truth
     
-    def create_scenario_prompt(self, scenario: Dict[str, Any]) -> str:
-        """Format scenario data into a prompt for the white agent"""
-        prompt = f"""# Commodity Trade Analysis Task
-
-**Scenario**: {scenario['name']}
-**Description**: {scenario['description']}
-**Time Limit**: {scenario['time_limit']} seconds
-
-## Task
-{scenario['task']}
-
-## Available Data
-
-### Logistics Emails
-"""
-        for email in scenario['data']['emails']:
-            prompt += f"\n---\n**From**: {email['from']}\n**Subject**: {email['subject']}\n**Timestamp**: {email['timestamp']}\n\n{email['body']}\n"
-        
-        prompt += "\n\n### Shipment Manifest\n```csv\n"
-        prompt += scenario['data']['shipments']
-        prompt += "\n```\n"
-        
-        prompt += "\n\n### Risk Alerts\n"
-        for risk in scenario['data']['risk_alerts']:
-            prompt += f"\n**[{risk['severity']}]** {risk['title']}\n"
-            prompt += f"- Category: {risk['category']}\n"
-            prompt += f"- {risk['description']}\n"
-            prompt += f"- Recommended Action: {risk['recommended_action']}\n"
-        
-        prompt += "\n\n## Required Output Format\n"
-        prompt += """
-Please provide your analysis in the following JSON format:
-```json
-{
-  "extracted_data": {
-    "shipment_ids": ["list of affected shipment IDs"],
-    "commodities": ["list of commodities"],
-    "key_facts": ["list of critical facts extracted"]
-  },
-  "risk_assessment": [
-    {
-      "risk_type": "type of risk",
-      "severity": "low/medium/high/critical",
-      "affected_assets": ["shipments or regions affected"],
-      "description": "brief explanation"
-    }
-  ],
-  "recommendations": [
-    {
-      "priority": "high/medium/low",
-      "action": "specific action to take",
-      "rationale": "why this action is recommended"
-    }
-  ],
-  "reasoning": "Your step-by-step analysis process"
-}
-```
-"""
-        return prompt
+    def create_scenario_prompt(self, scenario: Dict[str, Any], compact: Optional[bool] = None) -> str:
+        """Format scenario data into a prompt for the white agent (compact defaults to self.compact_prompts)"""
+        if compact is None:
+            compact = self.compact_prompts
+        with stage("prompt_build"):
+            prompt = self.catalog.rendered_prompt(scenario['id'], compact)
+            if prompt is not None:
+                return prompt
+            return prompt_builder.build(scenario, self.data_version, compact=self.relevance.compact if compact else None)
+    
+    def evaluate_response(
+        self,
+        scenario_id: str,
+        response: Union[Dict[str, Any], str],
+        response_time: float,
+        response_digest: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Evaluate white agent response (parsed, or raw reply text) against ground truth
+        
+        Content scores are cached by (scenario, ground-truth version, response
+        hash) for raw reply text, and for parsed responses whose hash is known
+        (`response_digest`, from the response cache). A hit skips parsing and
+        matching; only the response-time part is computed.
+        """
+        key = None
+        if self.cache is not None and (response_digest is not None or isinstance(response, str)):
+            if response_digest is None:
+                response_digest = response_hash(response)
+            key = self.cache.score_key(scenario_id, self.catalog.ground_truth_version(scenario_id), response_digest)
+            content_scores = self.cache.scores.get(key)
+            if content_scores is not None:
+                return self._add_time_scores(content_scores, response_time)
+        
+        if not isinstance(response, dict):
+            with stage("parse"):
+                response = parse_response(response)
+        with stage("scoring"):
+            content_scores = self._score_content(scenario_id, response)
+        if key is not None:
+            self.cache.scores.put(key, content_scores)
+        return self._add_time_scores(content_scores, response_time)
     
-    def evaluate_response(self, scenario_id: str, response: Dict[str, Any], response_time: float) -> Dict[str, Any]:
-        """Evaluate white agent response against ground truth"""
+    def _score_response(self, scenario_id: str, response: Dict[str, Any], response_time: float) -> Dict[str, Any]:
+        """Score a parsed white agent response against ground truth"""
+        return self._add_time_scores(self._score_content(scenario_id, response), response_time)
+    
+    def _score_content(self, scenario_id: str, response: Dict[str, Any]) -> Dict[str, Any]:
+        """Extraction, reasoning and recommendation scores (everything but response time)"""
         ground_truth = self.ground_truth[scenario_id]
         scores = {}
         
+        # One pass over the response texts matches every rubric section
+        match = self.catalog.get_rubric(scenario_id).match(response)
+        
         # 1. Data Extraction Accuracy (0-100)
-        extracted_facts = response.get("extracted_data", {}).get("key_facts", [])
         critical_facts = ground_truth["critical_facts"]
         
-        # Calculate precision and recall
-        extracted_lower = [f.lower() for f in extracted_facts]
-        matched = sum(1 for fact in critical_facts if any(fact.lower() in ext for ext in extracted_lower))
+        # Calculate precision and recall (over the key facts the rubric could read)
+        matched = len(match.facts)
         
-        precision = (matched / len(extracted_facts)) * 100 if extracted_facts else 0
+        precision = (matched / match.n_extracted) * 100 if match.n_extracted else 0
         recall = (matched / len(critical_facts)) * 100
         f1 = 2 * (precision * recall) / (precision + recall) if (precision + recall) > 0 else 0
         
         scores["data_extraction_accuracy"] = round(f1, 2)
         
         # 2. Risk Reasoning Quality (0-100)
-        risk_assessment = response.get("risk_assessment", [])
         gt_risks = ground_truth["risks"]
         
         # Check if critical risks identified
-        risk_types_found = {r.get("risk_type", "") for r in risk_assessment}
         risk_types_expected = {r["type"] for r in gt_risks}
         
-        risk_recall = len(risk_types_found & risk_types_expected) / len(risk_types_expected) * 100 if risk_types_expected else 0
+        risk_recall = len(match.risk_types) / len(risk_types_expected) * 100 if risk_types_expected else 0
         
         # Check severity assessment accuracy
-        severity_correct = sum(
-            1 for r in risk_assessment 
-            if any(
-                r.get("risk_type") == gt["type"] and r.get("severity") == gt["severity"]
-                for gt in gt_risks
-            )
-        )
-        severity_accuracy = (severity_correct / len(gt_risks)) * 100 if gt_risks else 0
+        severity_accuracy = (match.severity_correct / len(gt_risks)) * 100 if gt_risks else 0
         
         scores["risk_reasoning_quality"] = round((risk_recall + severity_accuracy) / 2, 2)
         
         # 3. Recommendation Coherence (0-100)
-        recommendations = response.get("recommendations", [])
         optimal_actions = ground_truth["optimal_actions"]
         
         # Check if recommendations align with optimal actions
-        rec_texts = " ".join([r.get("action", "").lower() for r in recommendations])
-        actions_covered = sum(1 for action in optimal_actions if action.lower() in rec_texts)
+        actions_covered = len(match.actions)
         
         action_coverage = (actions_covered / len(optimal_actions)) * 100 if optimal_actions else 0
         
         # Check if recommendations have clear rationale
-        has_rationale = sum(1 for r in recommendations if r.get("rationale", "").strip())
-        rationale_score = (has_rationale / len(recommendations)) * 100 if recommendations else 0
+        rationale_score = (match.with_rationale / match.n_recommendations) * 100 if match.n_recommendations else 0
         
         scores["recommendation_coherence"] = round((action_coverage + rationale_score) / 2, 2)
         
+        return scores
+    
+    def _add_time_scores(self, content_scores: Dict[str, Any], response_time: float) -> Dict[str, Any]:
+        """Complete content scores with the response-time score and the weighted overall score"""
+        scores = dict(content_scores)
+        
         # 4. Response Time (normalized, lower is better)
         time_limit = 30  # Default
         time_score = max(0, 100 - (response_time / time_limit * 100))
@@ -287,56 +200,24 @@ Please provide your analysis in the following JSON format:
         
         return scores
     
+    def evaluate_batch(self, scenario_ids: List[str], responses: List[Union[Dict[str, Any], str]], response_times: List[float]) -> List[Dict[str, Any]]:
+        """
+        Evaluate many white agent responses at once
+        
+        Each returned scores dict is identical to evaluate_response() for the
+        same (scenario_id, response, response_time).
+        """
+        # Imported here: NumPy is only needed for batches, not at startup
+        from batch_scoring import score_batch
+        with stage("parse"):
+            responses = [parse_response(response) for response in responses]
+        with stage("scoring"):
+            return score_batch(self.catalog.get_rubric, scenario_ids, responses, response_times)
+    
     def generate_evaluation_report(self, results: List[Dict[str, Any]]) -> str:
         """Generate human-readable evaluation report"""
-        report = "=" * 60 + "\n"
-        report += "CTAE-GREEN EVALUATION REPORT\n"
-        report += "Commodity Trade Agent Evaluation\n"
-        report += "=" * 60 + "\n\n"
-        
-        for i, result in enumerate(results, 1):
-            report += f"\n{'=' * 60}\n"
-            report += f"SCENARIO {i}: {result['scenario_name']}\n"
-            report += f"{'=' * 60}\n"
-            report += f"Difficulty: {result['difficulty']}\n"
-            report += f"Agent Response Time: {result['scores']['response_time_seconds']}s\n\n"
-            
-            report += "SCORES:\n"
-            report += f"  Data Extraction Accuracy:    {result['scores']['data_extraction_accuracy']}/100\n"
-            report += f"  Risk Reasoning Quality:      {result['scores']['risk_reasoning_quality']}/100\n"
-            report += f"  Recommendation Coherence:    {result['scores']['recommendation_coherence']}/100\n"
-            report += f"  Response Time Score:         {result['scores']['response_time_score']}/100\n"
-            report += f"  -------------------------------\n"
-            report += f"  OVERALL SCORE:               {result['scores']['overall_score']}/100\n"
-            
-            # Performance tier
-            overall = result['scores']['overall_score']
-            if overall >= 80:
-                tier = "EXCELLENT"
-            elif overall >= 60:
-                tier = "GOOD"
-            elif overall >= 40:
-                tier = "FAIR"
-            else:
-                tier = "NEEDS IMPROVEMENT"
-            
-            report += f"\n  Performance Tier: {tier}\n"
-        
-        # Summary
-        avg_overall = sum(r['scores']['overall_score'] for r in results) / len(results)
-        avg_extraction = sum(r['scores']['data_extraction_accuracy'] for r in results) / len(results)
-        avg_reasoning = sum(r['scores']['risk_reasoning_quality'] for r in results) / len(results)
-        avg_recommendations = sum(r['scores']['recommendation_coherence'] for r in results) / len(results)
-        
-        report += f"\n\n{'=' * 60}\n"
-        report += "AGGREGATE PERFORMANCE\n"
-        report += f"{'=' * 60}\n"
-        report += f"Average Overall Score:          {avg_overall:.2f}/100\n"
-        report += f"Average Data Extraction:        {avg_extraction:.2f}/100\n"
-        report += f"Average Risk Reasoning:         {avg_reasoning:.2f}/100\n"
-        report += f"Average Recommendation Quality: {avg_recommendations:.2f}/100\n"
-        
-        return report
+        with stage("report"):
+            return "".join(iter_text_report(results))
 
 # Mock white agent response function for demo purposes
 def mock_white_agent_response(scenario_prompt: str, agent_quality: str = "strong") -> Dict[str, Any]:
@@ -525,13 +406,13 @@ def run_demo():
     print("GENERATING EVALUATION REPORT")
     print("=" * 60)
     
-    report = green_agent.generate_evaluation_report(all_results)
-    print(report)
-    
-    # Save report
+    # Stream each section to the console and the report file as it is produced
     report_path = Path("./ctae_evaluation_report.txt")
     with open(report_path, 'w') as f:
-        f.write(report)
+        for section in iter_text_report(all_results):
+            print(section, end="")
+            f.write(section)
+    print()
     print(f"\n✓ Report saved to {report_path}")
 
 
@@ -1,21 +1,145 @@
 """
 CTAE-Green Agent A2A Server
 Minimal HTTP server for AgentBeats integration
+
+Runs as one process by default. With --workers N (or WEB_CONCURRENCY) the
+data is loaded once and N workers are forked from the loaded parent (see
+prefork). Jobs, their results and the reset generation then live in a SQLite
+file shared by the workers (see server_state).
+
+Evaluations pass admission control (see admission): calls to each white
+agent URL are rate limited and capped in number, and an evaluation that
+would overflow the pending-scenario queue is answered with 429 and
+Retry-After. With several workers, each applies these limits on its own.
+
+With --snapshot the catalog is memory-mapped from a prebuilt snapshot (see
+scenario_snapshot) instead of parsed from the data directory. Each worker
+prints a startup report (imports, data load, app startup) that /health
+also returns.
 """
 
-from fastapi import FastAPI, HTTPException
-from fastapi.responses import HTMLResponse
+import time
+
+# Taken before the imports below, so the startup report includes them
+boot_started = time.perf_counter()
+
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import HTMLResponse, StreamingResponse, Response
 from pydantic import BaseModel
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
+import asyncio
+import json
+import os
+import sqlite3
+import uuid
 import uvicorn
-from green_agent import CTAEGreenAgent, mock_white_agent_response
-import time
+from green_agent import CTAEGreenAgent
+from scenario_snapshot import SnapshotCatalog
+from dispatch import ScenarioDispatcher, DEFAULT_MAX_CONCURRENCY
+from white_agent_client import AsyncWhiteAgentClient
+from admission import (
+    AsyncAgentLimiter, AdmissionQueue, AdmissionRejected, AdmissionTicket,
+    DEFAULT_AGENT_RATE, DEFAULT_AGENT_BURST, DEFAULT_AGENT_CONCURRENCY, DEFAULT_MAX_PENDING
+)
+from job_store import JobStore, SQLiteJobStore, JobStoreFullError, EvaluationJob
+from server_state import AgentSlot, AgentSnapshot, SharedState
+from results_store import ResultsStore
+from rubric import RUBRIC_VERSION
+from scenario_repository import CACHE_DIR
+from dashboard_feed import StaticPage, DashboardFeed
+from report_writer import ReportAccumulator, performance_tier, iter_report, REPORT_FORMATS, MEDIA_TYPES
+from metrics import (
+    metrics, stage, tasks_total, errors_total, dispatch_queue_depth, dispatch_in_flight,
+    RequestMetricsMiddleware, CONTENT_TYPE as METRICS_CONTENT_TYPE
+)
 from pathlib import Path
 
 app = FastAPI(title="CTAE-Green Agent", version="1.0.0")
+app.add_middleware(RequestMetricsMiddleware)
+
+# Seconds spent on startup phases, reported once serving starts (see startup_event)
+startup_report: Dict[str, Any] = {"imports_seconds": round(time.perf_counter() - boot_started, 3)}
+
+# Data directory (None: auto-detect ../data or ./data) and a prebuilt scenario snapshot to map
+# instead of parsing it (a path, True for <data_dir>/.cache/scenario_snapshot.bin, or None)
+data_dir: Optional[str] = None
+snapshot_path = None
+
+# Current green agent and its reset generation; requests take one snapshot and keep it
+agent_slot = AgentSlot()
+
+# SQLite state shared with the other workers (None when running as a single process)
+shared_state: Optional[SharedState] = None
+
+# Serializes resets (and reloads after another worker's reset) within this process
+reset_lock = asyncio.Lock()
+
+# Keep-alive connection pools (one per white agent URL) shared by all dispatches
+white_agent_client: Optional[AsyncWhiteAgentClient] = None
+
+# Background evaluation jobs (an SQLiteJobStore when state is shared)
+job_store = JobStore()
+
+# Per-white-agent rate limit and concurrency cap, shared by every evaluation in this process
+agent_limiter = AsyncAgentLimiter()
+
+# Scenarios admitted but not yet scored; evaluations beyond the limit get a 429
+admission = AdmissionQueue()
+
+# File name of the shared state database under <data_dir>/.cache
+STATE_DB_NAME = "server_state.sqlite3"
+
+# Every evaluation's scores are persisted here (path from $CTAE_RESULTS_DB; opened on first use)
+results_store: Optional[ResultsStore] = ResultsStore()
+
+# Agent id recorded for evaluations of the built-in mock white agent
+MOCK_AGENT_ID = "mock"
+
+# Seconds between SSE keep-alive comments while a job has no new results
+SSE_KEEPALIVE_SECONDS = 15
+
+# Fallback page when templates/dashboard.html is missing
+FALLBACK_DASHBOARD = """
+    <html>
+        <body style="font-family: sans-serif; padding: 40px; text-align: center;">
+            <h1>CTAE-Green Agent</h1>
+            <p>Dashboard template not found. Server is running.</p>
+            <p><a href="/agent-card">View Agent Card</a> | <a href="/docs">API Documentation</a></p>
+        </body>
+    </html>
+    """
+
+# Dashboard page, read once and served from memory
+dashboard_page = StaticPage(Path(__file__).parent / "templates" / "dashboard.html", FALLBACK_DASHBOARD)
+
+# When this worker started serving (for the dashboard's uptime)
+started_at = time.time()
+
+
+def dashboard_metrics() -> Dict[str, Any]:
+    """Live server figures pushed to dashboards by the feed's broadcast loop"""
+    snapshot = agent_slot.current()
+    cache = snapshot.agent.cache.stats() if snapshot is not None and snapshot.agent.cache is not None else {}
+    return {
+        "status": "ready" if snapshot is not None else "starting",
+        "generation": snapshot.generation if snapshot is not None else None,
+        "worker_pid": os.getpid(),
+        "started_at": started_at,
+        "queue_depth": int(dispatch_queue_depth.value()),
+        "in_flight_scenarios": int(dispatch_in_flight.value()),
+        "in_flight_jobs": job_store.in_flight(),
+        "cache_hit_rate": {level: stats['hit_rate'] for level, stats in cache.items()}
+    }
+
 
-# Global green agent instance
-green_agent: Optional[CTAEGreenAgent] = None
+# Evaluation progress, scores and server figures pushed to every open dashboard
+dashboard_feed = DashboardFeed(dashboard_metrics)
+
+# Job gauges are read from the job store whenever /metrics is scraped
+metrics.gauge("ctae_jobs_in_flight", "Background jobs pending or running", fn=lambda: job_store.in_flight())
+metrics.gauge("ctae_jobs_stored", "Background jobs held in the job store", fn=lambda: len(job_store))
+metrics.gauge("ctae_admission_pending", "Scenarios admitted but not yet scored", fn=lambda: admission.pending)
+metrics.gauge("ctae_dashboard_viewers", "Dashboards connected to the live feed", fn=lambda: dashboard_feed.viewers)
 
 
 class TaskRequest(BaseModel):
@@ -31,41 +155,119 @@ class TaskResponse(BaseModel):
     error: Optional[str] = None
 
 
+def build_agent() -> CTAEGreenAgent:
+    return CTAEGreenAgent(data_dir, snapshot=snapshot_path)
+
+
 @app.on_event("startup")
 async def startup_event():
     """Initialize green agent on startup"""
-    global green_agent
-    green_agent = CTAEGreenAgent()
+    global white_agent_client
+    started = time.perf_counter()
+    generation = shared_state.generation() if shared_state is not None else 0
+    agent = build_agent()
+    loaded = time.perf_counter()
+    agent_slot.swap(AgentSnapshot(generation, agent))
+    white_agent_client = AsyncWhiteAgentClient()
+    dashboard_page.load()
+    await dashboard_feed.start()
+    finished = time.perf_counter()
+    
+    startup_report.update(
+        data_source="snapshot" if isinstance(agent.catalog, SnapshotCatalog) else "data directory",
+        data_load_seconds=round(loaded - started, 3),
+        app_startup_seconds=round(finished - loaded, 3),
+        ready_seconds=round(finished - boot_started, 3)
+    )
     print("✓ CTAE-Green Agent initialized")
+    print(f"✓ Startup: imports {startup_report['imports_seconds']:.3f}s, "
+          f"data {startup_report['data_load_seconds']:.3f}s ({startup_report['data_source']}), "
+          f"app {startup_report['app_startup_seconds']:.3f}s; ready {startup_report['ready_seconds']:.3f}s after launch")
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop the dashboard feed and close pooled white-agent connections"""
+    await dashboard_feed.stop()
+    if white_agent_client is not None:
+        await white_agent_client.aclose()
 
 
 @app.get("/", response_class=HTMLResponse)
-async def dashboard():
-    """Serve agent dashboard"""
-    dashboard_path = Path(__file__).parent / "templates" / "dashboard.html"
-    if dashboard_path.exists():
-        return dashboard_path.read_text()
-    return """
-    <html>
-        <body style="font-family: sans-serif; padding: 40px; text-align: center;">
-            <h1>CTAE-Green Agent</h1>
-            <p>Dashboard template not found. Server is running.</p>
-            <p><a href="/agent-card">View Agent Card</a> | <a href="/docs">API Documentation</a></p>
-        </body>
-    </html>
+async def dashboard(request: Request):
+    """Serve agent dashboard from memory (ETag revalidation, gzip when accepted)"""
+    status, headers, body = dashboard_page.render(
+        request.headers.get("if-none-match"),
+        request.headers.get("accept-encoding")
+    )
+    return Response(body, status_code=status, headers=headers, media_type="text/html; charset=utf-8")
+
+
+@app.get("/dashboard/events")
+async def dashboard_events():
+    """Server-sent events for the dashboard: evaluation progress, per-scenario scores and server figures"""
+    return StreamingResponse(
+        dashboard_feed.subscribe(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+async def current_agent() -> CTAEGreenAgent:
+    """
+    The green agent a request should use from start to finish
+
+    Taken once per request, so a concurrent reset swaps in a new agent for
+    later requests without touching this one. In multi-worker mode a reset
+    on another worker (a newer shared generation) is picked up here.
     """
+    snapshot = agent_slot.current()
+    if snapshot is None:
+        raise HTTPException(status_code=500, detail="Green agent not initialized")
+    if shared_state is not None:
+        generation = shared_state.generation()
+        if generation != snapshot.generation:
+            snapshot = await load_generation(generation)
+    return snapshot.agent
+
+
+async def load_generation(generation: int) -> AgentSnapshot:
+    """Build and install the agent for a reset generation (once per process)"""
+    async with reset_lock:
+        snapshot = agent_slot.current()
+        if snapshot is None or snapshot.generation < generation:
+            agent = await asyncio.to_thread(build_agent)
+            snapshot = AgentSnapshot(generation, agent)
+            agent_slot.swap(snapshot)
+        return snapshot
+
 
 @app.get("/health")
 async def health():
-    """Health check endpoint"""
+    """Health check endpoint with live load figures"""
+    snapshot = agent_slot.current()
     return {
         "name": "CTAE-Green Agent",
         "version": "1.0.0",
-        "status": "ready",
-        "description": "Green agent for commodity trade agent evaluation"
+        "status": "ready" if snapshot is not None else "starting",
+        "description": "Green agent for commodity trade agent evaluation",
+        "generation": snapshot.generation if snapshot is not None else None,
+        "worker_pid": os.getpid(),
+        "queue_depth": int(dispatch_queue_depth.value()),
+        "in_flight_scenarios": int(dispatch_in_flight.value()),
+        "in_flight_jobs": job_store.in_flight(),
+        "admission": admission.stats(),
+        "white_agents": agent_limiter.stats()['agents'],
+        "cache": snapshot.agent.cache.stats() if snapshot is not None and snapshot.agent.cache is not None else None,
+        "startup": startup_report
     }
 
 
+@app.get("/metrics")
+async def prometheus_metrics():
+    """Stage timings, request/queue/error counters in Prometheus text format"""
+    return Response(metrics.render(), media_type=METRICS_CONTENT_TYPE)
+
+
 @app.get("/agent-card")
 async def agent_card():
     """Return agent card (A2A protocol)"""
@@ -87,22 +289,88 @@ async def agent_card():
     }
 
 
+def select_scenarios(green_agent: CTAEGreenAgent, metadata: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Resolve the scenarios requested in task metadata (all if none given)"""
+    scenario_id = metadata.get("scenario_id")
+    if scenario_id:
+        if scenario_id not in green_agent.catalog:
+            raise ValueError(f"Scenario {scenario_id} not found")
+        return [green_agent.get_scenario(scenario_id)]
+    return list(green_agent.scenarios)
+
+
+def create_dispatcher(green_agent: CTAEGreenAgent, metadata: Dict[str, Any]) -> ScenarioDispatcher:
+    """Build a dispatcher for the white agent named in task metadata"""
+    return ScenarioDispatcher(
+        green_agent,
+        white_agent_url=metadata.get("white_agent_url"),
+        client=white_agent_client,
+        max_concurrency=int(metadata.get("max_concurrency", DEFAULT_MAX_CONCURRENCY)),
+        agent_id=metadata.get("agent_id"),
+        agent_version=metadata.get("agent_version"),
+        compact_prompts=bool(metadata["compact_prompts"]) if "compact_prompts" in metadata else None,
+        limiter=agent_limiter
+    )
+
+
+def rejected(e: AdmissionRejected) -> HTTPException:
+    """429 telling the caller when the pending queue should have room again"""
+    return HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+
+
+async def record_results(green_agent: CTAEGreenAgent, metadata: Dict[str, Any], results: List[Dict[str, Any]]) -> Optional[str]:
+    """Persist an evaluation's results to the results store; returns the run id (None if not recorded)"""
+    if results_store is None or not results:
+        return None
+    agent_id = metadata.get("agent_id") or metadata.get("white_agent_url") or MOCK_AGENT_ID
+    try:
+        return await asyncio.to_thread(
+            results_store.record,
+            agent_id,
+            results,
+            agent_name=metadata.get("agent_name"),
+            data_version=green_agent.data_version
+        )
+    except sqlite3.Error as e:
+        errors_total.labels("record").inc()
+        print(f"✗ Could not record results: {e}")
+        return None
+
+
+def summarize_results(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Average overall score and performance tier for a set of results"""
+    with stage("report"):
+        totals = ReportAccumulator()
+        for result in results:
+            totals.add(result['scores'])
+        avg_overall = totals.averages()['overall_score']
+    return {
+        "average_overall_score": round(avg_overall, 2),
+        "performance_tier": performance_tier(avg_overall),
+        "estimated_prompt_tokens": sum(result.get('prompt', {}).get('estimated_tokens', 0) for result in results)
+    }
+
+
 @app.post("/task")
 async def handle_task(request: TaskRequest) -> TaskResponse:
     """
     Handle evaluation task via A2A protocol
     
+    Answers 429 with Retry-After when the pending-scenario queue is full, and
+    400 when an evaluation has more scenarios than the whole queue holds.
+    
     Expected task format:
     {
         "task": "evaluate_agent",
         "metadata": {
             "white_agent_url": "http://localhost:8001",
-            "scenario_id": "scenario_01" (optional)
+            "scenario_id": "scenario_01" (optional),
+            "max_concurrency": 8 (optional),
+            "compact_prompts": true (optional)
         }
     }
     """
-    if green_agent is None:
-        raise HTTPException(status_code=500, detail="Green agent not initialized")
+    green_agent = await current_agent()
     
     try:
         # Parse task
@@ -110,84 +378,64 @@ async def handle_task(request: TaskRequest) -> TaskResponse:
         metadata = request.metadata or {}
         
         if task_type == "evaluate_agent":
-            # Run full evaluation
-            white_agent_url = metadata.get("white_agent_url")
-            scenario_id = metadata.get("scenario_id")
-            
-            if scenario_id:
-                # Evaluate specific scenario
-                scenarios = [s for s in green_agent.scenarios if s['id'] == scenario_id]
-                if not scenarios:
-                    raise ValueError(f"Scenario {scenario_id} not found")
-                scenarios_to_run = scenarios
-            else:
-                # Evaluate all scenarios
-                scenarios_to_run = green_agent.scenarios
-            
-            results = []
-            for scenario in scenarios_to_run:
-                # Create scenario prompt
-                prompt = green_agent.create_scenario_prompt(scenario)
-                
-                # Send to white agent (or mock if URL not provided)
-                start_time = time.time()
-                if white_agent_url:
-                    # In production: send HTTP request to white_agent_url
-                    # For now, use mock
-                    white_response = mock_white_agent_response(prompt)
-                else:
-                    white_response = mock_white_agent_response(prompt)
-                response_time = time.time() - start_time
-                
-                # Evaluate response
-                scores = green_agent.evaluate_response(
-                    scenario['id'], 
-                    white_response, 
-                    response_time
+            # Send all scenarios at once; each is scored as its reply arrives
+            scenarios_to_run = select_scenarios(green_agent, metadata)
+            dispatcher = create_dispatcher(green_agent, metadata)
+            try:
+                ticket = admission.admit(len(scenarios_to_run))
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            evaluation_id = f"task-{uuid.uuid4().hex[:12]}"
+            dashboard_feed.evaluation_started(evaluation_id, dispatcher.white_agent_url, [s['id'] for s in scenarios_to_run])
+            try:
+                results = await dispatcher.run(
+                    scenarios_to_run,
+                    on_result=lambda result: dashboard_feed.scenario_scored(evaluation_id, result),
+                    ticket=ticket
                 )
-                
-                results.append({
-                    "scenario_id": scenario['id'],
-                    "scenario_name": scenario['name'],
-                    "difficulty": scenario['difficulty'],
-                    "scores": scores
-                })
-            
-            # Generate summary
-            avg_overall = sum(r['scores']['overall_score'] for r in results) / len(results)
+            except Exception as e:
+                dashboard_feed.evaluation_finished(evaluation_id, error=str(e))
+                raise
+            summary = summarize_results(results)
+            dashboard_feed.evaluation_finished(evaluation_id, summary)
+            run_id = await record_results(green_agent, metadata, results)
             
+            tasks_total.labels(task_type, "success").inc()
             return TaskResponse(
                 status="success",
                 result={
                     "evaluation_type": "commodity_trade_agent",
                     "scenarios_evaluated": len(results),
                     "results": results,
-                    "summary": {
-                        "average_overall_score": round(avg_overall, 2),
-                        "performance_tier": (
-                            "EXCELLENT" if avg_overall >= 80 else
-                            "GOOD" if avg_overall >= 60 else
-                            "FAIR" if avg_overall >= 40 else
-                            "NEEDS IMPROVEMENT"
-                        )
-                    }
+                    "summary": summary,
+                    "run_id": run_id
                 }
             )
         
         elif task_type == "list_scenarios":
-            # Return available scenarios
+            # Return available scenarios straight from the catalog index
+            entries = green_agent.list_scenarios(
+                difficulty=metadata.get("difficulty"),
+                category=metadata.get("category")
+            )
+            offset = int(metadata.get("offset", 0))
+            limit = metadata.get("limit")
+            page = entries[offset:] if limit is None else entries[offset:offset + int(limit)]
+            tasks_total.labels(task_type, "success").inc()
             return TaskResponse(
                 status="success",
                 result={
+                    "total": len(entries),
                     "scenarios": [
                         {
                             "id": s['id'],
                             "name": s['name'],
                             "difficulty": s['difficulty'],
+                            "category": s['category'],
                             "description": s['description'],
                             "time_limit": s['time_limit']
                         }
-                        for s in green_agent.scenarios
+                        for s in page
                     ]
                 }
             )
@@ -195,36 +443,305 @@ async def handle_task(request: TaskRequest) -> TaskResponse:
         else:
             raise ValueError(f"Unknown task type: {task_type}")
     
+    except AdmissionRejected as e:
+        tasks_total.labels(request.task, "rejected").inc()
+        raise rejected(e)
+    except HTTPException:
+        tasks_total.labels(request.task, "error").inc()
+        raise
     except Exception as e:
+        known = request.task in ("evaluate_agent", "list_scenarios")
+        tasks_total.labels(request.task if known else "unknown", "error").inc()
         return TaskResponse(
             status="error",
             error=str(e)
         )
 
 
-@app.post("/reset")
-async def reset():
-    """Reset green agent state (A2A protocol)"""
-    global green_agent
+async def run_job(
+    job: EvaluationJob,
+    scenarios: List[Dict[str, Any]],
+    dispatcher: ScenarioDispatcher,
+    metadata: Dict[str, Any],
+    ticket: Optional[AdmissionTicket] = None
+):
+    """Run a job's evaluation in the background, publishing results as they arrive"""
+    async def on_result(result: Dict[str, Any]):
+        await job.add_result(result)
+        dashboard_feed.scenario_scored(job.id, result)
+    
     try:
-        green_agent = CTAEGreenAgent()
-        return {"status": "success", "message": "Green agent reset successfully"}
+        await job.start()
+        dashboard_feed.evaluation_started(job.id, job.white_agent_url, job.scenario_ids)
+        results = await dispatcher.run(scenarios, on_result=on_result, ticket=ticket)
+        summary = summarize_results(results)
+        summary["run_id"] = await record_results(dispatcher.green_agent, metadata, results)
+        await job.complete(summary)
+        dashboard_feed.evaluation_finished(job.id, summary)
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Reset failed: {str(e)}")
+        errors_total.labels("job").inc()
+        if ticket is not None:
+            ticket.close()
+        await job.fail(str(e))
+        dashboard_feed.evaluation_finished(job.id, error=str(e))
+
+
+@app.post("/jobs", status_code=202)
+async def create_job(request: TaskRequest):
+    """
+    Start an evaluation in the background and return its job id immediately
+    
+    Accepts the same body as an "evaluate_agent" /task request. A job holds
+    its admission queue slots until it finishes; 429 when the queue is full.
+    """
+    green_agent = await current_agent()
+    if request.task != "evaluate_agent":
+        raise HTTPException(status_code=400, detail=f"Unsupported job task: {request.task}")
+    
+    metadata = request.metadata or {}
+    try:
+        scenarios = select_scenarios(green_agent, metadata)
+        dispatcher = create_dispatcher(green_agent, metadata)
+        ticket = admission.admit(len(scenarios))
+    except AdmissionRejected as e:
+        raise rejected(e)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    try:
+        # The shared store evicts and inserts in SQLite, which may wait on other workers
+        job = await asyncio.to_thread(job_store.create, metadata.get("white_agent_url"), [s['id'] for s in scenarios])
+    except JobStoreFullError as e:
+        ticket.close()
+        raise HTTPException(status_code=503, detail=str(e))
+    
+    job.task = asyncio.create_task(run_job(job, scenarios, dispatcher, metadata, ticket))
+    
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "status_url": f"/jobs/{job.id}",
+        "events_url": f"/jobs/{job.id}/events"
+    }
+
+
+def get_job_or_404(job_id: str) -> EvaluationJob:
+    job = job_store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return job
+
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Return job progress and the results scored so far"""
+    return get_job_or_404(job_id).to_dict()
+
+
+@app.get("/jobs/{job_id}/events")
+async def stream_job_events(job_id: str):
+    """Stream each scenario's scores as server-sent events as soon as they are scored"""
+    job = get_job_or_404(job_id)
+    
+    async def event_stream():
+        seen = 0
+        while True:
+            new_results, finished = await job.wait_for_update(seen, SSE_KEEPALIVE_SECONDS)
+            for result in new_results:
+                payload = {
+                    "scenario_id": result['scenario_id'],
+                    "scores": result['scores'],
+                    "timing": result['timing']
+                }
+                if "error" in result:
+                    payload["error"] = result["error"]
+                yield f"event: result\ndata: {json.dumps(payload)}\n\n"
+            seen += len(new_results)
+            
+            if finished:
+                final = {"status": job.status, "summary": job.summary, "error": job.error}
+                yield f"event: done\ndata: {json.dumps(final)}\n\n"
+                return
+            if not new_results:
+                yield ": keep-alive\n\n"
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"}
+    )
+
+
+@app.get("/jobs/{job_id}/report")
+async def get_job_report(job_id: str, format: str = "text"):
+    """Stream a job's evaluation report (text, json or csv) section by section"""
+    job = get_job_or_404(job_id)
+    if format not in REPORT_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown report format: {format} (expected one of {', '.join(REPORT_FORMATS)})"
+        )
+    if not job.results:
+        raise HTTPException(status_code=409, detail=f"Job {job_id} has no results yet")
+    
+    return StreamingResponse(
+        iter_report(list(job.results), format),
+        media_type=MEDIA_TYPES[format]
+    )
+
+
+@app.get("/leaderboard")
+async def leaderboard(
+    rubric_version: str = RUBRIC_VERSION,
+    scenario_id: Optional[str] = None,
+    limit: int = 50,
+    offset: int = 0
+):
+    """All-time agent rankings from every recorded evaluation (optionally for one scenario)"""
+    if results_store is None:
+        raise HTTPException(status_code=503, detail="Results store is disabled")
+    if limit < 1 or offset < 0:
+        raise HTTPException(status_code=400, detail="limit must be positive and offset non-negative")
+    
+    return {
+        "rubric_version": rubric_version,
+        "scenario_id": scenario_id,
+        "total_results": results_store.total_results(rubric_version),
+        "entries": results_store.leaderboard(
+            rubric_version=rubric_version,
+            scenario_id=scenario_id,
+            limit=limit,
+            offset=offset
+        )
+    }
+
+
+@app.post("/reset")
+async def reset():
+    """
+    Reset green agent state (A2A protocol)
+    
+    The new agent is built first and then swapped in; requests already
+    running finish on the agent they started with. In multi-worker mode the
+    new generation is recorded in the shared state and every other worker
+    swaps before its next request.
+    """
+    async with reset_lock:
+        try:
+            agent = await asyncio.to_thread(build_agent)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Reset failed: {str(e)}")
+        
+        if shared_state is not None:
+            generation = shared_state.bump_generation()
+        else:
+            previous = agent_slot.current()
+            generation = previous.generation + 1 if previous is not None else 1
+        agent_slot.swap(AgentSnapshot(generation, agent))
+    dashboard_feed.publish("reset", {"generation": generation, "data_version": agent.data_version})
+    
+    return {
+        "status": "success",
+        "message": "Green agent reset successfully",
+        "generation": generation,
+        "data_version": agent.data_version
+    }
+
+
+def preload_data() -> CTAEGreenAgent:
+    """Load the catalog and render every scenario prompt (run in the parent before forking)"""
+    agent = build_agent()
+    if not isinstance(agent.catalog, SnapshotCatalog):
+        # A snapshot's prompts are already rendered and shared through the page cache
+        for scenario in agent.scenarios:
+            agent.create_scenario_prompt(scenario)
+    print(f"✓ Preloaded {len(agent.scenarios)} scenarios (data version {agent.data_version[:12]})")
+    return agent
 
 
 if __name__ == "__main__":
-    import os
-    port = int(os.environ.get("PORT", 8000))
+    import argparse
+    from prefork import serve
+    
+    parser = argparse.ArgumentParser(description="CTAE-Green Agent A2A Server")
+    parser.add_argument("--host", default="0.0.0.0", help="Address to bind (default: 0.0.0.0)")
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=int(os.environ.get("PORT", 8000)),
+        help="Port to listen on (default: $PORT or 8000)"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=int(os.environ.get("WEB_CONCURRENCY", 1)),
+        help="Worker processes forked after the data is loaded (default: $WEB_CONCURRENCY or 1)"
+    )
+    parser.add_argument(
+        "--state-db",
+        help=f"Shared SQLite state for jobs and resets (default with --workers > 1: <data_dir>/{CACHE_DIR}/{STATE_DB_NAME})"
+    )
+    parser.add_argument("--data-dir", help="Data directory to serve (default: ../data or ./data)")
+    parser.add_argument(
+        "--snapshot",
+        nargs="?",
+        const=True,
+        metavar="PATH",
+        help="Map the scenario snapshot written by 'launcher.py build-snapshot' instead of parsing the data "
+             "(default path: <data_dir>/.cache/scenario_snapshot.bin; falls back to the data if stale)"
+    )
+    parser.add_argument(
+        "--agent-rate",
+        type=float,
+        default=DEFAULT_AGENT_RATE,
+        help=f"Calls per second allowed per white agent URL, 0 for no limit (default: {DEFAULT_AGENT_RATE:g})"
+    )
+    parser.add_argument(
+        "--agent-burst",
+        type=int,
+        default=DEFAULT_AGENT_BURST,
+        help=f"Calls a white agent may receive at once before the rate limit applies (default: {DEFAULT_AGENT_BURST})"
+    )
+    parser.add_argument(
+        "--agent-concurrency",
+        type=int,
+        default=DEFAULT_AGENT_CONCURRENCY,
+        help=f"Calls in flight per white agent URL across all evaluations (default: {DEFAULT_AGENT_CONCURRENCY})"
+    )
+    parser.add_argument(
+        "--max-pending",
+        type=int,
+        default=DEFAULT_MAX_PENDING,
+        help=f"Scenarios admitted but not yet scored before evaluations get a 429 (default: {DEFAULT_MAX_PENDING})"
+    )
+    args = parser.parse_args()
+    port = args.port
+    data_dir = args.data_dir
+    snapshot_path = args.snapshot
+    agent_limiter = AsyncAgentLimiter(args.agent_rate or None, args.agent_burst, args.agent_concurrency)
+    admission = AdmissionQueue(args.max_pending)
     
     print("\n" + "=" * 60)
     print("CTAE-GREEN AGENT A2A SERVER")
     print("=" * 60)
-    print(f"\nStarting server on port {port}")
+    print(f"\nStarting server on port {port} ({args.workers} worker{'s' if args.workers != 1 else ''})")
     print(f"Agent card: /agent-card")
     print(f"Task endpoint: /task")
+    print(f"Jobs endpoint: /jobs")
+    print(f"Metrics endpoint: /metrics")
     print(f"Reset endpoint: /reset")
+    print(f"Leaderboard: /leaderboard")
+    print(f"Admission: {args.agent_rate or 'unlimited'} calls/s (burst {args.agent_burst}) and "
+          f"{args.agent_concurrency} in flight per white agent; {args.max_pending} pending scenarios")
     print("\n" + "=" * 60 + "\n")
     
-    uvicorn.run(app, host="0.0.0.0", port=port)
+    if args.workers > 1 or args.state_db:
+        agent = preload_data()
+        shared_state = SharedState(args.state_db or agent.data_dir / CACHE_DIR / STATE_DB_NAME)
+        job_store = SQLiteJobStore(shared_state)
+        print(f"✓ Shared state: {shared_state.path}")
+    
+    if args.workers > 1:
+        serve(app, args.host, port, args.workers)
+    else:
+        uvicorn.run(app, host=args.host, port=port)
 
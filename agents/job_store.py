@@ -0,0 +1,369 @@
+"""
+CTAE-Green Job Store
+Bounded, TTL-evicting registry of background evaluation jobs
+
+JobStore keeps jobs in memory for a single server process. SQLiteJobStore
+keeps them in the SQLite file shared by the workers of a multi-worker server
+(see server_state), so a job started on one worker can be polled, streamed
+and reported from any other.
+"""
+
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple, Callable
+
+from server_state import SharedState, SQLiteDatabase
+
+# Defaults keep a long-running server's job memory bounded
+DEFAULT_MAX_JOBS = 1000
+DEFAULT_JOB_TTL_SECONDS = 3600
+
+# How often a worker re-reads a job that another worker is running
+SHARED_POLL_SECONDS = 0.2
+
+JOB_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    white_agent_url TEXT,
+    scenario_ids TEXT NOT NULL,
+    summary TEXT,
+    error TEXT,
+    owner_pid INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_by_status ON jobs (status, updated_at);
+CREATE TABLE IF NOT EXISTS job_results (
+    job_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    result TEXT NOT NULL,
+    PRIMARY KEY (job_id, seq)
+) WITHOUT ROWID;
+"""
+
+FINISHED_STATUSES = ("completed", "failed")
+
+
+class JobStoreFullError(RuntimeError):
+    """Raised when every slot in the job store is held by an unfinished job"""
+
+
+class EvaluationJob:
+    """State of one background evaluation run"""
+
+    def __init__(self, job_id: str, white_agent_url: Optional[str], scenario_ids: List[str]):
+        self.id = job_id
+        self.white_agent_url = white_agent_url
+        self.scenario_ids = scenario_ids
+        self.status = "pending"
+        self.results: List[Dict[str, Any]] = []
+        self.summary: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.updated_at = self.created_at
+        self.task: Optional[asyncio.Task] = None
+        self.on_change: Optional[Callable[["EvaluationJob"], None]] = None
+        self._condition = asyncio.Condition()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATUSES
+
+    async def _notify(self):
+        self.updated_at = time.time()
+        if self.on_change is not None:
+            self.on_change(self)
+        async with self._condition:
+            self._condition.notify_all()
+
+    async def start(self):
+        self.status = "running"
+        await self._notify()
+
+    async def add_result(self, result: Dict[str, Any]):
+        self.results.append(result)
+        await self._notify()
+
+    async def complete(self, summary: Dict[str, Any]):
+        self.summary = summary
+        self.status = "completed"
+        await self._notify()
+
+    async def fail(self, error: str):
+        self.error = error
+        self.status = "failed"
+        await self._notify()
+
+    async def wait_for_update(self, seen: int, timeout: float) -> Tuple[List[Dict[str, Any]], bool]:
+        """
+        Wait until more than `seen` results exist or the job finishes
+
+        Returns:
+            (new results, finished flag); new results is empty on timeout
+        """
+        async with self._condition:
+            try:
+                await asyncio.wait_for(
+                    self._condition.wait_for(lambda: len(self.results) > seen or self.finished),
+                    timeout=timeout
+                )
+            except asyncio.TimeoutError:
+                pass
+            return self.results[seen:], self.finished
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "white_agent_url": self.white_agent_url,
+            "progress": {
+                "completed": len(self.results),
+                "total": len(self.scenario_ids)
+            },
+            "results": self.results,
+            "summary": self.summary,
+            "error": self.error,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at
+        }
+
+
+class JobStore:
+    """In-memory job registry with a size cap and TTL eviction of finished jobs (thread-safe)"""
+
+    def __init__(self, max_jobs: int = DEFAULT_MAX_JOBS, ttl_seconds: float = DEFAULT_JOB_TTL_SECONDS):
+        self.max_jobs = max_jobs
+        self.ttl_seconds = ttl_seconds
+        self._jobs: "OrderedDict[str, EvaluationJob]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._jobs)
+
+    def _evict(self):
+        """Drop expired finished jobs, then the oldest finished ones while over capacity"""
+        now = time.time()
+        for job_id, job in list(self._jobs.items()):
+            if job.finished and now - job.updated_at > self.ttl_seconds:
+                del self._jobs[job_id]
+
+        if len(self._jobs) >= self.max_jobs:
+            for job_id, job in list(self._jobs.items()):
+                if job.finished:
+                    del self._jobs[job_id]
+                    if len(self._jobs) < self.max_jobs:
+                        break
+
+    def create(self, white_agent_url: Optional[str], scenario_ids: List[str]) -> EvaluationJob:
+        with self._lock:
+            self._evict()
+            if len(self._jobs) >= self.max_jobs:
+                raise JobStoreFullError(f"Job store is full ({self.max_jobs} unfinished jobs)")
+
+            job = EvaluationJob(uuid.uuid4().hex, white_agent_url, scenario_ids)
+            self._jobs[job.id] = job
+            return job
+
+    def get(self, job_id: str) -> Optional[EvaluationJob]:
+        with self._lock:
+            self._evict()
+            return self._jobs.get(job_id)
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return sum(1 for job in self._jobs.values() if not job.finished)
+
+
+class SharedEvaluationJob(EvaluationJob):
+    """Read-only view of a job run by another worker, refreshed from the shared store"""
+
+    def __init__(self, store: "SQLiteJobStore", job_id: str, white_agent_url: Optional[str], scenario_ids: List[str]):
+        super().__init__(job_id, white_agent_url, scenario_ids)
+        self._store = store
+
+    async def wait_for_update(self, seen: int, timeout: float) -> Tuple[List[Dict[str, Any]], bool]:
+        deadline = time.monotonic() + timeout
+        while True:
+            self._store.refresh(self)
+            if len(self.results) > seen or self.finished or time.monotonic() >= deadline:
+                return self.results[seen:], self.finished
+            await asyncio.sleep(min(SHARED_POLL_SECONDS, max(0.0, deadline - time.monotonic())))
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class SQLiteJobStore:
+    """
+    Job registry in the SQLite file shared by all server workers
+
+    Jobs run on the worker that created them. Every status change and result
+    is written through to the database as it happens. Other workers get a
+    SharedEvaluationJob that re-reads the database. Jobs left unfinished by
+    a worker that has exited are marked failed.
+
+    Writes never run on the event loop. A job's changes are queued for one
+    writer thread per process, so `on_change` returns at once and writes
+    land in order. create() (which also evicts) blocks on SQLite and is meant
+    to be called via asyncio.to_thread. Writes use their own connection, so
+    a writer waiting out another worker's lock does not hold up reads.
+    """
+
+    def __init__(self, state: SharedState, max_jobs: int = DEFAULT_MAX_JOBS, ttl_seconds: float = DEFAULT_JOB_TTL_SECONDS):
+        self.state = state
+        self.max_jobs = max_jobs
+        self.ttl_seconds = ttl_seconds
+        self._writes = SQLiteDatabase(state.path)
+        self._writer: Optional[ThreadPoolExecutor] = None
+        self._local: Dict[str, EvaluationJob] = {}
+        self._saved_results: Dict[str, int] = {}
+        self._schema_ready_pid: Optional[int] = None
+        self._schema_lock = threading.Lock()
+
+    def _db(self) -> SharedState:
+        if self._schema_ready_pid != os.getpid():
+            with self._schema_lock:
+                if self._schema_ready_pid != os.getpid():
+                    self.state.connect().executescript(JOB_SCHEMA)
+                    self._local.clear()
+                    self._saved_results.clear()
+                    # Threads do not survive a fork: each worker starts its own writer
+                    self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="job-store-writer")
+                    self._schema_ready_pid = os.getpid()
+        return self.state
+
+    def __len__(self) -> int:
+        return self._db().execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+
+    def _evict(self):
+        """Fail orphaned jobs, drop expired finished jobs, then the oldest finished ones while over capacity"""
+        self._db()
+        now = time.time()
+        with self._writes.transaction() as db:
+            for job_id, owner_pid in db.execute(
+                "SELECT id, owner_pid FROM jobs WHERE status NOT IN (?, ?)", FINISHED_STATUSES
+            ).fetchall():
+                if owner_pid != os.getpid() and not _pid_alive(owner_pid):
+                    db.execute(
+                        "UPDATE jobs SET status = 'failed', error = ?, updated_at = ? WHERE id = ?",
+                        ("Worker exited before the job finished", now, job_id)
+                    )
+
+            expired = [row[0] for row in db.execute(
+                "SELECT id FROM jobs WHERE status IN (?, ?) AND updated_at < ?",
+                FINISHED_STATUSES + (now - self.ttl_seconds,)
+            )]
+            excess = db.execute("SELECT COUNT(*) FROM jobs").fetchone()[0] - len(expired) - self.max_jobs + 1
+            if excess > 0:
+                expired += [row[0] for row in db.execute(
+                    "SELECT id FROM jobs WHERE status IN (?, ?) AND updated_at >= ? ORDER BY updated_at LIMIT ?",
+                    FINISHED_STATUSES + (now - self.ttl_seconds, excess)
+                )]
+            for job_id in expired:
+                db.execute("DELETE FROM job_results WHERE job_id = ?", (job_id,))
+                db.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+
+    def create(self, white_agent_url: Optional[str], scenario_ids: List[str]) -> EvaluationJob:
+        self._evict()
+        job = EvaluationJob(uuid.uuid4().hex, white_agent_url, scenario_ids)
+        with self._writes.transaction() as db:
+            if db.execute("SELECT COUNT(*) FROM jobs").fetchone()[0] >= self.max_jobs:
+                raise JobStoreFullError(f"Job store is full ({self.max_jobs} unfinished jobs)")
+            db.execute(
+                "INSERT INTO jobs (id, status, white_agent_url, scenario_ids, owner_pid, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (job.id, job.status, white_agent_url, json.dumps(scenario_ids), os.getpid(), job.created_at, job.updated_at)
+            )
+        job.on_change = self._save
+        self._local[job.id] = job
+        self._saved_results[job.id] = 0
+        return job
+
+    def _save(self, job: EvaluationJob):
+        """Queue a local job's status and any new results for the writer thread"""
+        self._db()
+        saved = self._saved_results.get(job.id, 0)
+        update = (job.status, job.summary, job.error, job.updated_at, job.results[saved:], saved)
+        self._saved_results[job.id] = len(job.results)
+        self._writer.submit(self._write, job, *update)
+
+    def _write(self, job: EvaluationJob, status, summary, error, updated_at, results, first_seq: int):
+        try:
+            with self._writes.transaction() as db:
+                db.execute(
+                    "UPDATE jobs SET status = ?, summary = ?, error = ?, updated_at = ? WHERE id = ?",
+                    (status, json.dumps(summary) if summary is not None else None, error, updated_at, job.id)
+                )
+                db.executemany(
+                    "INSERT OR REPLACE INTO job_results (job_id, seq, result) VALUES (?, ?, ?)",
+                    [(job.id, seq, json.dumps(result)) for seq, result in enumerate(results, first_seq)]
+                )
+        except sqlite3.Error as e:
+            # The local job still has every result; other workers see it once a later write lands
+            self._saved_results[job.id] = min(self._saved_results.get(job.id, first_seq), first_seq)
+            print(f"✗ Could not save job {job.id}: {e}")
+            return
+        if status in FINISHED_STATUSES:
+            # Everything is in the database now; later reads are served from there
+            self._local.pop(job.id, None)
+            self._saved_results.pop(job.id, None)
+
+    def flush(self):
+        """Wait until every queued write has landed"""
+        self._db()
+        self._writer.submit(lambda: None).result()
+
+    def get(self, job_id: str) -> Optional[EvaluationJob]:
+        local = self._local.get(job_id)
+        if local is not None:
+            return local
+
+        row = self._db().execute(
+            "SELECT white_agent_url, scenario_ids, created_at FROM jobs WHERE id = ?", (job_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        job = SharedEvaluationJob(self, job_id, row[0], json.loads(row[1]))
+        job.created_at = row[2]
+        self.refresh(job)
+        if job.finished and time.time() - job.updated_at > self.ttl_seconds:
+            return None
+        return job
+
+    def refresh(self, job: EvaluationJob):
+        """Load a job's latest status and any results it does not have yet"""
+        state = self._db()
+        row = state.execute(
+            "SELECT status, summary, error, updated_at FROM jobs WHERE id = ?", (job.id,)
+        ).fetchone()
+        if row is None:
+            job.status, job.error = "failed", "Job was evicted"
+            return
+        job.status, job.error, job.updated_at = row[0], row[2], row[3]
+        job.summary = json.loads(row[1]) if row[1] is not None else None
+        job.results.extend(
+            json.loads(result) for (result,) in state.execute(
+                "SELECT result FROM job_results WHERE job_id = ? AND seq >= ? ORDER BY seq",
+                (job.id, len(job.results))
+            )
+        )
+
+    def in_flight(self) -> int:
+        return self._db().execute(
+            "SELECT COUNT(*) FROM jobs WHERE status NOT IN (?, ?)", FINISHED_STATUSES
+        ).fetchone()[0]
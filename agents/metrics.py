@@ -0,0 +1,385 @@
+"""
+CTAE-Green Metrics
+Per-stage timers, histograms and counters, rendered in Prometheus text format
+
+Hot-path stages are timed on the monotonic clock:
+
+    with stage("prompt_build"):
+        prompt = ...
+
+Each stage records into the ctae_stage_seconds histogram. If a stage raises,
+it also counts towards ctae_errors_total. Everything records into one
+process-wide registry. The server exposes it at /metrics, and the launcher
+and benchmarks record into it too at negligible cost (about a microsecond per
+stage: two clock reads and a deque append).
+
+Stages:
+    data_load         CTAEGreenAgent construction (catalog fetch/parse)
+    prompt_build      create_scenario_prompt
+    white_agent_call  sending a prompt and receiving the reply
+    parse             raw reply text -> structured response (for HTTP replies,
+                      the parser's share of white_agent_call, recorded once
+                      per reply)
+    scoring           structured response -> scores
+    report            summaries and text reports
+"""
+
+import abc
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from typing import Dict, Any, List, Callable, Optional, Tuple
+
+STAGES = ("data_load", "prompt_build", "white_agent_call", "parse", "scoring", "report")
+
+# Seconds; spans sub-millisecond scoring up to slow white agents
+DEFAULT_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0
+)
+
+# Estimated prompt tokens; a compact prompt is a few thousand, a full large manifest millions
+PROMPT_TOKEN_BUCKETS = (500, 1000, 2000, 4000, 8000, 16000, 32000, 64000, 128000, 1000000, 10000000)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Histogram observations are queued and folded into buckets in batches of this size
+FLUSH_EVERY = 256
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if value == int(value) and abs(value) < 1e15:
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _CounterValue:
+    __slots__ = ("value", "_lock")
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self.value += amount
+
+
+class _GaugeValue(_CounterValue):
+    __slots__ = ()
+
+    def dec(self, amount: float = 1.0):
+        with self._lock:
+            self.value -= amount
+
+    def set(self, value: float):
+        self.value = value
+
+
+class _HistogramValue:
+    """
+    Bucket counts for one label combination
+
+    observe() only appends to a deque (atomic, no lock); observations are
+    folded into the buckets every FLUSH_EVERY calls and before rendering.
+    """
+
+    __slots__ = ("buckets", "counts", "sum", "count", "_pending", "_lock")
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+        self._pending = deque()
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        self._pending.append(value)
+        if len(self._pending) >= FLUSH_EVERY:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            pending, buckets, counts = self._pending, self.buckets, self.counts
+            while pending:
+                value = pending.popleft()
+                counts[bisect_left(buckets, value)] += 1
+                self.sum += value
+                self.count += 1
+
+    def snapshot(self) -> Tuple[List[int], float, int]:
+        self.flush()
+        with self._lock:
+            return list(self.counts), self.sum, self.count
+
+
+class _Metric(abc.ABC):
+    """A named metric family; `labels(...)` returns the child for one label combination"""
+
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], Any] = {}
+        self._lock = threading.Lock()
+
+    @abc.abstractmethod
+    def _new_child(self):
+        """A fresh child value for one label combination"""
+
+    def labels(self, *values: str):
+        """Child for these label values (cache it on hot paths)"""
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {values}")
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def _samples(self) -> List[Tuple[Tuple[str, ...], Any]]:
+        with self._lock:
+            return sorted(self._children.items())
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for values, child in self._samples():
+            lines.append(f"{self.name}{_format_labels(self.labelnames, values)} {_format_value(child.value)}")
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self):
+        return _CounterValue()
+
+    def inc(self, amount: float = 1.0):
+        self.labels().inc(amount)
+
+
+class Gauge(_Metric):
+    """Gauge set directly, or read from `fn` at render time"""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = (), fn: Optional[Callable[[], float]] = None):
+        super().__init__(name, help, labelnames)
+        self.fn = fn
+
+    def _new_child(self):
+        return _GaugeValue()
+
+    def inc(self, amount: float = 1.0):
+        self.labels().inc(amount)
+
+    def dec(self, amount: float = 1.0):
+        self.labels().dec(amount)
+
+    def set(self, value: float):
+        self.labels().set(value)
+
+    def value(self) -> float:
+        if self.fn is not None:
+            return float(self.fn())
+        return self.labels().value
+
+    def _samples(self):
+        if self.fn is not None:
+            child = _GaugeValue()
+            child.value = self.value()
+            return [((), child)]
+        return super()._samples()
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = (), buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _HistogramValue(self.buckets)
+
+    def observe(self, value: float):
+        self.labels().observe(value)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for values, child in self._samples():
+            counts, total, count = child.snapshot()
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                cumulative += n
+                le = 'le="' + _format_value(bound) + '"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, values, le)} {cumulative}")
+            labels = _format_labels(self.labelnames, values)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Named metrics of one process; registering an existing name returns the existing metric"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, cls, name: str, *args, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"Metric {name} is already registered as a {metric.kind}")
+            return metric
+
+    def counter(self, name: str, help: str, labelnames: Tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter, name, help, labelnames)
+
+    def gauge(self, name: str, help: str, labelnames: Tuple[str, ...] = (), fn: Optional[Callable[[], float]] = None) -> Gauge:
+        gauge = self._register(Gauge, name, help, labelnames, fn=fn)
+        if fn is not None:
+            gauge.fn = fn
+        return gauge
+
+    def histogram(self, name: str, help: str, labelnames: Tuple[str, ...] = (), buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram, name, help, labelnames, buckets=buckets)
+
+    def render(self) -> str:
+        """All metrics in Prometheus text exposition format"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+
+stage_seconds = metrics.histogram(
+    "ctae_stage_seconds", "Time spent in each evaluation stage", ("stage",)
+)
+errors_total = metrics.counter(
+    "ctae_errors_total", "Errors raised, by stage", ("stage",)
+)
+requests_total = metrics.counter(
+    "ctae_http_requests_total", "HTTP requests handled, by route, method and status", ("route", "method", "status")
+)
+request_seconds = metrics.histogram(
+    "ctae_http_request_seconds", "HTTP request latency, by route", ("route",)
+)
+tasks_total = metrics.counter(
+    "ctae_tasks_total", "A2A /task requests, by task type and outcome", ("task", "status")
+)
+queue_wait_seconds = metrics.histogram(
+    "ctae_dispatch_queue_wait_seconds", "Time scenarios wait for a dispatch slot"
+)
+dispatch_queue_depth = metrics.gauge(
+    "ctae_dispatch_queue_depth", "Scenarios waiting for a dispatch slot"
+)
+dispatch_in_flight = metrics.gauge(
+    "ctae_dispatch_in_flight", "Scenarios currently being prompted, awaited or scored"
+)
+cache_lookups_total = metrics.counter(
+    "ctae_cache_lookups_total", "Evaluation cache lookups, by level and result (memory_hit, disk_hit, miss)", ("cache", "result")
+)
+throttle_wait_seconds = metrics.histogram(
+    "ctae_throttle_wait_seconds", "Time white agent calls wait on their agent's rate limit and concurrency cap"
+)
+throttled_calls = metrics.gauge(
+    "ctae_throttled_calls", "White agent calls waiting on their agent's rate limit or concurrency cap"
+)
+admission_rejected_total = metrics.counter(
+    "ctae_admission_rejected_total", "Evaluations turned away because the pending-scenario queue was full"
+)
+prompt_tokens = metrics.histogram(
+    "ctae_prompt_tokens", "Estimated tokens per scenario prompt sent, by prompt mode (full, compact)", ("mode",),
+    buckets=PROMPT_TOKEN_BUCKETS
+)
+
+_stage_children = {name: stage_seconds.labels(name) for name in STAGES}
+_error_children = {name: errors_total.labels(name) for name in STAGES}
+
+
+class _StageTimer:
+    __slots__ = ("name", "histogram", "started")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.histogram = _stage_children.get(name) or stage_seconds.labels(name)
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.histogram.observe(time.perf_counter() - self.started)
+        if exc_type is not None and not issubclass(exc_type, GeneratorExit):
+            (_error_children.get(self.name) or errors_total.labels(self.name)).inc()
+        return False
+
+
+def stage(name: str) -> _StageTimer:
+    """Context manager timing one stage into ctae_stage_seconds"""
+    return _StageTimer(name)
+
+
+def observe_stage(name: str, seconds: float, failed: bool = False):
+    """Record a stage timed piecewise (e.g. parsing a reply as it streams in)"""
+    (_stage_children.get(name) or stage_seconds.labels(name)).observe(seconds)
+    if failed:
+        (_error_children.get(name) or errors_total.labels(name)).inc()
+
+
+class RequestMetricsMiddleware:
+    """
+    ASGI middleware counting requests and their latency per route template
+
+    Routes are labelled by their path template (/jobs/{job_id}), not the raw
+    path, to keep label cardinality bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = [500]
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get("route")
+            path = getattr(route, "path", None) or "unmatched"
+            request_seconds.labels(path).observe(time.perf_counter() - started)
+            requests_total.labels(path, scope.get("method", ""), str(status[0])).inc()
@@ -0,0 +1,127 @@
+"""
+CTAE-Green Prefork Server
+Runs several uvicorn workers forked from a parent that has already loaded the data
+
+The parent binds the listening socket and runs `preload` (loading the
+scenario catalog, shipment table, email index and rendered prompts) before
+forking. Every worker therefore starts with the data in memory and shares
+those pages with its siblings copy-on-write. gc.freeze() moves the preloaded
+objects out of the cyclic collector's reach, so collections in a worker do
+not touch, and so copy, the shared pages. Workers accept connections from
+the one shared socket and the kernel spreads them across workers. A worker
+that dies is replaced. SIGINT/SIGTERM stop all of them.
+
+POSIX only (os.fork).
+"""
+
+import gc
+import os
+import signal
+import socket
+import sys
+import time
+from typing import Any, Callable, Dict, Optional
+
+import uvicorn
+
+# A worker that exits sooner than this after starting is restarted only after a pause
+MIN_WORKER_UPTIME_SECONDS = 1.0
+LISTEN_BACKLOG = 2048
+
+
+def bind_socket(host: str, port: int) -> socket.socket:
+    """Listening socket shared by every worker"""
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(LISTEN_BACKLOG)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _run_worker(app: Any, sock: socket.socket, log_level: str):
+    """Worker process body: serve the app on the inherited socket until told to stop"""
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    config = uvicorn.Config(app, log_level=log_level, lifespan="on")
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def serve(
+    app: Any,
+    host: str,
+    port: int,
+    workers: int,
+    preload: Optional[Callable[[], None]] = None,
+    log_level: str = "info"
+):
+    """
+    Serve `app` from `workers` forked processes sharing one socket
+
+    Args:
+        app: ASGI app (or "module:attr" import string)
+        host, port: Address to bind
+        workers: Number of worker processes
+        preload: Called once in the parent before forking
+        log_level: uvicorn log level for the workers
+    """
+    if workers < 1:
+        raise ValueError("workers must be at least 1")
+    if not hasattr(os, "fork"):
+        raise RuntimeError("Multi-worker mode needs os.fork (POSIX)")
+
+    sock = bind_socket(host, port)
+    if preload is not None:
+        preload()
+    # Keep preloaded objects out of the collector so workers do not dirty shared pages
+    gc.collect()
+    gc.freeze()
+
+    children: Dict[int, float] = {}
+    stopping = False
+
+    def spawn():
+        sys.stdout.flush()
+        sys.stderr.flush()
+        pid = os.fork()
+        if pid == 0:
+            try:
+                _run_worker(app, sock, log_level)
+            finally:
+                os._exit(0)
+        children[pid] = time.monotonic()
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+
+    for _ in range(workers):
+        spawn()
+    print(f"✓ {workers} workers serving on {host}:{port} (parent pid {os.getpid()})")
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        started = children.pop(pid, None)
+        if started is None or stopping:
+            continue
+        print(f"✗ Worker {pid} exited (status {status}); restarting")
+        if time.monotonic() - started < MIN_WORKER_UPTIME_SECONDS:
+            time.sleep(MIN_WORKER_UPTIME_SECONDS)
+        if not stopping:
+            spawn()
+
+    sock.close()
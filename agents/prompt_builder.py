@@ -0,0 +1,246 @@
+"""
+CTAE-Green Prompt Builder
+Renders scenario prompts from cached fragments and memoizes finished prompts
+"""
+
+import math
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Callable, Hashable, Optional, Tuple
+
+# Byte budgets (UTF-8 text sizes) for finished prompts and rendered fragments
+DEFAULT_PROMPT_BYTES = 32 << 20
+DEFAULT_FRAGMENT_BYTES = 16 << 20
+
+# Rough characters per token for English text and CSV (no tokenizer dependency)
+CHARS_PER_TOKEN = 4
+
+HEADER_TEMPLATE = """# Commodity Trade Analysis Task
+
+**Scenario**: {name}
+**Description**: {description}
+**Time Limit**: {time_limit} seconds
+
+## Task
+{task}
+
+## Available Data
+
+### Logistics Emails
+"""
+
+EMAIL_TEMPLATE = "\n---\n**From**: {from_}\n**Subject**: {subject}\n**Timestamp**: {timestamp}\n\n{body}\n"
+
+MANIFEST_TEMPLATE = "\n\n### Shipment Manifest\n```csv\n{manifest}\n```\n"
+
+MANIFEST_NOTE_TEMPLATE = "\n_{note}_\n"
+
+RISK_ALERTS_HEADER = "\n\n### Risk Alerts\n"
+
+ALERT_TEMPLATE = (
+    "\n**[{severity}]** {title}\n"
+    "- Category: {category}\n"
+    "- {description}\n"
+    "- Recommended Action: {recommended_action}\n"
+)
+
+OUTPUT_FORMAT_SECTION = "\n\n## Required Output Format\n" + """
+Please provide your analysis in the following JSON format:
+```json
+{
+  "extracted_data": {
+    "shipment_ids": ["list of affected shipment IDs"],
+    "commodities": ["list of commodities"],
+    "key_facts": ["list of critical facts extracted"]
+  },
+  "risk_assessment": [
+    {
+      "risk_type": "type of risk",
+      "severity": "low/medium/high/critical",
+      "affected_assets": ["shipments or regions affected"],
+      "description": "brief explanation"
+    }
+  ],
+  "recommendations": [
+    {
+      "priority": "high/medium/low",
+      "action": "specific action to take",
+      "rationale": "why this action is recommended"
+    }
+  ],
+  "reasoning": "Your step-by-step analysis process"
+}
+```
+"""
+
+
+def render_email(email: Dict[str, Any]) -> str:
+    return EMAIL_TEMPLATE.format(
+        from_=email['from'],
+        subject=email['subject'],
+        timestamp=email['timestamp'],
+        body=email['body']
+    )
+
+
+def render_alert(alert: Dict[str, Any]) -> str:
+    return ALERT_TEMPLATE.format(
+        severity=alert['severity'],
+        title=alert['title'],
+        category=alert['category'],
+        description=alert['description'],
+        recommended_action=alert['recommended_action']
+    )
+
+
+def render_manifest(manifest: Any) -> str:
+    """Manifest section; `manifest` is CSV text or a ShipmentSelection (rendered via str)"""
+    return MANIFEST_TEMPLATE.format(manifest=manifest)
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate token count of a prompt"""
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def prompt_stats(prompt: str) -> Dict[str, int]:
+    """Size of a prompt in characters, UTF-8 bytes and estimated tokens"""
+    return {
+        "chars": len(prompt),
+        "bytes": len(prompt.encode("utf-8")),
+        "estimated_tokens": estimate_tokens(prompt)
+    }
+
+
+class _TextLRU:
+    """LRU of rendered text capped by total UTF-8 size (callers hold the builder's lock)"""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Hashable, Tuple[str, int]]" = OrderedDict()
+        self._size = 0
+
+    def get(self, key: Hashable) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        self._entries.move_to_end(key)
+        return entry[0]
+
+    def put(self, key: Hashable, text: str):
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._size -= previous[1]
+        size = len(text.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        self._entries[key] = (text, size)
+        self._size += size
+        while self._size > self.max_bytes:
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self._size -= evicted
+
+    def clear(self):
+        self._entries.clear()
+        self._size = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class PromptBuilder:
+    """
+    Builds scenario prompts with a single join over cached fragments
+
+    Email and alert fragments are cached by record id, manifest fragments by
+    the shipment selection (or manifest text), each scoped to its data
+    version so agents on different versions share the cache without evicting
+    each other. Finished prompts are memoized per (scenario id, data version,
+    compact). Both caches are LRUs capped by bytes, and rendering happens
+    outside the lock, which only guards the cache lookups and inserts.
+    """
+
+    def __init__(self, prompt_bytes: int = DEFAULT_PROMPT_BYTES, fragment_bytes: int = DEFAULT_FRAGMENT_BYTES):
+        self._prompts = _TextLRU(prompt_bytes)
+        self._fragments = _TextLRU(fragment_bytes)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _fragment(self, kind: str, key: Any, render, record, cached: bool, data_version: Optional[str]) -> str:
+        if not cached or key is None:
+            return render(record)
+        cache_key = (data_version, kind, key)
+        with self._lock:
+            fragment = self._fragments.get(cache_key)
+        if fragment is None:
+            fragment = render(record)
+            with self._lock:
+                self._fragments.put(cache_key, fragment)
+        return fragment
+
+    def render(self, scenario: Dict[str, Any], cached: bool = True, data_version: Optional[str] = None) -> str:
+        """Render a prompt from (optionally cached) fragments of `data_version`, bypassing the memo"""
+        data = scenario['data']
+        parts = [HEADER_TEMPLATE.format(
+            name=scenario['name'],
+            description=scenario['description'],
+            time_limit=scenario['time_limit'],
+            task=scenario['task']
+        )]
+        parts.extend(
+            self._fragment("email", email.get('id'), render_email, email, cached, data_version)
+            for email in data['emails']
+        )
+        parts.append(self._fragment(
+            "manifest", data['shipments'], render_manifest, data['shipments'], cached, data_version
+        ))
+        if data.get('manifest_note'):
+            parts.append(MANIFEST_NOTE_TEMPLATE.format(note=data['manifest_note']))
+        parts.append(RISK_ALERTS_HEADER)
+        parts.extend(
+            self._fragment("alert", alert.get('alert_id'), render_alert, alert, cached, data_version)
+            for alert in data['risk_alerts']
+        )
+        parts.append(OUTPUT_FORMAT_SECTION)
+        return "".join(parts)
+
+    def build(
+        self,
+        scenario: Dict[str, Any],
+        data_version: Optional[str] = None,
+        compact: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None
+    ) -> str:
+        """
+        Return the prompt for a scenario, memoized per (scenario id, data version, compact)
+
+        Without a data version the prompt is rendered but not memoized, since
+        there is nothing to tell stale data apart from current data. `compact`
+        (e.g. RelevanceFilter.compact) maps the scenario to the cut-down copy
+        that is rendered instead.
+        """
+        if data_version is None:
+            return self.render(compact(scenario) if compact else scenario, cached=False)
+
+        key = (scenario['id'], data_version, compact is not None)
+        with self._lock:
+            prompt = self._prompts.get(key)
+            if prompt is not None:
+                self.hits += 1
+                return prompt
+            self.misses += 1
+
+        # Two threads missing on the same key both render; the results are identical
+        prompt = self.render(compact(scenario) if compact else scenario, data_version=data_version)
+        with self._lock:
+            self._prompts.put(key, prompt)
+        return prompt
+
+    def clear(self):
+        with self._lock:
+            self._prompts.clear()
+            self._fragments.clear()
+
+
+# Shared by every CTAEGreenAgent in this process
+prompt_builder = PromptBuilder()
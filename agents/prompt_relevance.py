@@ -0,0 +1,195 @@
+"""
+CTAE-Green Prompt Relevance
+Cuts a scenario down to the manifest rows, emails and alerts its task refers to
+
+Compact prompts start from the scenario's anchors: the shipment ids and
+places (ports and regions, via the gazetteer) named in its name and task.
+From those:
+
+    alerts     "*" selections keep alerts naming an anchor id or place
+    scope      anchor places plus every kept alert's affected regions
+    emails     "*" selections keep emails naming a shipment id or a place in scope
+    shipments  "*" selections keep every shipment named by the task, a kept
+               alert or a kept email, plus up to `max_context_rows` more routed
+               through the scope (RegionIndex), largest value first
+
+Inputs that list ids explicitly are kept whole, since the scenario author
+already chose them. So is a manifest no longer than `max_context_rows`. A
+selection of "*" with nothing to anchor it (a portfolio-wide task) keeps
+every alert and lets the alerts define the scope. A note under the manifest
+gives the count and value of the rows left out, so totals such as "Total
+exposure > $50M" can still be worked out.
+
+Every critical fact that appears verbatim in the full prompt also appears in
+the compact one: facts missing after filtering are searched for in the
+dropped records, and the records containing them are put back.
+"""
+
+import re
+from typing import Dict, Any, List, Mapping, Set, Tuple, TYPE_CHECKING
+
+from prompt_builder import render_alert, render_email
+
+if TYPE_CHECKING:
+    from shipment_table import ShipmentSelection
+
+# Manifest rows kept for being in an affected area, beyond those named outright
+DEFAULT_MAX_CONTEXT_ROWS = 25
+
+# Candidate record ids in free text (checked against the manifest)
+RECORD_ID_PATTERN = re.compile(r"\b[A-Z][A-Z0-9]*(?:-[A-Z0-9]+)+\b")
+
+
+def _usd(amount) -> str:
+    """Exact dollar amount, so totals and thresholds can be checked against it"""
+    return f"${amount:,.0f}"
+
+
+class RelevanceFilter:
+    """
+    Builds relevance-filtered copies of a catalog's scenarios
+
+    Usage:
+        relevance = RelevanceFilter(catalog)
+        prompt_builder.build(scenario, data_version, compact=relevance.compact)
+    """
+
+    def __init__(self, catalog, max_context_rows: int = DEFAULT_MAX_CONTEXT_ROWS):
+        self.catalog = catalog
+        self.max_context_rows = max_context_rows
+
+    def _shipment_ids(self, text: str) -> Set[str]:
+        table = self.catalog.shipments
+        return {token for token in RECORD_ID_PATTERN.findall(text) if token in table}
+
+    def compact(self, scenario: Mapping[str, Any]) -> Dict[str, Any]:
+        """Relevance-filtered copy of a scenario, in the shape PromptBuilder.render expects"""
+        inputs = self.catalog.get_inputs(scenario['id'])
+        gazetteer = self.catalog.gazetteer
+        data = scenario['data']
+
+        task_text = f"{scenario['name']}\n{scenario['task']}"
+        ids = self._shipment_ids(task_text)
+        places = gazetteer.places_in(task_text)
+
+        alerts = list(data['risk_alerts'])
+        if inputs.get('alert_ids') == "*" and (ids or places):
+            alerts = [alert for alert in alerts if self._alert_matches(alert, ids, places)]
+        scope = set(places)
+        for alert in alerts:
+            scope.update(gazetteer.canonical(region) for region in alert.get('affected_regions', ()))
+            ids |= self._shipment_ids(render_alert(alert))
+
+        emails = list(data['emails'])
+        if inputs.get('email_ids') == "*" and (ids or scope):
+            emails = [email for email in emails if self._email_matches(email, ids, scope)]
+        for email in emails:
+            ids |= self._shipment_ids(render_email(email))
+
+        shipments, nearby = data['shipments'], None
+        if shipments.rows is None and len(shipments) > self.max_context_rows:
+            shipments, nearby = self._select_rows(shipments, ids, scope)
+
+        compact_data = {"emails": emails, "shipments": shipments, "risk_alerts": alerts}
+        self._restore_facts(scenario, data, compact_data)
+        note = None
+        if nearby is not None:
+            note = self._manifest_note(data['shipments'], compact_data['shipments'], nearby)
+
+        compact = dict(scenario)
+        compact['data'] = {
+            "emails": tuple(compact_data['emails']),
+            "shipments": compact_data['shipments'],
+            "risk_alerts": tuple(compact_data['risk_alerts']),
+            "manifest_note": note
+        }
+        return compact
+
+    def _alert_matches(self, alert: Mapping[str, Any], ids: Set[str], places: Set[str]) -> bool:
+        gazetteer = self.catalog.gazetteer
+        if any(gazetteer.canonical(region) in places for region in alert.get('affected_regions', ())):
+            return True
+        return bool(ids) and not ids.isdisjoint(self._shipment_ids(render_alert(alert)))
+
+    def _email_matches(self, email: Mapping[str, Any], ids: Set[str], scope: Set[str]) -> bool:
+        text = f"{email['subject']}\n{email['body']}"
+        if ids and not ids.isdisjoint(self._shipment_ids(text)):
+            return True
+        return not scope.isdisjoint(self.catalog.gazetteer.places_in(text))
+
+    def _select_rows(self, shipments: "ShipmentSelection", ids: Set[str], scope: Set[str]) -> Tuple["ShipmentSelection", List[int]]:
+        """Rows named outright plus the most valuable rows routed through the scope (and all of those)"""
+        from shipment_table import ShipmentSelection
+
+        table = shipments.table
+        named = {table.row_of(shipment_id) for shipment_id in ids}
+
+        nearby: Set[int] = set()
+        regions = self.catalog.regions
+        for region in scope:
+            nearby.update(map(table.row_of, regions.shipments_in_region(region)))
+        context = sorted(nearby - named, key=lambda row: (-table.exposure((row,)), row))
+
+        rows = tuple(sorted(named.union(context[:self.max_context_rows])))
+        return ShipmentSelection(table, rows), sorted(nearby)
+
+    def _manifest_note(self, full: "ShipmentSelection", kept: "ShipmentSelection", nearby: List[int]) -> str:
+        """Counts and exact values of what the compact manifest leaves out"""
+        table = full.table
+        left_out = len(full) - len(kept)
+        note = (
+            f"Showing {len(kept):,} of {len(full):,} shipments: those named in the task, alerts or emails, "
+            f"plus the most valuable routed through the affected areas. "
+            f"The other {left_out:,} shipments are worth {_usd(full.total_exposure - kept.total_exposure)}; "
+            f"all {len(full):,} total {_usd(full.total_exposure)}."
+        )
+        if nearby:
+            note += f" {len(nearby):,} shipments worth {_usd(table.exposure(nearby))} route through the affected areas."
+        return note
+
+    def _restore_facts(self, scenario: Mapping[str, Any], full: Mapping[str, Any], compact: Dict[str, Any]):
+        """Put back dropped records that hold a critical fact the compact selection lacks"""
+        kept_text = "\n".join([
+            scenario['name'], scenario['description'], scenario['task'],
+            *map(render_email, compact['emails']),
+            *map(render_alert, compact['risk_alerts']),
+            compact['shipments'].to_csv()
+        ]).casefold()
+        missing = [
+            fact for fact in (fact.casefold() for fact in self.catalog.get_ground_truth(scenario['id'])['critical_facts'])
+            if fact not in kept_text
+        ]
+        if not missing:
+            return
+
+        for key, render in (("emails", render_email), ("risk_alerts", render_alert)):
+            kept = {id(record) for record in compact[key]}
+            for record in full[key]:
+                if id(record) in kept:
+                    continue
+                text = render(record).casefold()
+                found = [fact for fact in missing if fact in text]
+                if found:
+                    compact[key].append(record)
+                    missing = [fact for fact in missing if fact not in found]
+            # Keep source order
+            order = {id(record): i for i, record in enumerate(full[key])}
+            compact[key].sort(key=lambda record: order[id(record)])
+
+        kept_rows = compact['shipments'].rows
+        if missing and kept_rows is not None:
+            table = compact['shipments'].table
+            rows = set(kept_rows)
+            for row in full['shipments'].row_numbers():
+                if row in rows:
+                    continue
+                line = table.render_row(row).casefold()
+                found = [fact for fact in missing if fact in line]
+                if found:
+                    rows.add(row)
+                    missing = [fact for fact in missing if fact not in found]
+                    if not missing:
+                        break
+            from shipment_table import ShipmentSelection
+            compact['shipments'] = ShipmentSelection(table, tuple(sorted(rows)))
+
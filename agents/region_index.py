@@ -0,0 +1,314 @@
+"""
+CTAE-Green Region Index
+Resolves risk alerts to the shipments they affect, and the value at risk
+
+A gazetteer (data/port_gazetteer.json) maps each port to the regions it sits
+in, and each shipping lane (a pair of ports) to the waters it passes
+through. A shipment's footprint is its origin's and destination's regions
+plus its lane's. An alert affects every shipment whose footprint shares a
+region with the alert's `affected_regions`.
+
+RegionIndex keeps every alert's exposure up to date. Exposure lookups are
+dict reads. Adding, changing or removing a shipment or alert only touches
+the alerts and shipments that share a region with it.
+"""
+
+import json
+import re
+import threading
+from itertools import chain
+from pathlib import Path
+from typing import Dict, Any, List, Iterable, Mapping, Optional, Set, FrozenSet, Tuple, Union
+
+from shipment_table import ShipmentTable
+
+GAZETTEER_FORMAT = 1
+
+# Exposure facts name the largest of these thresholds below the amount
+EXPOSURE_THRESHOLDS = [
+    mantissa * 10 ** exponent
+    for exponent in range(3, 13)
+    for mantissa in (1, 2, 5)
+]
+
+# Manifest columns a shipment's footprint and exposure are computed from
+SHIPMENT_FIELDS = ("shipment_id", "origin", "destination", "value_usd")
+
+Number = Union[int, float]
+
+
+def region_key(name: str) -> str:
+    """Case- and whitespace-insensitive form used to compare region and port names"""
+    return " ".join(str(name).casefold().split())
+
+
+def format_usd(amount: Number) -> str:
+    """$50M style amount (thresholds are round numbers)"""
+    for scale, suffix in ((10 ** 12, "T"), (10 ** 9, "B"), (10 ** 6, "M"), (10 ** 3, "K")):
+        if amount >= scale:
+            return f"${amount / scale:g}{suffix}"
+    return f"${amount:g}"
+
+
+def exposure_fact(amount: Number, label: str = "Total exposure") -> Optional[str]:
+    """Fact such as "Total exposure > $50M" (None below the smallest threshold)"""
+    below = [threshold for threshold in EXPOSURE_THRESHOLDS if threshold < amount]
+    if not below:
+        return None
+    return f"{label} > {format_usd(below[-1])}"
+
+
+class Gazetteer:
+    """Ports (with aliases) mapped to regions, and lanes mapped to the regions they cross"""
+
+    def __init__(self, ports: Mapping[str, Any], lanes: Iterable[Mapping[str, Any]] = ()):
+        self._canonical: Dict[str, str] = {}
+        self._port_regions: Dict[str, FrozenSet[str]] = {}
+        for name, info in ports.items():
+            port = region_key(name)
+            for alias in [name, *info.get("aliases", [])]:
+                self._canonical[region_key(alias)] = port
+            # A port is also a region of its own, so alerts may name it directly
+            self._port_regions[port] = frozenset(
+                [port, *(region_key(alias) for alias in info.get("aliases", [])),
+                 *(region_key(region) for region in info.get("regions", []))]
+            )
+
+        self._lanes: Dict[FrozenSet[str], FrozenSet[str]] = {}
+        for lane in lanes:
+            ends = frozenset(self.canonical(port) for port in lane["ports"])
+            self._lanes[ends] = frozenset(region_key(region) for region in lane.get("via", []))
+
+        self._routes: Dict[Tuple[str, str], FrozenSet[str]] = {}
+        self._place_pattern: Optional["re.Pattern"] = None
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "Gazetteer":
+        with open(path, 'r') as f:
+            doc = json.load(f)
+        if doc.get("format") != GAZETTEER_FORMAT:
+            raise ValueError(f"Unsupported gazetteer format: {doc.get('format')}")
+        return cls(doc.get("ports", {}), doc.get("lanes", []))
+
+    def canonical(self, port: str) -> str:
+        """Canonical key of a port name or alias (unknown ports map to their own key)"""
+        key = region_key(port)
+        return self._canonical.get(key, key)
+
+    def port_regions(self, port: str) -> FrozenSet[str]:
+        port = self.canonical(port)
+        return self._port_regions.get(port, frozenset([port]))
+
+    def places_in(self, text: str) -> Set[str]:
+        """Keys of the ports (canonical) and regions named in free text"""
+        if self._place_pattern is None:
+            names = set(self._canonical).union(*self._port_regions.values(), *self._lanes.values())
+            alternatives = "|".join(map(re.escape, sorted(names, key=len, reverse=True)))
+            self._place_pattern = re.compile(rf"(?<!\w)(?:{alternatives})(?!\w)")
+        return {self.canonical(name) for name in self._place_pattern.findall(region_key(text))}
+
+    def route_regions(self, origin: str, destination: str) -> FrozenSet[str]:
+        """Region keys a shipment from `origin` to `destination` touches"""
+        route = self._routes.get((origin, destination))
+        if route is None:
+            ends = frozenset((self.canonical(origin), self.canonical(destination)))
+            route = (
+                self.port_regions(origin)
+                | self.port_regions(destination)
+                | self._lanes.get(ends, frozenset())
+            )
+            self._routes[(origin, destination)] = route
+        return route
+
+
+class RegionIndex:
+    """
+    Incrementally maintained alert -> affected shipments / exposure index
+
+    Shipments on the same port pair share one footprint (a frozenset of region
+    keys), so the index works at footprint granularity. Each alert records the
+    footprints it covers. Its exposure is kept as a running total of those
+    footprints' values, and affected shipment ids are listed only on request.
+    Memory therefore grows with shipments plus alerts x footprints, never
+    with alerts x shipments.
+
+    Usage:
+        index = RegionIndex(gazetteer, shipment_table, alerts)
+        index.affected_shipments("RISK-2025-091")   # ["SHP-2025-1042", ...]
+        index.exposure("RISK-2025-091")             # total value_usd
+        index.upsert_shipment("SHP-9", "Houston", "Miami", 1_000_000)
+    """
+
+    def __init__(self, gazetteer: Gazetteer, shipments: Iterable[Any] = (), alerts: Iterable[Mapping[str, Any]] = ()):
+        self.gazetteer = gazetteer
+        self._shipment_footprint: Dict[str, FrozenSet[str]] = {}
+        self._values: Dict[str, Number] = {}
+        self._footprint_shipments: Dict[FrozenSet[str], Set[str]] = {}
+        self._footprint_value: Dict[FrozenSet[str], Number] = {}
+        self._footprint_alerts: Dict[FrozenSet[str], Set[str]] = {}
+        self._footprints_by_region: Dict[str, Set[FrozenSet[str]]] = {}
+        self._alert_regions: Dict[str, FrozenSet[str]] = {}
+        self._alert_footprints: Dict[str, Set[FrozenSet[str]]] = {}
+        self._exposure: Dict[str, Number] = {}
+        self._lock = threading.Lock()
+
+        # Bulk load: index every shipment first, then resolve each alert once
+        self._load_shipments(shipments)
+        for alert in alerts:
+            self._add_alert(alert)
+
+    def _load_shipments(self, shipments: Iterable[Any]):
+        if isinstance(shipments, ShipmentTable):
+            columns = [shipments.column(name) for name in SHIPMENT_FIELDS]
+        else:
+            columns = [[] for _ in SHIPMENT_FIELDS]
+            for shipment in shipments:
+                for column, name in zip(columns, SHIPMENT_FIELDS):
+                    column.append(shipment[name])
+        ids, origins, destinations, values = columns
+
+        # Later rows win, as in the manifest's id index
+        route = self.gazetteer.route_regions
+        self._shipment_footprint = dict(zip(ids, map(route, origins, destinations)))
+        self._values = dict(zip(ids, map(_value, values)))
+        for shipment_id, footprint in self._shipment_footprint.items():
+            members = self._footprint_shipments.get(footprint)
+            if members is None:
+                members = self._register_footprint(footprint)
+            members.add(shipment_id)
+            self._footprint_value[footprint] += self._values[shipment_id]
+
+    # -- Queries --
+
+    def affected_shipments(self, alert_id: str) -> List[str]:
+        """Ids of the shipments an alert affects, sorted"""
+        footprints = self._alert_footprints[alert_id]
+        return sorted(chain.from_iterable(self._footprint_shipments[footprint] for footprint in footprints))
+
+    def exposure(self, alert_id: str) -> Number:
+        """Total value_usd of the shipments an alert affects"""
+        return self._exposure[alert_id]
+
+    def impact(self, alert_ids: Optional[Iterable[str]] = None) -> Dict[str, Dict[str, Any]]:
+        """{alert_id: {"shipments": [...], "exposure": value}} for the given (default: all) alerts"""
+        ids = self._alert_regions if alert_ids is None else alert_ids
+        return {
+            alert_id: {"shipments": self.affected_shipments(alert_id), "exposure": self._exposure[alert_id]}
+            for alert_id in ids
+        }
+
+    def exposure_at_risk(self, alert_ids: Iterable[str], shipment_ids: Optional[Iterable[str]] = None) -> Number:
+        """Value of the shipments affected by any of the alerts (each shipment counted once)"""
+        footprints: Set[FrozenSet[str]] = set()
+        for alert_id in alert_ids:
+            footprints |= self._alert_footprints[alert_id]
+        if shipment_ids is None:
+            return sum(self._footprint_value[footprint] for footprint in footprints)
+        return sum(
+            self._values[shipment_id] for shipment_id in set(shipment_ids)
+            if self._shipment_footprint.get(shipment_id) in footprints
+        )
+
+    def shipments_in_region(self, region: str) -> List[str]:
+        footprints = self._footprints_by_region.get(region_key(region), ())
+        return sorted(chain.from_iterable(self._footprint_shipments[footprint] for footprint in footprints))
+
+    def __contains__(self, alert_id) -> bool:
+        return alert_id in self._alert_regions
+
+    # -- Incremental updates --
+
+    def upsert_shipment(self, shipment_id: str, origin: str, destination: str, value_usd: Any):
+        """Add or change a shipment, adjusting only the alerts that cover its old or new route"""
+        with self._lock:
+            self._remove_shipment(shipment_id)
+            self._add_shipment(shipment_id, origin, destination, _value(value_usd))
+
+    def remove_shipment(self, shipment_id: str):
+        with self._lock:
+            self._remove_shipment(shipment_id)
+
+    def upsert_alert(self, alert: Mapping[str, Any]):
+        """Add or change an alert, resolving only that alert"""
+        with self._lock:
+            self._remove_alert(alert['alert_id'])
+            self._add_alert(alert)
+
+    def remove_alert(self, alert_id: str):
+        with self._lock:
+            self._remove_alert(alert_id)
+
+    def _register_footprint(self, footprint: FrozenSet[str]) -> Set[str]:
+        """Start tracking a footprint, attaching it to the alerts that already cover it"""
+        members: Set[str] = set()
+        self._footprint_shipments[footprint] = members
+        self._footprint_value[footprint] = 0
+        covering: Set[str] = set()
+        for region in footprint:
+            self._footprints_by_region.setdefault(region, set()).add(footprint)
+        for alert_id, regions in self._alert_regions.items():
+            if not regions.isdisjoint(footprint):
+                covering.add(alert_id)
+                self._alert_footprints[alert_id].add(footprint)
+        self._footprint_alerts[footprint] = covering
+        return members
+
+    def _add_shipment(self, shipment_id: str, origin: str, destination: str, value: Number):
+        footprint = self.gazetteer.route_regions(origin, destination)
+        members = self._footprint_shipments.get(footprint)
+        if members is None:
+            members = self._register_footprint(footprint)
+        members.add(shipment_id)
+        self._shipment_footprint[shipment_id] = footprint
+        self._values[shipment_id] = value
+        self._footprint_value[footprint] += value
+        for alert_id in self._footprint_alerts[footprint]:
+            self._exposure[alert_id] += value
+
+    def _remove_shipment(self, shipment_id: str):
+        footprint = self._shipment_footprint.pop(shipment_id, None)
+        if footprint is None:
+            return
+        value = self._values.pop(shipment_id)
+        self._footprint_shipments[footprint].discard(shipment_id)
+        self._footprint_value[footprint] -= value
+        for alert_id in self._footprint_alerts[footprint]:
+            self._exposure[alert_id] -= value
+
+    def _add_alert(self, alert: Mapping[str, Any]):
+        alert_id = alert['alert_id']
+        regions = frozenset(region_key(region) for region in alert.get('affected_regions', ()))
+        footprints: Set[FrozenSet[str]] = set()
+        for region in regions:
+            footprints |= self._footprints_by_region.get(region, set())
+        for footprint in footprints:
+            self._footprint_alerts[footprint].add(alert_id)
+        self._alert_regions[alert_id] = regions
+        self._alert_footprints[alert_id] = footprints
+        self._exposure[alert_id] = sum(self._footprint_value[footprint] for footprint in footprints)
+
+    def _remove_alert(self, alert_id: str):
+        if self._alert_regions.pop(alert_id, None) is None:
+            return
+        for footprint in self._alert_footprints.pop(alert_id):
+            self._footprint_alerts[footprint].discard(alert_id)
+        del self._exposure[alert_id]
+
+
+def exposure_at_risk(gazetteer: Gazetteer, alerts: Iterable[Mapping[str, Any]], shipments: Iterable[Any]) -> Number:
+    """Value of the given shipments touched by any of the alerts, checked directly (no index)"""
+    regions = {region_key(region) for alert in alerts for region in alert.get('affected_regions', ())}
+    return sum(
+        _value(shipment['value_usd']) for shipment in shipments
+        if not regions.isdisjoint(gazetteer.route_regions(shipment['origin'], shipment['destination']))
+    )
+
+
+def _value(value_usd: Any) -> Number:
+    """Numeric value_usd (text or missing values count as 0)"""
+    if isinstance(value_usd, (int, float)):
+        return value_usd
+    try:
+        return float(value_usd)
+    except (TypeError, ValueError):
+        return 0
@@ -0,0 +1,183 @@
+"""
+CTAE-Green Report Writer
+Streams evaluation reports section by section in text, JSON or CSV
+"""
+
+import csv
+import io
+import json
+from pathlib import Path
+from typing import Dict, Any, Iterable, Iterator, Union, TextIO
+
+# Per-scenario score columns, in report order
+SCORE_FIELDS = [
+    "data_extraction_accuracy",
+    "risk_reasoning_quality",
+    "recommendation_coherence",
+    "response_time_score",
+    "overall_score"
+]
+
+CSV_COLUMNS = ["scenario_id", "scenario_name", "difficulty", "response_time_seconds"] + \
+    SCORE_FIELDS + ["performance_tier"]
+
+MEDIA_TYPES = {
+    "text": "text/plain; charset=utf-8",
+    "json": "application/json",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+def performance_tier(overall: float) -> str:
+    """Map an overall score to its performance tier"""
+    if overall >= 80:
+        return "EXCELLENT"
+    elif overall >= 60:
+        return "GOOD"
+    elif overall >= 40:
+        return "FAIR"
+    return "NEEDS IMPROVEMENT"
+
+
+class ReportAccumulator:
+    """Running sums of the aggregate metrics, updated one result at a time"""
+
+    def __init__(self):
+        self.count = 0
+        self.overall = 0
+        self.extraction = 0
+        self.reasoning = 0
+        self.recommendations = 0
+
+    def add(self, scores: Dict[str, Any]):
+        self.count += 1
+        self.overall += scores['overall_score']
+        self.extraction += scores['data_extraction_accuracy']
+        self.reasoning += scores['risk_reasoning_quality']
+        self.recommendations += scores['recommendation_coherence']
+
+    def averages(self) -> Dict[str, float]:
+        """Average of each metric (raises ZeroDivisionError if nothing was added)"""
+        return {
+            "overall_score": self.overall / self.count,
+            "data_extraction": self.extraction / self.count,
+            "risk_reasoning": self.reasoning / self.count,
+            "recommendations": self.recommendations / self.count
+        }
+
+
+def iter_text_report(results: Iterable[Dict[str, Any]]) -> Iterator[str]:
+    """Human-readable report, one scenario section at a time"""
+    yield (
+        "=" * 60 + "\n"
+        "CTAE-GREEN EVALUATION REPORT\n"
+        "Commodity Trade Agent Evaluation\n"
+        + "=" * 60 + "\n\n"
+    )
+
+    totals = ReportAccumulator()
+    for i, result in enumerate(results, 1):
+        scores = result['scores']
+        totals.add(scores)
+        yield (
+            f"\n{'=' * 60}\n"
+            f"SCENARIO {i}: {result['scenario_name']}\n"
+            f"{'=' * 60}\n"
+            f"Difficulty: {result['difficulty']}\n"
+            f"Agent Response Time: {scores['response_time_seconds']}s\n\n"
+            "SCORES:\n"
+            f"  Data Extraction Accuracy:    {scores['data_extraction_accuracy']}/100\n"
+            f"  Risk Reasoning Quality:      {scores['risk_reasoning_quality']}/100\n"
+            f"  Recommendation Coherence:    {scores['recommendation_coherence']}/100\n"
+            f"  Response Time Score:         {scores['response_time_score']}/100\n"
+            f"  -------------------------------\n"
+            f"  OVERALL SCORE:               {scores['overall_score']}/100\n"
+            f"\n  Performance Tier: {performance_tier(scores['overall_score'])}\n"
+        )
+
+    averages = totals.averages()
+    yield (
+        f"\n\n{'=' * 60}\n"
+        "AGGREGATE PERFORMANCE\n"
+        f"{'=' * 60}\n"
+        f"Average Overall Score:          {averages['overall_score']:.2f}/100\n"
+        f"Average Data Extraction:        {averages['data_extraction']:.2f}/100\n"
+        f"Average Risk Reasoning:         {averages['risk_reasoning']:.2f}/100\n"
+        f"Average Recommendation Quality: {averages['recommendations']:.2f}/100\n"
+    )
+
+
+def iter_json_report(results: Iterable[Dict[str, Any]]) -> Iterator[str]:
+    """JSON document {"results": [...], "aggregate": {...}}, one result at a time"""
+    yield '{"results": ['
+    totals = ReportAccumulator()
+    for result in results:
+        totals.add(result['scores'])
+        yield ("" if totals.count == 1 else ", ") + json.dumps(result)
+
+    averages = totals.averages() if totals.count else None
+    aggregate = {"scenarios_evaluated": totals.count}
+    if averages is not None:
+        aggregate.update({k: round(v, 2) for k, v in averages.items()})
+        aggregate["performance_tier"] = performance_tier(averages['overall_score'])
+    yield '], "aggregate": ' + json.dumps(aggregate) + '}\n'
+
+
+def iter_csv_report(results: Iterable[Dict[str, Any]]) -> Iterator[str]:
+    """CSV with one row per scenario and a final AVERAGE row"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def flush() -> str:
+        text = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return text
+
+    writer.writerow(CSV_COLUMNS)
+    yield flush()
+
+    totals = ReportAccumulator()
+    for result in results:
+        scores = result['scores']
+        totals.add(scores)
+        writer.writerow(
+            [result.get('scenario_id', ""), result['scenario_name'], result['difficulty'], scores['response_time_seconds']]
+            + [scores[field] for field in SCORE_FIELDS]
+            + [performance_tier(scores['overall_score'])]
+        )
+        yield flush()
+
+    if totals.count:
+        averages = totals.averages()
+        writer.writerow(
+            ["AVERAGE", "", "", "",
+             round(averages['data_extraction'], 2), round(averages['risk_reasoning'], 2),
+             round(averages['recommendations'], 2), "", round(averages['overall_score'], 2),
+             performance_tier(averages['overall_score'])]
+        )
+        yield flush()
+
+
+REPORT_FORMATS = {
+    "text": iter_text_report,
+    "json": iter_json_report,
+    "csv": iter_csv_report,
+}
+
+
+def iter_report(results: Iterable[Dict[str, Any]], fmt: str = "text") -> Iterator[str]:
+    """Stream a report in the given format ("text", "json" or "csv")"""
+    if fmt not in REPORT_FORMATS:
+        raise ValueError(f"Unknown report format: {fmt} (expected one of {', '.join(REPORT_FORMATS)})")
+    return REPORT_FORMATS[fmt](results)
+
+
+def write_report(results: Iterable[Dict[str, Any]], destination: Union[str, Path, TextIO], fmt: str = "text") -> None:
+    """Write a report section by section to a path or an open text file"""
+    if isinstance(destination, (str, Path)):
+        with open(destination, 'w', newline="") as f:
+            write_report(results, f, fmt)
+        return
+    for chunk in iter_report(results, fmt):
+        destination.write(chunk)
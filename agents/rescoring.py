@@ -0,0 +1,160 @@
+"""
+CTAE-Green Re-scoring
+Streams an archive of white agent responses through the current rubric
+
+Input is JSONL, one record per line:
+
+    {"scenario_id": "scenario_01", "response": {...}, "response_time": 12.3, ...}
+
+"response" may also be the white agent's raw reply text (e.g. markdown with a
+```json block), which is parsed with the tolerant response parser.
+
+Output is JSONL in input order: each record's fields minus "response", plus
+"scores". Lines that cannot be scored produce {"line": n, "error": "..."}.
+"""
+
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+
+from green_agent import CTAEGreenAgent
+
+DEFAULT_CHUNK_SIZE = 1000
+
+# Green agent used by re-scoring worker processes
+_worker_agent: Optional[CTAEGreenAgent] = None
+
+
+def _init_worker(data_dir: str):
+    global _worker_agent
+    _worker_agent = CTAEGreenAgent(data_dir)
+
+
+def _score_one(green_agent: CTAEGreenAgent, record: Dict[str, Any], response_time: float):
+    """Scores for one record, or the exception that scoring it raised"""
+    try:
+        return green_agent.evaluate_response(record["scenario_id"], record["response"], response_time)
+    except Exception as e:
+        return e
+
+
+def score_chunk(first_line: int, lines: List[str], green_agent: CTAEGreenAgent = None) -> Tuple[List[str], int]:
+    """
+    Score a chunk of raw JSONL lines
+
+    Args:
+        first_line: 1-based line number of lines[0] (for error records)
+        lines: Raw input lines (blank lines are skipped)
+        green_agent: Agent to score with (defaults to the worker's agent)
+
+    Returns:
+        (one serialized output line per input line in order, number of error lines)
+    """
+    green_agent = green_agent or _worker_agent
+    output: List[Optional[str]] = [None] * len(lines)
+    pending: List[Tuple[int, Dict[str, Any], float]] = []
+
+    errors = 0
+    for i, line in enumerate(lines):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+            if record.get("scenario_id") not in green_agent.catalog:
+                raise ValueError(f"Unknown scenario: {record.get('scenario_id')}")
+            if not isinstance(record.get("response"), (dict, str)):
+                raise ValueError("Missing or invalid 'response' (expected an object or raw reply text)")
+            response_time = float(record.get("response_time", 0))
+            pending.append((i, record, response_time))
+        except (ValueError, TypeError, AttributeError) as e:
+            output[i] = json.dumps({"line": first_line + i, "error": str(e)})
+            errors += 1
+
+    if pending:
+        try:
+            scores = green_agent.evaluate_batch(
+                [record["scenario_id"] for _, record, _ in pending],
+                [record["response"] for _, record, _ in pending],
+                [response_time for _, _, response_time in pending]
+            )
+        except Exception:
+            # One unscorable record fails the whole batch; score one by one to isolate it
+            scores = [_score_one(green_agent, record, response_time) for _, record, response_time in pending]
+        for (i, record, _), record_scores in zip(pending, scores):
+            if isinstance(record_scores, Exception):
+                output[i] = json.dumps({"line": first_line + i, "error": f"Could not score response: {record_scores}"})
+                errors += 1
+                continue
+            out = {k: v for k, v in record.items() if k != "response"}
+            out["scores"] = record_scores
+            output[i] = json.dumps(out)
+
+    return [line for line in output if line is not None], errors
+
+
+def _read_chunks(path: str, chunk_size: int) -> Iterator[Tuple[int, List[str]]]:
+    """Yield (first line number, lines) chunks without reading the whole file"""
+    with open(path, 'r') as f:
+        line_no = 1
+        while True:
+            lines = list(islice(f, chunk_size))
+            if not lines:
+                return
+            yield line_no, lines
+            line_no += len(lines)
+
+
+def rescore_archive(
+    input_path: str,
+    output_path: str,
+    data_dir: str,
+    workers: int = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Dict[str, Any]:
+    """
+    Re-score an archive on a process pool, writing results in input order
+
+    At most 2 × workers chunks are in flight, so memory stays bounded by
+    chunk_size regardless of archive size.
+
+    Returns:
+        Run statistics (records, errors, seconds)
+    """
+    workers = workers or os.cpu_count() or 1
+    records = errors = 0
+    start = time.perf_counter()
+
+    with open(output_path, 'w') as out:
+        def write(chunk: Tuple[List[str], int]):
+            nonlocal records, errors
+            lines, chunk_errors = chunk
+            records += len(lines)
+            errors += chunk_errors
+            for line in lines:
+                out.write(line)
+                out.write("\n")
+
+        if workers == 1:
+            green_agent = CTAEGreenAgent(data_dir)
+            for first_line, lines in _read_chunks(input_path, chunk_size):
+                write(score_chunk(first_line, lines, green_agent))
+        else:
+            max_in_flight = workers * 2
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(data_dir,)) as pool:
+                in_flight = deque()
+                for first_line, lines in _read_chunks(input_path, chunk_size):
+                    in_flight.append(pool.submit(score_chunk, first_line, lines))
+                    if len(in_flight) >= max_in_flight:
+                        write(in_flight.popleft().result())
+                while in_flight:
+                    write(in_flight.popleft().result())
+
+    return {
+        "records": records,
+        "errors": errors,
+        "seconds": time.perf_counter() - start
+    }
@@ -0,0 +1,312 @@
+"""
+CTAE-Green Response Parser
+Tolerant, incremental extraction of the scored fields from white agent output
+
+White agents (usually LLMs) reply with raw JSON, an A2A envelope
+({"status": ..., "result": {...}}) or markdown around a ```json fenced block,
+and long replies are sometimes cut off. StreamingResponseParser scans the body
+chunk by chunk and keeps only the values of SCORED_FIELDS. It reports when
+all of them are complete so the caller can stop reading. Everything else
+(e.g. a multi-megabyte "reasoning" string) is skipped without being stored.
+
+A scored field whose value is null (or cannot be parsed even after repair)
+is dropped: it is absent from the result, not present as None, and scores
+the same as a reply that left it out.
+"""
+
+import json
+import re
+from typing import Dict, Any, List, Optional, Union
+
+# Top-level response fields read by the scoring rubric
+SCORED_FIELDS = ("extracted_data", "risk_assessment", "recommendations")
+
+# Prose kept before the JSON starts, for replies with neither a fence nor a leading "{"
+MAX_PRELUDE_CHARS = 64 * 1024
+
+# Longer object keys are not field names we look for, so they are not kept
+MAX_KEY_CHARS = 256
+
+# Truncation repair gives up after this many candidate cut points
+MAX_REPAIR_ATTEMPTS = 32
+
+FENCE = "```"
+
+_STRUCTURAL = re.compile(r'[{}\[\]",:]')
+
+
+def _closers(stack: List[str]) -> str:
+    return "".join("}" if opener == "{" else "]" for opener in reversed(stack))
+
+
+def repair_json(text: str) -> Any:
+    """
+    Parse JSON that may have been cut off mid-value
+
+    Closes an unterminated string and any open brackets; if that is still not
+    valid, drops trailing incomplete elements until it is.
+
+    Raises:
+        ValueError: Nothing parseable remains
+    """
+    stack: List[str] = []
+    cuts = []  # (position to cut at, closers needed there), in text order
+    in_string = escape = False
+    for pos, ch in enumerate(text):
+        if in_string:
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch in "{[":
+            parent = stack[-1] if stack else None
+            stack.append(ch)
+            # An empty object inside a list would still count as an element, so
+            # partial list items are dropped at the preceding "," or "[" instead
+            if ch == "[" or parent != "[":
+                cuts.append((pos + 1, _closers(stack)))
+        elif ch in "}]":
+            if stack:
+                stack.pop()
+        elif ch == ",":
+            cuts.append((pos, _closers(stack)))
+
+    tail = text
+    if in_string:
+        tail = (text[:-1] if escape else text) + '"'
+
+    def candidates():
+        yield tail + _closers(stack)
+        for pos, closers in reversed(cuts[-MAX_REPAIR_ATTEMPTS:]):
+            yield text[:pos] + closers
+
+    for candidate in candidates():
+        try:
+            return json.loads(candidate, strict=False)
+        except ValueError:
+            continue
+    raise ValueError("Could not repair truncated JSON")
+
+
+def _loads_tolerant(text: str):
+    """Parse a captured value, repairing truncation; None if nothing usable"""
+    try:
+        return json.loads(text, strict=False)
+    except ValueError:
+        pass
+    try:
+        return repair_json(text)
+    except ValueError:
+        return None
+
+
+class StreamingResponseParser:
+    """
+    Incrementally extracts SCORED_FIELDS from a white agent reply
+
+    Usage:
+        parser = StreamingResponseParser()
+        for chunk in body:
+            if parser.feed(chunk):
+                break               # every scored field is complete
+        response = parser.close()   # {field: value} for the fields found
+
+    Null-valued fields are not "found": they are left out of close()'s result
+    and do not count towards stopping early.
+    """
+
+    def __init__(self, fields=SCORED_FIELDS):
+        self.fields = tuple(fields)
+        self.values: Dict[str, Any] = {}
+        self.found_json = False
+        self.done = False
+
+        # Before the JSON object starts
+        self._prose = False
+        self._fenced = False
+        self._fence_tail = ""
+        self._prelude: List[str] = []
+        self._prelude_size = 0
+
+        # Inside the JSON object
+        self._stack: List[str] = []
+        self._root_depth = 1          # 2 once an A2A envelope's "result" object is entered
+        self._in_string = False
+        self._escape = False
+        self._expect_key = False
+        self._key: Optional[List[str]] = None
+        self._key_size = 0
+        self._last_key: Optional[str] = None
+        self._capture: Optional[List[str]] = None
+        self._capture_key: Optional[str] = None
+
+    def feed(self, text: str) -> bool:
+        """Consume the next chunk of the reply; returns True once nothing more needs reading"""
+        if self.done or not text:
+            return self.done
+        start = 0
+        if not self.found_json:
+            start = self._find_start(text)
+            if start < 0:
+                return False
+            self.found_json = True
+        self._scan(text, start)
+        return self.done
+
+    def close(self) -> Dict[str, Any]:
+        """Finish parsing (repairing a truncated value) and return the scored fields found"""
+        if not self.done:
+            if self._capture is not None:
+                self._finish_capture("", 0, 0)
+            elif not self.found_json and not self._fenced and self._prelude:
+                # Neither a fence nor a leading "{": fall back to the first brace in the prose
+                prelude = "".join(self._prelude)
+                brace = prelude.find("{")
+                if brace >= 0:
+                    fallback = StreamingResponseParser(self.fields)
+                    fallback.feed(prelude[brace:])
+                    self.values = fallback.close()
+                    self.found_json = True
+            self.done = True
+        self._prelude = []
+        return dict(self.values)
+
+    def _find_start(self, text: str) -> int:
+        """Index in `text` where the JSON object starts, or -1 if it has not started yet"""
+        start = 0
+        if not self._fenced:
+            if not self._prose:
+                stripped = text.lstrip()
+                if not stripped:
+                    return -1
+                if stripped[0] == "{":
+                    return len(text) - len(stripped)
+                self._prose = True
+
+            if self._prelude_size < MAX_PRELUDE_CHARS:
+                kept = text[:MAX_PRELUDE_CHARS - self._prelude_size]
+                self._prelude.append(kept)
+                self._prelude_size += len(kept)
+
+            # The fence may straddle two chunks
+            window = self._fence_tail + text
+            pos = window.find(FENCE)
+            if pos < 0:
+                self._fence_tail = window[-(len(FENCE) - 1):]
+                return -1
+            self._fenced = True
+            self._prelude = []
+            start = max(0, pos + len(FENCE) - len(self._fence_tail))
+        return text.find("{", start)
+
+    def _scan(self, text: str, i: int):
+        n = len(text)
+        stack = self._stack
+        capture_start = i if self._capture is not None else None
+        key_start = i if self._key is not None else None
+
+        if self._escape:
+            self._escape = False
+            i += 1
+
+        while i < n:
+            if self._in_string:
+                j = text.find('"', i)
+                if j < 0:
+                    # An odd run of trailing backslashes escapes the next chunk's first character
+                    run = len(text) - len(text.rstrip("\\"))
+                    self._escape = min(run, n - i) % 2 == 1
+                    break
+                backslashes = 0
+                while j - backslashes > i and text[j - backslashes - 1] == "\\":
+                    backslashes += 1
+                i = j + 1
+                if backslashes % 2:
+                    continue
+                self._in_string = False
+                if self._key is not None:
+                    self._key.append(text[key_start:j])
+                    self._last_key = "".join(self._key)
+                    self._key = None
+                continue
+
+            m = _STRUCTURAL.search(text, i)
+            if m is None:
+                break
+            j = m.start()
+            ch = text[j]
+            i = j + 1
+            depth = len(stack)
+
+            if ch == '"':
+                self._in_string = True
+                if self._expect_key and depth == self._root_depth:
+                    self._expect_key = False
+                    self._key = []
+                    self._key_size = 0
+                    key_start = i
+            elif ch == ":":
+                if depth == self._root_depth and self._last_key in self.fields and self._last_key not in self.values:
+                    self._capture = []
+                    self._capture_key = self._last_key
+                    capture_start = i
+            elif ch == ",":
+                if depth == self._root_depth:
+                    self._finish_capture(text, capture_start, j)
+                    capture_start = None
+                    self._expect_key = True
+                    self._last_key = None
+                    if self.done:
+                        return
+            elif ch in "{[":
+                if (ch == "{" and depth == 1 and self._root_depth == 1 and self._last_key == "result"
+                        and not self.values and self._capture is None):
+                    # A2A envelope: score the "result" object instead
+                    self._root_depth = 2
+                stack.append(ch)
+                if ch == "{" and len(stack) == self._root_depth:
+                    self._expect_key = True
+            else:
+                if depth <= self._root_depth:
+                    # The scored object (or the whole document) is complete
+                    self._finish_capture(text, capture_start, j)
+                    self.done = True
+                    return
+                stack.pop()
+
+        # Carry partial values over to the next chunk
+        if self._capture is not None:
+            self._capture.append(text[capture_start:])
+        if self._key is not None:
+            self._key_size += n - key_start
+            if self._key_size > MAX_KEY_CHARS:
+                self._key = None
+                self._last_key = None
+            else:
+                self._key.append(text[key_start:])
+
+    def _finish_capture(self, text: str, start: Optional[int], end: int):
+        if self._capture is None:
+            return
+        self._capture.append(text[start:end])
+        value = _loads_tolerant("".join(self._capture))
+        self._capture = None
+        if value is not None:
+            self.values[self._capture_key] = value
+        if all(field in self.values for field in self.fields):
+            self.done = True
+
+
+def parse_response(body: Union[str, bytes, Dict[str, Any]]) -> Dict[str, Any]:
+    """Scored fields of a complete white agent reply (dicts are returned unchanged)"""
+    if isinstance(body, dict):
+        return body
+    if isinstance(body, bytes):
+        body = body.decode("utf-8", errors="replace")
+    parser = StreamingResponseParser()
+    parser.feed(body)
+    return parser.close()
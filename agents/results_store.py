@@ -0,0 +1,249 @@
+"""
+CTAE-Green Results Store
+Persistent history of every scenario score, with incrementally maintained leaderboards
+
+Every scored scenario becomes one row of `results`. The row records the
+agent, scenario, run id, rubric version (rubric.RUBRIC_VERSION), data
+version and timestamp. Insert triggers fold each row into two aggregate
+tables as it arrives:
+
+    leaderboard      per (rubric_version, agent_id)
+    scenario_scores  per (rubric_version, scenario_id, agent_id)
+
+Each aggregate table keeps running sums, a running average and the best
+score. Rank indexes on the average make leaderboard queries an index range
+scan over the agents rather than a rescan of the results, so they stay in
+the milliseconds however much history accumulates. The file is opened per
+process in WAL mode, so the launcher and every server worker can write to
+it concurrently.
+"""
+
+import os
+import time
+import uuid
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Union
+
+from rubric import RUBRIC_VERSION
+from server_state import SQLiteDatabase
+
+# Default database location (override with CTAE_RESULTS_DB or --results-db)
+DEFAULT_RESULTS_DB = Path(__file__).resolve().parent.parent / "ctae_results.sqlite3"
+
+_SUMS = """
+    results INTEGER NOT NULL,
+    sum_overall REAL NOT NULL,
+    sum_extraction REAL NOT NULL,
+    sum_reasoning REAL NOT NULL,
+    sum_recommendations REAL NOT NULL,
+    sum_response_time REAL NOT NULL,
+    avg_overall REAL NOT NULL,
+    best_overall REAL NOT NULL,
+    last_recorded_at REAL NOT NULL"""
+
+# Folds NEW into an aggregate row: the first result inserts it, later ones update it
+_UPSERT_VALUES = """
+        NEW.agent_name, 1, NEW.overall_score, NEW.data_extraction_accuracy, NEW.risk_reasoning_quality,
+        NEW.recommendation_coherence, NEW.response_time_score, NEW.overall_score, NEW.overall_score, NEW.recorded_at"""
+_UPSERT_SET = """
+        agent_name = COALESCE(excluded.agent_name, agent_name),
+        results = results + 1,
+        sum_overall = sum_overall + excluded.sum_overall,
+        sum_extraction = sum_extraction + excluded.sum_extraction,
+        sum_reasoning = sum_reasoning + excluded.sum_reasoning,
+        sum_recommendations = sum_recommendations + excluded.sum_recommendations,
+        sum_response_time = sum_response_time + excluded.sum_response_time,
+        avg_overall = (sum_overall + excluded.sum_overall) / (results + 1),
+        best_overall = MAX(best_overall, excluded.best_overall),
+        last_recorded_at = MAX(last_recorded_at, excluded.last_recorded_at)"""
+
+_AGGREGATE_COLUMNS = (
+    "agent_name, results, sum_overall, sum_extraction, sum_reasoning, sum_recommendations, "
+    "sum_response_time, avg_overall, best_overall, last_recorded_at"
+)
+
+RESULTS_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY,
+    run_id TEXT NOT NULL,
+    agent_id TEXT NOT NULL,
+    agent_name TEXT,
+    scenario_id TEXT NOT NULL,
+    rubric_version TEXT NOT NULL,
+    data_version TEXT,
+    recorded_at REAL NOT NULL,
+    overall_score REAL NOT NULL,
+    data_extraction_accuracy REAL NOT NULL,
+    risk_reasoning_quality REAL NOT NULL,
+    recommendation_coherence REAL NOT NULL,
+    response_time_score REAL NOT NULL,
+    response_time_seconds REAL NOT NULL,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS results_by_agent ON results (agent_id, rubric_version, scenario_id, recorded_at);
+CREATE INDEX IF NOT EXISTS results_by_run ON results (run_id);
+
+CREATE TABLE IF NOT EXISTS leaderboard (
+    rubric_version TEXT NOT NULL,
+    agent_id TEXT NOT NULL,
+    agent_name TEXT,{_SUMS},
+    PRIMARY KEY (rubric_version, agent_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS leaderboard_rank ON leaderboard (rubric_version, avg_overall DESC);
+
+CREATE TABLE IF NOT EXISTS scenario_scores (
+    rubric_version TEXT NOT NULL,
+    scenario_id TEXT NOT NULL,
+    agent_id TEXT NOT NULL,
+    agent_name TEXT,{_SUMS},
+    PRIMARY KEY (rubric_version, scenario_id, agent_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS scenario_scores_rank ON scenario_scores (rubric_version, scenario_id, avg_overall DESC);
+
+CREATE TRIGGER IF NOT EXISTS results_aggregate AFTER INSERT ON results
+BEGIN
+    INSERT INTO leaderboard (rubric_version, agent_id, {_AGGREGATE_COLUMNS})
+    VALUES (NEW.rubric_version, NEW.agent_id, {_UPSERT_VALUES})
+    ON CONFLICT (rubric_version, agent_id) DO UPDATE SET {_UPSERT_SET};
+
+    INSERT INTO scenario_scores (rubric_version, scenario_id, agent_id, {_AGGREGATE_COLUMNS})
+    VALUES (NEW.rubric_version, NEW.scenario_id, NEW.agent_id, {_UPSERT_VALUES})
+    ON CONFLICT (rubric_version, scenario_id, agent_id) DO UPDATE SET {_UPSERT_SET};
+END;
+"""
+
+_RESULT_COLUMNS = (
+    "run_id, agent_id, agent_name, scenario_id, rubric_version, data_version, recorded_at, "
+    "overall_score, data_extraction_accuracy, risk_reasoning_quality, recommendation_coherence, "
+    "response_time_score, response_time_seconds, error"
+)
+
+
+def default_results_path() -> Path:
+    return Path(os.environ.get("CTAE_RESULTS_DB", DEFAULT_RESULTS_DB))
+
+
+class ResultsStore(SQLiteDatabase):
+    """
+    SQLite results history plus leaderboards
+
+    Usage:
+        store = ResultsStore()
+        store.record("strong_analyst", results, agent_name="Strong Analyst")
+        store.leaderboard(limit=10)
+    """
+
+    schema = RESULTS_SCHEMA
+
+    def __init__(self, path: Optional[Union[str, Path]] = None):
+        super().__init__(path if path is not None else default_results_path())
+
+    def record(
+        self,
+        agent_id: str,
+        results: List[Dict[str, Any]],
+        agent_name: Optional[str] = None,
+        run_id: Optional[str] = None,
+        data_version: Optional[str] = None,
+        rubric_version: str = RUBRIC_VERSION,
+        recorded_at: Optional[float] = None
+    ) -> str:
+        """
+        Persist one run's per-scenario results (dicts with scenario_id and scores)
+
+        Returns:
+            The run id the rows were recorded under
+        """
+        run_id = run_id or uuid.uuid4().hex
+        recorded_at = recorded_at if recorded_at is not None else time.time()
+        rows = []
+        for result in results:
+            scores = result['scores']
+            rows.append((
+                run_id, agent_id, agent_name, result['scenario_id'], rubric_version, data_version, recorded_at,
+                scores['overall_score'], scores['data_extraction_accuracy'], scores['risk_reasoning_quality'],
+                scores['recommendation_coherence'], scores['response_time_score'],
+                scores.get('response_time_seconds', 0.0), result.get('error')
+            ))
+        with self.transaction() as db:
+            db.executemany(
+                f"INSERT INTO results ({_RESULT_COLUMNS}) VALUES ({', '.join('?' * 14)})",
+                rows
+            )
+        return run_id
+
+    def leaderboard(
+        self,
+        rubric_version: str = RUBRIC_VERSION,
+        scenario_id: Optional[str] = None,
+        limit: Optional[int] = None,
+        offset: int = 0
+    ) -> List[Dict[str, Any]]:
+        """
+        Agents ranked by average overall score, over all runs recorded under a rubric version
+
+        Entries share the shape of the launcher's per-agent results
+        (agent_id, agent_name, aggregate), plus rank, result count, best
+        score and last recorded time. `scenario_id` ranks agents on that
+        scenario alone.
+        """
+        if scenario_id is None:
+            where, params = "rubric_version = ?", [rubric_version]
+            table = "leaderboard"
+        else:
+            where, params = "rubric_version = ? AND scenario_id = ?", [rubric_version, scenario_id]
+            table = "scenario_scores"
+        rows = self.execute(
+            f"SELECT agent_id, {_AGGREGATE_COLUMNS} FROM {table} WHERE {where} "
+            "ORDER BY avg_overall DESC, agent_id LIMIT ? OFFSET ?",
+            params + [limit if limit is not None else -1, offset]
+        ).fetchall()
+
+        entries = []
+        for rank, row in enumerate(rows, offset + 1):
+            (agent_id, agent_name, count, overall, extraction, reasoning,
+             recommendations, response_time, _, best, last_recorded_at) = row
+            entries.append({
+                "rank": rank,
+                "agent_id": agent_id,
+                "agent_name": agent_name or agent_id,
+                "results": count,
+                "aggregate": {
+                    "overall_score": round(overall / count, 2),
+                    "data_extraction": round(extraction / count, 2),
+                    "risk_reasoning": round(reasoning / count, 2),
+                    "recommendations": round(recommendations / count, 2),
+                    "response_time": round(response_time / count, 2)
+                },
+                "best_overall": best,
+                "last_recorded_at": last_recorded_at
+            })
+        return entries
+
+    def history(
+        self,
+        agent_id: Optional[str] = None,
+        scenario_id: Optional[str] = None,
+        run_id: Optional[str] = None,
+        limit: int = 100
+    ) -> List[Dict[str, Any]]:
+        """Most recent recorded results, optionally filtered by agent, scenario or run"""
+        clauses, params = [], []
+        for column, value in (("agent_id", agent_id), ("scenario_id", scenario_id), ("run_id", run_id)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        cursor = self.execute(
+            f"SELECT {_RESULT_COLUMNS} FROM results {where} ORDER BY recorded_at DESC, id DESC LIMIT ?",
+            params + [limit]
+        )
+        columns = [description[0] for description in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def total_results(self, rubric_version: str = RUBRIC_VERSION) -> int:
+        """Number of results recorded under a rubric version (read from the aggregates)"""
+        row = self.execute(
+            "SELECT COALESCE(SUM(results), 0) FROM leaderboard WHERE rubric_version = ?", (rubric_version,)
+        ).fetchone()
+        return row[0]
@@ -0,0 +1,161 @@
+"""
+CTAE-Green Compiled Rubric
+Per-scenario ground truth preprocessed for fast, repeated scoring
+"""
+
+from typing import Dict, Any, List, Tuple, FrozenSet, Mapping
+
+from fact_matcher import AhoCorasickMatcher
+
+# Version of the scoring rules (rubric matching plus the metric weights in
+# CTAEGreenAgent.evaluate_response). Stored with every persisted result;
+# bump it whenever scores would change so leaderboards never mix versions.
+RUBRIC_VERSION = "1"
+
+# Below this many facts + actions, per-pattern `in` checks (C-level string
+# search) beat a pure-Python automaton walk, so the automaton is skipped
+AUTOMATON_MIN_PATTERNS = 128
+
+
+def _section(container: Any, key: str) -> List[Any]:
+    """A list section of a reply (anything but a list counts as empty)"""
+    value = container.get(key) if isinstance(container, Mapping) else None
+    return value if isinstance(value, list) else []
+
+
+def _entries(container: Any, key: str) -> List[Mapping[str, Any]]:
+    """The object entries of a list section (other entries are skipped)"""
+    return [entry for entry in _section(container, key) if isinstance(entry, Mapping)]
+
+
+def _text(entry: Mapping[str, Any], key: str) -> str:
+    value = entry.get(key)
+    return value if isinstance(value, str) else ""
+
+
+class RubricMatch:
+    """Everything a response matched in one scenario's rubric"""
+
+    __slots__ = (
+        "facts", "n_extracted", "actions", "risk_types",
+        "severity_correct", "n_recommendations", "with_rationale"
+    )
+
+    def __init__(self, facts, n_extracted, actions, risk_types, severity_correct, n_recommendations, with_rationale):
+        self.facts: FrozenSet[int] = facts                  # critical fact indices found in key_facts
+        self.n_extracted: int = n_extracted                 # number of key_facts submitted
+        self.actions: FrozenSet[int] = actions              # optimal action indices found in recommendations
+        self.risk_types: FrozenSet[str] = risk_types        # expected risk types that were identified
+        self.severity_correct: int = severity_correct       # risks with a correct (type, severity) pair
+        self.n_recommendations: int = n_recommendations
+        self.with_rationale: int = with_rationale           # recommendations with a non-blank rationale
+
+
+class CompiledRubric:
+    """
+    Ground truth for one scenario, lowercased and compiled once
+
+    Critical facts and optimal actions share a single Aho-Corasick automaton,
+    so every response text is scanned once for all rubric patterns. Small
+    rubrics use direct substring checks instead (same results).
+    """
+
+    __slots__ = (
+        "facts", "actions", "risk_types", "risk_type_severities", "matcher",
+        "n_facts", "n_actions", "n_risk_types", "n_risks"
+    )
+
+    def __init__(self, ground_truth: Dict[str, Any]):
+        self.facts = tuple(fact.lower() for fact in ground_truth["critical_facts"])
+        self.actions = tuple(action.lower() for action in ground_truth["optimal_actions"])
+        self.risk_types = frozenset(risk["type"] for risk in ground_truth["risks"])
+        self.risk_type_severities = frozenset(
+            (risk["type"], risk["severity"]) for risk in ground_truth["risks"]
+        )
+        patterns = self.facts + self.actions
+        self.matcher = AhoCorasickMatcher(patterns) if len(patterns) >= AUTOMATON_MIN_PATTERNS else None
+        self.n_facts = len(self.facts)
+        self.n_actions = len(self.actions)
+        self.n_risk_types = len(self.risk_types)
+        self.n_risks = len(ground_truth["risks"])
+
+    def match_facts(self, text: str) -> FrozenSet[int]:
+        """Indices of critical facts contained in one lowercased text"""
+        if self.matcher is None:
+            return frozenset(i for i, fact in enumerate(self.facts) if fact in text)
+        return frozenset(i for i in self.matcher.find(text) if i < self.n_facts)
+
+    def match_actions(self, text: str) -> FrozenSet[int]:
+        """Indices of optimal actions contained in one lowercased text"""
+        if self.matcher is None:
+            return frozenset(i for i, action in enumerate(self.actions) if action in text)
+        n_facts = self.n_facts
+        return frozenset(i - n_facts for i in self.matcher.find(text) if i >= n_facts)
+
+    def match(self, response: Dict[str, Any], fact_memo: Dict[str, FrozenSet[int]] = None) -> RubricMatch:
+        """
+        Match a response against every rubric section
+
+        Replies are taken as the white agent sent them, so shapes are not
+        trusted: a section that is not a list (or an `extracted_data` that is
+        not an object) counts as empty, and entries that are not objects, and
+        key facts that are not strings, are skipped.
+
+        Args:
+            response: Parsed white agent response
+            fact_memo: Optional cache of lowercased key-fact text -> matched fact
+                       indices, shared across responses to the same scenario
+        """
+        extracted_data = response.get("extracted_data") if isinstance(response, Mapping) else None
+        extracted_facts = [fact for fact in _section(extracted_data, "key_facts") if isinstance(fact, str)]
+        matched_facts = set()
+        for fact in extracted_facts:
+            text = fact.lower()
+            hits = fact_memo.get(text) if fact_memo is not None else None
+            if hits is None:
+                hits = self.match_facts(text)
+                if fact_memo is not None:
+                    fact_memo[text] = hits
+            matched_facts |= hits
+
+        risk_assessment = _entries(response, "risk_assessment")
+        risk_types_found = {r.get("risk_type") for r in risk_assessment if isinstance(r.get("risk_type"), str)}
+        severity_correct = 0
+        for r in risk_assessment:
+            try:
+                severity_correct += (r.get("risk_type"), r.get("severity")) in self.risk_type_severities
+            except TypeError:
+                # Unhashable values can never equal a ground-truth string
+                pass
+
+        recommendations = _entries(response, "recommendations")
+        rec_texts = " ".join([_text(r, "action").lower() for r in recommendations])
+
+        return RubricMatch(
+            facts=frozenset(matched_facts),
+            n_extracted=len(extracted_facts),
+            actions=self.match_actions(rec_texts),
+            risk_types=frozenset(risk_types_found & self.risk_types),
+            severity_correct=severity_correct,
+            n_recommendations=len(recommendations),
+            with_rationale=sum(1 for r in recommendations if _text(r, "rationale").strip())
+        )
+
+    def tally(self, response: Dict[str, Any], fact_memo: Dict[str, FrozenSet[int]] = None) -> Tuple[int, ...]:
+        """
+        Count rubric hits in a response
+
+        Returns:
+            (facts matched, facts extracted, risk types found, severities correct,
+             actions covered, recommendations, recommendations with rationale)
+        """
+        m = self.match(response, fact_memo)
+        return (
+            len(m.facts),
+            m.n_extracted,
+            len(m.risk_types),
+            m.severity_correct,
+            len(m.actions),
+            m.n_recommendations,
+            m.with_rationale
+        )
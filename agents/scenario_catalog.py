@@ -0,0 +1,390 @@
+"""
+CTAE-Green Scenario Catalog
+One JSON file per scenario, listed in a lightweight index for fast filtering
+
+Layout (under the data directory):
+
+    scenarios/index.json         {"format": 1, "scenarios": [{id, name, difficulty, category, ...}]}
+    scenarios/<scenario_id>.json {id, name, ..., "inputs": {...}, "ground_truth": {...}}
+
+A scenario's "inputs" reference source records by id: "email_ids" (email `id`),
+"alert_ids" (alert `alert_id`) and "shipment_ids" (manifest `shipment_id`).
+The value "*" selects every record in source-file order. Emails are
+EmailRecord views into the memory-mapped EmailStore, decoded when a prompt
+renders them. Selected shipments are ShipmentSelection views over the
+catalog's columnar ShipmentTable; their CSV text is rendered when a prompt
+needs it.
+
+A scenario's "ground_truth" may list "derived_facts" to append to its
+critical facts, computed from the data rather than typed in:
+"total_exposure" (value of the selected shipments, e.g. "Total exposure >
+$50M") and "exposure_at_risk" (value of the selected shipments affected by
+the selected alerts, via the RegionIndex).
+"""
+
+import abc
+import hashlib
+import json
+import sys
+import threading
+from pathlib import Path
+from typing import Dict, Any, List, Iterator, Mapping, Optional, Sequence, Tuple, TYPE_CHECKING
+
+from scenario_repository import freeze, _file_signature, CACHE_DIR
+from rubric import CompiledRubric
+
+if TYPE_CHECKING:
+    from region_index import Gazetteer, RegionIndex
+
+CATALOG_DIR = "scenarios"
+GAZETTEER_FILE = "port_gazetteer.json"
+INDEX_FILE = "index.json"
+INDEX_FORMAT = 1
+
+# Fields copied from each scenario file into the index
+INDEX_FIELDS = ["id", "name", "difficulty", "category", "description", "time_limit"]
+
+# Shared source files every catalog depends on (relative to the data directory)
+SOURCE_FILES = [
+    "logistics_emails.json",
+    "shipment_manifest.csv",
+    "risk_alerts.json",
+    GAZETTEER_FILE,
+    f"{CATALOG_DIR}/{INDEX_FILE}"
+]
+
+
+def build_index(data_dir: Path) -> Dict[str, Any]:
+    """
+    Scan scenario files and (re)write the catalog index
+
+    Each entry records the scenario file's hash, so editing any scenario and
+    rebuilding the index changes the catalog version.
+    """
+    catalog_dir = Path(data_dir) / CATALOG_DIR
+    entries = []
+    for path in sorted(catalog_dir.glob("*.json")):
+        if path.name == INDEX_FILE:
+            continue
+        raw = path.read_bytes()
+        doc = json.loads(raw)
+        entry = {field: doc.get(field) for field in INDEX_FIELDS}
+        entry["file"] = path.name
+        entry["sha256"] = hashlib.sha256(raw).hexdigest()
+        entries.append(entry)
+
+    index = {"format": INDEX_FORMAT, "scenarios": entries}
+    with open(catalog_dir / INDEX_FILE, 'w') as f:
+        json.dump(index, f, indent=2)
+        f.write("\n")
+    return index
+
+
+class CatalogIndex(Sequence):
+    """
+    Index entries with the lookups and Sequence protocol every catalog shares
+
+    Subclasses call _set_entries() and implement the abstract get(scenario_id).
+
+    Catalogs are fingerprinted by the shared files and the index only, so a
+    scenario file edited without rebuilding the index is caught per scenario:
+    subclasses that call _track_files() check a scenario's file on its first
+    use, and its signature again on first use after each recheck_files(). A
+    file whose content changed is handed to _reload(), and a hash of every
+    file that differs from its index entry is folded into `version`.
+    """
+
+    def _set_entries(self, entries: Sequence[Mapping[str, Any]]):
+        self.entries = freeze(entries)
+        self._positions = {entry['id']: i for i, entry in enumerate(self.entries)}
+        self._by_difficulty: Dict[str, List[int]] = {}
+        self._by_category: Dict[str, List[int]] = {}
+        for i, entry in enumerate(self.entries):
+            self._by_difficulty.setdefault(entry['difficulty'], []).append(i)
+            self._by_category.setdefault(entry['category'], []).append(i)
+
+    @abc.abstractmethod
+    def get(self, scenario_id: str) -> Mapping[str, Any]:
+        """Resolved, frozen scenario by id"""
+
+    # -- Scenario file checks --
+
+    def _track_files(self, data_dir: Path, version: str, files: Optional[Dict[str, Tuple[Tuple[int, int], str]]] = None):
+        """Start checking scenario files (`files`: signature and hash of those already read)"""
+        self.data_dir = Path(data_dir)
+        self._index_version = version
+        self._files: Dict[str, Tuple[Tuple[int, int], str]] = dict(files or {})
+        self._edited: Dict[str, str] = {
+            scenario_id: digest for scenario_id, (_, digest) in self._files.items()
+            if digest != self.entries[self._positions[scenario_id]].get('sha256')
+        }
+        self._checked: Dict[str, int] = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+        self.version = self._current_version()
+
+    def recheck_files(self):
+        """Check each scenario file's signature again on its next use (constant time)"""
+        self._generation += 1
+
+    def scenario_file(self, scenario_id: str) -> Tuple[Tuple[int, int], str]:
+        """Signature and hash of a scenario's file as last read"""
+        self._check(scenario_id)
+        return self._files[scenario_id]
+
+    def _check(self, scenario_id: str):
+        if self._checked.get(scenario_id) != self._generation:
+            self._load(scenario_id)
+
+    def _load(self, scenario_id: str):
+        if scenario_id not in self._positions:
+            raise KeyError(f"Scenario {scenario_id} not found")
+
+        with self._lock:
+            generation = self._generation
+            if self._checked.get(scenario_id) == generation:
+                return
+            entry = self.entries[self._positions[scenario_id]]
+            path = self.data_dir / CATALOG_DIR / entry['file']
+            signature = _file_signature(path)
+            loaded = self._files.get(scenario_id)
+            if loaded is None or loaded[0] != signature:
+                raw = path.read_bytes()
+                digest = hashlib.sha256(raw).hexdigest()
+                if loaded is None or loaded[1] != digest:
+                    self._reload(scenario_id, raw)
+                self._files[scenario_id] = (signature, digest)
+                if loaded is None or loaded[1] != digest:
+                    if digest != entry.get('sha256'):
+                        self._edited[scenario_id] = digest
+                    else:
+                        self._edited.pop(scenario_id, None)
+                    self.version = self._current_version()
+            self._checked[scenario_id] = generation
+
+    def _reload(self, scenario_id: str, raw: bytes):
+        """A scenario file was read for the first time or its content changed"""
+
+    def _current_version(self) -> str:
+        """The index's version, or a hash of it and every scenario file edited since"""
+        if not self._edited:
+            return self._index_version
+        edits = "".join(f"{scenario_id}:{digest};" for scenario_id, digest in sorted(self._edited.items()))
+        return hashlib.sha256(f"{self._index_version};{edits}".encode()).hexdigest()[:16]
+
+    def rendered_prompt(self, scenario_id: str, compact: bool = False) -> Optional[str]:
+        """A prompt rendered ahead of time, if the catalog holds one (None: render on demand)"""
+        return None
+
+    # -- Sequence protocol (resolves scenario bodies lazily) --
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return [self.get(entry['id']) for entry in self.entries[position]]
+        return self.get(self.entries[position]['id'])
+
+    def __iter__(self) -> Iterator[Mapping[str, Any]]:
+        for entry in self.entries:
+            yield self.get(entry['id'])
+
+    def __contains__(self, scenario_id) -> bool:
+        return scenario_id in self._positions
+
+    # -- Index queries (never load scenario bodies) --
+
+    def list(self, difficulty: Optional[str] = None, category: Optional[str] = None) -> List[Mapping[str, Any]]:
+        """Index entries, optionally filtered by difficulty and/or category"""
+        if difficulty is None and category is None:
+            return list(self.entries)
+
+        positions = None
+        for lookup, value in ((self._by_difficulty, difficulty), (self._by_category, category)):
+            if value is not None:
+                matches = lookup.get(value, [])
+                positions = matches if positions is None else sorted(set(positions) & set(matches))
+        return [self.entries[i] for i in positions]
+
+
+class ScenarioCatalog(CatalogIndex):
+    """
+    Read-only, lazily resolved view of a scenario catalog
+
+    Only the index and the shared source records are loaded up front; each
+    scenario body is read, resolved against the source records and frozen
+    on first access. A scenario file edited without rebuilding the index is
+    re-resolved on its own, with a new ground_truth_version.
+    """
+
+    def __init__(self, data_dir: Path, version: str):
+        with open(Path(data_dir) / CATALOG_DIR / INDEX_FILE, 'r') as f:
+            index = json.load(f)
+        if index.get("format") != INDEX_FORMAT:
+            raise ValueError(f"Unsupported scenario index format: {index.get('format')}")
+
+        self._set_entries(index["scenarios"])
+        self._track_files(data_dir, version)
+        self._load_sources()
+
+        self._scenarios: Dict[str, Mapping[str, Any]] = {}
+        self._ground_truth: Dict[str, Mapping[str, Any]] = {}
+        self._rubrics: Dict[str, CompiledRubric] = {}
+        self._ground_truth_versions: Dict[str, str] = {}
+        self._inputs: Dict[str, Mapping[str, Any]] = {}
+        self._gazetteer: Optional["Gazetteer"] = None
+        self._regions: Optional["RegionIndex"] = None
+        self._regions_lock = threading.Lock()
+        self.ground_truth = CatalogGroundTruth(self)
+
+    def _load_sources(self):
+        """Load the emails, alerts and manifest that scenarios reference"""
+        from email_store import EmailStore
+        from shipment_table import ShipmentTable
+
+        self.emails = EmailStore(self.data_dir / "logistics_emails.json", self.data_dir / CACHE_DIR)
+
+        with open(self.data_dir / "risk_alerts.json", 'r') as f:
+            self.alerts = freeze(json.load(f))
+        self.alerts_by_id = {alert['alert_id']: alert for alert in self.alerts}
+
+        self.shipments = ShipmentTable.from_csv(self.data_dir / "shipment_manifest.csv")
+
+    @property
+    def gazetteer(self) -> "Gazetteer":
+        if self._gazetteer is None:
+            with self._regions_lock:
+                if self._gazetteer is None:
+                    from region_index import Gazetteer
+                    self._gazetteer = Gazetteer.load(self.data_dir / GAZETTEER_FILE)
+        return self._gazetteer
+
+    @property
+    def regions(self) -> "RegionIndex":
+        """Alert -> affected shipments index over all alerts and shipments (built on first use)"""
+        if self._regions is None:
+            gazetteer = self.gazetteer
+            with self._regions_lock:
+                if self._regions is None:
+                    from region_index import RegionIndex
+                    self._regions = RegionIndex(gazetteer, self.shipments, self.alerts)
+        return self._regions
+
+    # -- Scenario resolution --
+
+    def get(self, scenario_id: str) -> Mapping[str, Any]:
+        """Resolved, frozen scenario by id"""
+        self._check(scenario_id)
+        return self._scenarios[scenario_id]
+
+    def get_ground_truth(self, scenario_id: str) -> Mapping[str, Any]:
+        """Frozen ground truth by scenario id"""
+        self._check(scenario_id)
+        return self._ground_truth[scenario_id]
+
+    def get_inputs(self, scenario_id: str) -> Mapping[str, Any]:
+        """A scenario's record selections as written ("*" or lists of ids)"""
+        self._check(scenario_id)
+        return self._inputs[scenario_id]
+
+    def ground_truth_version(self, scenario_id: str) -> str:
+        """Hash of a scenario's resolved ground truth; changes whenever its scoring inputs do"""
+        self._check(scenario_id)
+        return self._ground_truth_versions[scenario_id]
+
+    def get_rubric(self, scenario_id: str) -> CompiledRubric:
+        """Compiled ground truth by scenario id (built when the ground truth loads)"""
+        self._check(scenario_id)
+        return self._rubrics[scenario_id]
+
+    def _reload(self, scenario_id: str, raw: bytes):
+        self._resolve(scenario_id, json.loads(raw))
+
+    def _resolve(self, scenario_id: str, doc: Dict[str, Any]):
+        """Resolve a scenario file against the source records and store the frozen results"""
+        inputs = doc.get("inputs", {})
+        scenario = {
+            "id": doc['id'],
+            "name": doc['name'],
+            "difficulty": doc['difficulty'],
+            "category": doc.get('category'),
+            "description": doc['description'],
+            "data": {
+                "emails": self.emails.select(inputs.get("email_ids", [])),
+                "shipments": self.shipments.select(inputs.get("shipment_ids", "*")),
+                "risk_alerts": self._select(self.alerts, self.alerts_by_id, inputs.get("alert_ids", []))
+            },
+            "task": doc['task'],
+            "time_limit": doc['time_limit']
+        }
+        ground_truth = self._derive_ground_truth(doc['ground_truth'], scenario['data'])
+        self._ground_truth[scenario_id] = freeze(ground_truth)
+        self._rubrics[scenario_id] = CompiledRubric(ground_truth)
+        self._inputs[scenario_id] = freeze(inputs)
+        self._ground_truth_versions[scenario_id] = hashlib.sha256(
+            json.dumps(ground_truth, sort_keys=True, default=str).encode()
+        ).hexdigest()[:16]
+        self._scenarios[scenario_id] = freeze(scenario)
+
+    def _derive_ground_truth(self, ground_truth: Dict[str, Any], data: Dict[str, Any]) -> Dict[str, Any]:
+        """Ground truth with any "derived_facts" computed and appended to its critical facts"""
+        from region_index import exposure_fact, exposure_at_risk
+
+        kinds = ground_truth.get("derived_facts")
+        if not kinds:
+            return ground_truth
+        shipments = data["shipments"]
+        facts = []
+        for kind in kinds:
+            if kind == "total_exposure":
+                fact = exposure_fact(shipments.total_exposure)
+            elif kind == "exposure_at_risk":
+                if shipments.rows is None:
+                    amount = self.regions.exposure_at_risk(alert['alert_id'] for alert in data["risk_alerts"])
+                else:
+                    # A listed subset: check its routes directly rather than indexing the whole manifest
+                    amount = exposure_at_risk(self.gazetteer, data["risk_alerts"], shipments)
+                fact = exposure_fact(amount, "Exposure at risk")
+            else:
+                raise ValueError(f"Unknown derived fact: {kind}")
+            if fact is not None:
+                facts.append(fact)
+        derived = {key: value for key, value in ground_truth.items() if key != "derived_facts"}
+        derived["critical_facts"] = list(ground_truth.get("critical_facts", [])) + facts
+        return derived
+
+    @staticmethod
+    def _select(records, by_id: Dict[str, Any], ids) -> List[Any]:
+        if ids == "*":
+            return list(records)
+        missing = [record_id for record_id in ids if record_id not in by_id]
+        if missing:
+            raise KeyError(f"Unknown record ids referenced by scenario: {missing}")
+        return [by_id[record_id] for record_id in ids]
+
+
+class CatalogGroundTruth(Mapping):
+    """Lazy scenario_id -> ground truth mapping backed by a catalog"""
+
+    def __init__(self, catalog: CatalogIndex):
+        self._catalog = catalog
+
+    def __getitem__(self, scenario_id: str) -> Mapping[str, Any]:
+        return self._catalog.get_ground_truth(scenario_id)
+
+    def __iter__(self) -> Iterator[str]:
+        return (entry['id'] for entry in self._catalog.entries)
+
+    def __len__(self) -> int:
+        return len(self._catalog)
+
+    def __contains__(self, scenario_id) -> bool:
+        return scenario_id in self._catalog
+
+
+if __name__ == "__main__":
+    # Usage: python scenario_catalog.py [data_dir]
+    target = Path(sys.argv[1]) if len(sys.argv) > 1 else Path("../data")
+    built = build_index(target)
+    print(f"✓ Indexed {len(built['scenarios'])} scenarios in {target / CATALOG_DIR / INDEX_FILE}")
@@ -0,0 +1,316 @@
+"""
+CTAE-Green Scenario Generator
+Seeded, streaming synthesis of datasets in the data/ file formats
+
+Writes logistics_emails.json, risk_alerts.json, shipment_manifest.csv,
+port_gazetteer.json and a scenario catalog (scenarios/*.json plus index.json)
+to a new directory, from tens to millions of records.
+
+Every record is a pure function of (seed, kind, index), so output is
+reproducible and records never need to be held in memory. Cross references
+(an email about a shipment, a scenario's ground truth) are made by
+regenerating the referenced record. Email i and alert i are about
+shipment i % shipments. Scenario k is built around alert k % alerts.
+"""
+
+import csv
+import json
+import random
+import shutil
+import textwrap
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Any, Iterable, Union
+
+from scenario_catalog import CATALOG_DIR, GAZETTEER_FILE, build_index
+
+DEFAULT_GAZETTEER = Path(__file__).parent.parent / "data" / GAZETTEER_FILE
+
+MANIFEST_COLUMNS = [
+    "shipment_id", "commodity", "quantity", "unit", "origin", "destination",
+    "vessel", "departure_date", "eta", "status", "value_usd"
+]
+
+# (name, unit, min quantity, max quantity, USD per unit)
+COMMODITIES = [
+    ("Crude Oil WTI", "barrels", 20000, 800000, 78.5),
+    ("Crude Oil Brent", "barrels", 20000, 800000, 82.1),
+    ("Natural Gas LNG", "MMBtu", 10000, 3000000, 3.2),
+    ("Copper Concentrate", "metric_tons", 2000, 40000, 4150),
+    ("Iron Ore", "metric_tons", 20000, 200000, 90),
+    ("Soybeans", "metric_tons", 5000, 60000, 450),
+    ("Wheat", "metric_tons", 5000, 60000, 240),
+    ("Coal", "metric_tons", 20000, 150000, 130),
+    ("Aluminium", "metric_tons", 1000, 20000, 2300),
+]
+
+VESSEL_ADJECTIVES = ["OCEAN", "ATLANTIC", "PACIFIC", "GAS", "GRAIN", "BULK", "NORTHERN", "SILVER", "IRON", "CORAL"]
+VESSEL_NOUNS = ["STAR", "RUNNER", "PRINCE", "MASTER", "TITAN", "SPIRIT", "PIONEER", "TRADER", "QUEEN", "HAWK"]
+
+STATUSES = ["IN_TRANSIT", "IN_TRANSIT", "IN_TRANSIT", "DELAYED", "SCHEDULED"]
+SEVERITIES = ["MEDIUM", "HIGH", "HIGH", "CRITICAL"]
+
+# category -> (title, description, recommended action, ground-truth actions)
+ALERT_TEMPLATES = {
+    "port_congestion": (
+        "Severe Port Congestion - {place}",
+        "Port operations at {load}% capacity. Average delay: {days}-{days_max} days for all vessels.",
+        "Consider rerouting to alternative ports",
+        ["reroute", "alternative port", "customer notification"],
+    ),
+    "weather": (
+        "Severe Storm Warning - {place}",
+        "Storm system expected to reach {place} on {date}. Shipping lanes at risk.",
+        "Delay departures or reroute around the storm",
+        ["delay departures", "reroute", "secure vessels"],
+    ),
+    "geopolitical": (
+        "Transit Disruption Concerns - {place}",
+        "Escalating tensions may affect transit through {place}. Monitor situation closely.",
+        "Prepare contingency routes",
+        ["establish contingency routes", "enhance monitoring", "hedge price exposure"],
+    ),
+}
+
+BASE_DATE = datetime(2025, 10, 1)
+
+# Shipments listed in each generated scenario
+SHIPMENTS_PER_SCENARIO = 5
+
+
+class DatasetGenerator:
+    """
+    Deterministic dataset synthesizer
+
+    Usage:
+        generator = DatasetGenerator(seed=7, emails=10_000, alerts=500, shipments=100_000, scenarios=50)
+        generator.write("data_large")
+    """
+
+    def __init__(
+        self,
+        seed: int = 0,
+        emails: int = 100,
+        alerts: int = 20,
+        shipments: int = 200,
+        scenarios: int = 10,
+        gazetteer: Union[str, Path] = DEFAULT_GAZETTEER
+    ):
+        if min(emails, alerts, shipments, scenarios) < 1:
+            raise ValueError("Every record count must be at least 1")
+        self.seed = seed
+        self.counts = {"emails": emails, "alerts": alerts, "shipments": shipments, "scenarios": scenarios}
+        self.gazetteer_path = Path(gazetteer)
+        with open(self.gazetteer_path, 'r') as f:
+            doc = json.load(f)
+        self.ports = doc["ports"]
+        self.lanes = [lane for lane in doc["lanes"] if len(lane["ports"]) == 2]
+        if not self.lanes:
+            raise ValueError(f"Gazetteer {self.gazetteer_path} has no two-port lanes")
+
+    def _rng(self, kind: str, index: int) -> random.Random:
+        return random.Random(f"{self.seed}/{kind}/{index}")
+
+    # -- Records --
+
+    def shipment(self, i: int) -> Dict[str, Any]:
+        rng = self._rng("shipment", i)
+        lane = rng.choice(self.lanes)
+        origin, destination = lane["ports"] if rng.random() < 0.5 else reversed(lane["ports"])
+        commodity, unit, low, high, price = rng.choice(COMMODITIES)
+        quantity = rng.randrange(low, high, 1000 if high >= 100000 else 500)
+        departure = BASE_DATE + timedelta(days=rng.randrange(45))
+        eta = departure + timedelta(days=rng.randrange(7, 36))
+        return {
+            "shipment_id": f"SHP-2025-{1000 + i}",
+            "commodity": commodity,
+            "quantity": quantity,
+            "unit": unit,
+            "origin": origin,
+            "destination": destination,
+            "vessel": f"MV {rng.choice(VESSEL_ADJECTIVES)} {rng.choice(VESSEL_NOUNS)}",
+            "departure_date": departure.strftime("%Y-%m-%d"),
+            "eta": eta.strftime("%Y-%m-%d"),
+            "status": rng.choice(STATUSES),
+            "value_usd": round(quantity * price),
+        }
+
+    def email(self, i: int) -> Dict[str, Any]:
+        rng = self._rng("email", i)
+        shipment = self.shipment(i % self.counts["shipments"])
+        sent = BASE_DATE + timedelta(days=rng.randrange(45), minutes=rng.randrange(24 * 60))
+        quantity = f"{shipment['quantity']:,} {shipment['unit'].replace('_', ' ')}"
+        kind = rng.choice(["delay", "confirmation", "price_update"])
+
+        if kind == "delay":
+            days = rng.randint(2, 9)
+            subject = f"URGENT: Delay at {shipment['origin']} - {shipment['commodity']} Shipment"
+            sender = "logistics@globalshipping.com"
+            body = (
+                f"Dear Operations Team,\n\nVessel {shipment['vessel']} carrying {quantity} of "
+                f"{shipment['commodity']} (Shipment ID: {shipment['shipment_id']}) is delayed at "
+                f"{shipment['origin']}. Original ETA was {shipment['eta']}, now delayed {days} days.\n\n"
+                f"Destination: {shipment['destination']}\n\nPlease advise on rerouting options.\n\n"
+                "Best regards,\nGlobal Shipping Logistics"
+            )
+        elif kind == "confirmation":
+            subject = f"Shipment Confirmation - {shipment['commodity']} from {shipment['origin']}"
+            sender = "dispatch@commoditiesltd.com"
+            body = (
+                f"Shipment Details:\n\nID: {shipment['shipment_id']}\nCommodity: {shipment['commodity']}\n"
+                f"Quantity: {quantity}\nOrigin: {shipment['origin']}\nDestination: {shipment['destination']}\n"
+                f"Departure: {shipment['departure_date']}\nETA: {shipment['eta']}\nVessel: {shipment['vessel']}\n\n"
+                "All documentation complete. Tracking available."
+            )
+        else:
+            change = rng.uniform(-3, 3)
+            subject = f"Commodity Price Update - {sent.strftime('%b %d')}"
+            sender = "market@tradingdesk.com"
+            body = (
+                f"Daily Market Update\n\n{shipment['commodity']}: {change:+.1f}% on the day.\n"
+                f"Open position: {shipment['shipment_id']} ({quantity}, ${shipment['value_usd']:,}).\n\n"
+                f"Market Sentiment: {'Bullish' if change > 0 else 'Bearish'}."
+            )
+
+        return {
+            "id": f"email_{i + 1:03d}",
+            "subject": subject,
+            "from": sender,
+            "timestamp": sent.strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "body": body,
+        }
+
+    def alert(self, i: int) -> Dict[str, Any]:
+        rng = self._rng("alert", i)
+        shipment = self.shipment(i % self.counts["shipments"])
+        category = rng.choice(sorted(ALERT_TEMPLATES))
+        port = rng.choice([shipment["origin"], shipment["destination"]])
+        port_regions = self.ports.get(port, {}).get("regions", [])
+        lane_regions = next(
+            (lane.get("via", []) for lane in self.lanes
+             if set(lane["ports"]) == {shipment["origin"], shipment["destination"]}),
+            []
+        )
+
+        if category == "port_congestion":
+            regions = list(dict.fromkeys([port] + port_regions[:1]))
+        elif category == "weather":
+            # A port's regions and its lane's waypoints can overlap; sample distinct names
+            candidates = list(dict.fromkeys(port_regions + lane_regions))
+            regions = rng.sample(candidates, min(2, len(candidates))) or [port]
+        else:
+            regions = [rng.choice(lane_regions)] if lane_regions else [port]
+
+        title, description, action, _ = ALERT_TEMPLATES[category]
+        issued = BASE_DATE + timedelta(days=rng.randrange(45), minutes=rng.randrange(24 * 60))
+        days = rng.randint(2, 7)
+        place = regions[0]
+        return {
+            "alert_id": f"RISK-2025-{i + 1:03d}",
+            "severity": rng.choice(SEVERITIES),
+            "category": category,
+            "timestamp": issued.strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "title": title.format(place=place),
+            "affected_regions": regions,
+            "description": description.format(
+                place=place, load=rng.randrange(120, 180, 10), days=days, days_max=days + 2,
+                date=(issued + timedelta(days=days)).strftime("%b %d")
+            ),
+            "recommended_action": action,
+        }
+
+    def scenario(self, k: int) -> Dict[str, Any]:
+        rng = self._rng("scenario", k)
+        n_alerts, n_shipments, n_emails = (
+            self.counts["alerts"], self.counts["shipments"], self.counts["emails"]
+        )
+
+        alert_ids = [k % n_alerts]
+        if rng.random() < 0.3 and n_alerts > 1:
+            extra = rng.sample(range(n_alerts), min(2, n_alerts - 1))
+            alert_ids.extend(a for a in extra if a not in alert_ids)
+        alerts = [self.alert(a) for a in alert_ids]
+
+        focus = alert_ids[0] % n_shipments
+        others = [s for s in rng.sample(range(n_shipments), min(SHIPMENTS_PER_SCENARIO, n_shipments)) if s != focus]
+        shipment_ids = [focus] + others[:SHIPMENTS_PER_SCENARIO - 1]
+        email_ids = [s for s in shipment_ids if s < n_emails]
+
+        shipment = self.shipment(focus)
+        lead = alerts[0]
+        category = lead["category"] if len(alerts) == 1 else "multi_risk"
+        actions = list(dict.fromkeys(a for alert in alerts for a in ALERT_TEMPLATES[alert["category"]][3]))
+        return {
+            "id": self.scenario_id(k),
+            "name": f"{lead['title']} - {shipment['commodity']} Exposure",
+            "difficulty": "hard" if len(alerts) > 1 else rng.choice(["easy", "medium"]),
+            "category": category,
+            "description": f"Assess the impact of {len(alerts)} risk alert(s) on active shipments",
+            "task": (
+                f"{lead['title']}. Analyze the impact on shipment {shipment['shipment_id']} and the other "
+                "listed shipments. Extract key details, assess financial and operational risks, "
+                "and provide actionable recommendations."
+            ),
+            "time_limit": 30 if len(alerts) == 1 else 45,
+            "inputs": {
+                "email_ids": [f"email_{e + 1:03d}" for e in email_ids],
+                "alert_ids": [alert["alert_id"] for alert in alerts],
+                "shipment_ids": [self.shipment(s)["shipment_id"] for s in shipment_ids],
+            },
+            "ground_truth": {
+                "critical_facts": [
+                    shipment["shipment_id"],
+                    f"{shipment['quantity']:,} {shipment['unit'].replace('_', ' ')}",
+                    shipment["commodity"].lower(),
+                    lead["affected_regions"][0],
+                    f"${shipment['value_usd']:,} value",
+                ],
+                "risks": [
+                    {"type": alert["category"], "severity": alert["severity"].lower(), "region": alert["affected_regions"][0]}
+                    for alert in alerts
+                ] + [{"type": "financial", "severity": "medium", "shipment": shipment["shipment_id"]}],
+                "optimal_actions": actions,
+                "derived_facts": ["total_exposure", "exposure_at_risk"],
+            },
+        }
+
+    def scenario_id(self, k: int) -> str:
+        width = max(2, len(str(self.counts["scenarios"])))
+        return f"scenario_{k + 1:0{width}d}"
+
+    # -- Output --
+
+    def write(self, out_dir: Union[str, Path]) -> Dict[str, int]:
+        """Stream the whole dataset into `out_dir` (which must be new or empty)"""
+        out_dir = Path(out_dir)
+        if out_dir.exists() and any(out_dir.iterdir()):
+            raise FileExistsError(f"Output directory is not empty: {out_dir}")
+        (out_dir / CATALOG_DIR).mkdir(parents=True, exist_ok=True)
+
+        _write_json_array(out_dir / "logistics_emails.json", map(self.email, range(self.counts["emails"])))
+        _write_json_array(out_dir / "risk_alerts.json", map(self.alert, range(self.counts["alerts"])))
+        with open(out_dir / "shipment_manifest.csv", 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=MANIFEST_COLUMNS, lineterminator="\n")
+            writer.writeheader()
+            writer.writerows(map(self.shipment, range(self.counts["shipments"])))
+        shutil.copyfile(self.gazetteer_path, out_dir / GAZETTEER_FILE)
+
+        for k in range(self.counts["scenarios"]):
+            scenario = self.scenario(k)
+            with open(out_dir / CATALOG_DIR / f"{scenario['id']}.json", 'w') as f:
+                json.dump(scenario, f, indent=2)
+                f.write("\n")
+        build_index(out_dir)
+        return dict(self.counts)
+
+
+def _write_json_array(path: Path, records: Iterable[Dict[str, Any]]):
+    """Write a JSON array one record at a time, in the indented layout of the data/ files"""
+    with open(path, 'w') as f:
+        f.write("[")
+        separator = "\n"
+        for record in records:
+            f.write(separator)
+            f.write(textwrap.indent(json.dumps(record, indent=2), "  "))
+            separator = ",\n"
+        f.write("\n]\n")
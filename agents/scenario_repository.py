@@ -0,0 +1,169 @@
+"""
+CTAE-Green Scenario Repository
+Process-wide cache of parsed, read-only scenario data keyed by data directory
+"""
+
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from types import MappingProxyType
+from typing import Dict, Any, List, Tuple, Callable, Optional
+
+# Derived files (indexes, digests) live in this subdirectory of a data directory
+CACHE_DIR = ".cache"
+DIGESTS_FILE = "digests.json"
+
+
+def freeze(value: Any) -> Any:
+    """Recursively convert dicts to read-only mappings and lists to tuples"""
+    if isinstance(value, dict):
+        return MappingProxyType({k: freeze(v) for k, v in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(v) for v in value)
+    return value
+
+
+def _file_signature(path: Path) -> Tuple[int, int]:
+    stat = path.stat()
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _file_hash(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class _DigestCache:
+    """
+    Content hashes persisted under <data_dir>/.cache, keyed by file mtime/size
+
+    Lets a fresh process skip re-reading large, unchanged source files. Saving
+    is best effort: a read-only data directory just means hashing every time.
+    """
+
+    def __init__(self, data_dir: Path):
+        self.data_dir = data_dir
+        self.path = data_dir / CACHE_DIR / DIGESTS_FILE
+        self._digests: Optional[Dict[str, list]] = None
+        self._dirty = False
+
+    def hash(self, path: Path, signature: Tuple[int, int]) -> str:
+        if self._digests is None:
+            try:
+                with open(self.path, 'r') as f:
+                    self._digests = json.load(f)
+            except (OSError, ValueError):
+                self._digests = {}
+        name = path.relative_to(self.data_dir).as_posix()
+        cached = self._digests.get(name)
+        if cached is not None and tuple(cached[:2]) == signature:
+            return cached[2]
+        digest = _file_hash(path)
+        self._digests[name] = [*signature, digest]
+        self._dirty = True
+        return digest
+
+    def save(self):
+        if not self._dirty:
+            return
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+            with open(tmp_path, 'w') as f:
+                json.dump(self._digests, f, indent=2)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            pass
+        self._dirty = False
+
+
+class _Entry:
+    """A cached dataset plus the file fingerprints it was built from"""
+
+    def __init__(self, dataset: Any, signatures: Dict[Path, Tuple[int, int]], hashes: Dict[Path, str]):
+        self.dataset = dataset
+        self.signatures = signatures
+        self.hashes = hashes
+
+
+class ScenarioRepository:
+    """
+    Loads each data directory once per process and hands out the shared dataset
+
+    A lookup only stats the source files. Files whose mtime/size changed are
+    re-hashed (a new process reuses hashes saved in .cache/digests.json), and
+    the dataset is rebuilt only if a content hash differs.
+    """
+
+    def __init__(self):
+        self._entries: Dict[Tuple[Path, Any], _Entry] = {}
+        self._lock = threading.Lock()
+
+    def get(
+        self,
+        data_dir: Path,
+        files: List[str],
+        loader: Callable[[Path, str], Any],
+        kind: Any = None
+    ) -> Any:
+        """
+        Return the dataset for `data_dir`, building it with `loader` if needed
+
+        Args:
+            data_dir: Directory holding the source files
+            files: Source file names (relative to data_dir) that the dataset depends on
+            loader: Callable building the dataset from (data_dir, version)
+            kind: Extra cache-key component so different loaders don't share entries
+        """
+        data_dir = Path(data_dir).resolve()
+        paths = [data_dir / name for name in files]
+        key = (data_dir, kind)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            signatures = {path: _file_signature(path) for path in paths}
+
+            if entry is not None and entry.signatures == signatures:
+                return entry.dataset
+
+            digests = _DigestCache(data_dir)
+            hashes = {
+                path: (
+                    entry.hashes[path]
+                    if entry is not None and entry.signatures.get(path) == signatures[path]
+                    else digests.hash(path, signatures[path])
+                )
+                for path in paths
+            }
+            digests.save()
+
+            if entry is not None and entry.hashes == hashes:
+                # Touched but unchanged: keep the parsed data
+                entry.signatures = signatures
+                return entry.dataset
+
+            version = hashlib.sha256(
+                "".join(f"{path.name}:{hashes[path]};" for path in paths).encode()
+            ).hexdigest()[:16]
+            dataset = loader(data_dir, version)
+            self._entries[key] = _Entry(dataset, signatures, hashes)
+            return dataset
+
+    def invalidate(self, data_dir: Optional[Path] = None):
+        """Drop cached datasets (all of them, or those for one directory)"""
+        with self._lock:
+            if data_dir is None:
+                self._entries.clear()
+                return
+            data_dir = Path(data_dir).resolve()
+            for key in [k for k in self._entries if k[0] == data_dir]:
+                del self._entries[key]
+
+
+# Shared by every CTAEGreenAgent in this process
+repository = ScenarioRepository()
@@ -0,0 +1,372 @@
+"""
+CTAE-Green Scenario Snapshot
+Scenarios, ground truth, index and rendered prompts compiled into one file
+
+A cold server normally parses every source file (emails, alerts, the whole
+shipment manifest) before it can answer. `build_snapshot` does that work
+ahead of time, e.g. in a deploy's build step, and writes a single binary
+artifact:
+
+    header   b"CTAESNAP", format, header offset, header length  (struct "<8sIQQ")
+    blobs    per scenario: body JSON, full prompt, compact prompt (UTF-8)
+    index    JSON: data version, renderer version, source fingerprints,
+             index entries, each scenario's blob offsets and the
+             fingerprint of the scenario file it was built from
+
+The server memory-maps the file at boot (`open_snapshot`) and reads only the
+header and index. A scenario's body is decoded on first use and its prompts
+are sliced from the map per request, so they stay in the page cache rather
+than on the heap and are shared by forked workers.
+
+A snapshot is only used while it matches the data directory and the code
+that rendered it: each shared source file's size is checked (the index
+included), and a file whose mtime changed is re-hashed. A stale, corrupt or
+missing snapshot prints why and the caller falls back to loading the data
+directory. Scenario files are checked one at a time on first use, as by
+ScenarioCatalog; a scenario whose file changed since the build is served by
+the regular catalog instead. Record-level access (scenario `data`,
+shipments, emails, alerts) is delegated to the regular ScenarioCatalog,
+which is imported and loaded on first use.
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Any, Iterator, List, Mapping, Optional, Tuple
+
+from scenario_repository import repository, freeze, _file_hash, _file_signature, CACHE_DIR
+from scenario_catalog import CatalogIndex, CatalogGroundTruth, ScenarioCatalog, SOURCE_FILES
+from prompt_builder import (
+    prompt_builder, HEADER_TEMPLATE, EMAIL_TEMPLATE, MANIFEST_TEMPLATE, MANIFEST_NOTE_TEMPLATE,
+    RISK_ALERTS_HEADER, ALERT_TEMPLATE, OUTPUT_FORMAT_SECTION
+)
+from prompt_relevance import RelevanceFilter, DEFAULT_MAX_CONTEXT_ROWS
+from rubric import CompiledRubric
+
+MAGIC = b"CTAESNAP"
+SNAPSHOT_FORMAT = 2
+PREAMBLE = struct.Struct("<8sIQQ")
+SNAPSHOT_FILE = "scenario_snapshot.bin"
+
+# Blob slots per scenario in the index ([offset, length] each)
+BODY, PROMPT, COMPACT_PROMPT = range(3)
+
+# Scenario fields kept in the snapshot (everything but the resolved `data`)
+SCENARIO_FIELDS = ["id", "name", "difficulty", "category", "description", "task", "time_limit"]
+
+# ScenarioCatalog attributes a SnapshotCatalog hands through to the source catalog
+SOURCE_ATTRIBUTES = frozenset({"emails", "alerts", "alerts_by_id", "shipments", "gazetteer", "regions"})
+
+
+def default_snapshot_path(data_dir: Path) -> Path:
+    return Path(data_dir) / CACHE_DIR / SNAPSHOT_FILE
+
+
+def renderer_version() -> str:
+    """Hash of the prompt templates and compaction settings a snapshot's prompts depend on"""
+    parts = [
+        HEADER_TEMPLATE, EMAIL_TEMPLATE, MANIFEST_TEMPLATE, MANIFEST_NOTE_TEMPLATE,
+        RISK_ALERTS_HEADER, ALERT_TEMPLATE, OUTPUT_FORMAT_SECTION, str(DEFAULT_MAX_CONTEXT_ROWS)
+    ]
+    return hashlib.sha256("\0".join(parts).encode()).hexdigest()[:16]
+
+
+def _plain(value: Any) -> Any:
+    """JSON-ready copy of a frozen value"""
+    if isinstance(value, Mapping):
+        return {k: _plain(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_plain(v) for v in value]
+    return value
+
+
+def build_snapshot(data_dir: Path, output: Optional[Path] = None) -> Dict[str, Any]:
+    """
+    Compile a data directory into a snapshot file
+
+    Blobs are streamed to a temporary file that replaces `output` only when
+    complete, so a running server never maps a half-written snapshot.
+
+    Returns:
+        Summary with path, data_version, scenarios, bytes and build seconds
+    """
+    started = time.perf_counter()
+    data_dir = Path(data_dir)
+    output = Path(output) if output is not None else default_snapshot_path(data_dir)
+    output.parent.mkdir(parents=True, exist_ok=True)
+
+    catalog = repository.get(data_dir, SOURCE_FILES, ScenarioCatalog)
+    catalog.recheck_files()
+    relevance = RelevanceFilter(catalog)
+    sources = {}
+    for name in SOURCE_FILES:
+        mtime_ns, size = _file_signature(data_dir / name)
+        sources[name] = [size, mtime_ns, _file_hash(data_dir / name)]
+
+    blobs: List[List[List[int]]] = []
+    files: Dict[str, List[Any]] = {}
+    tmp = output.with_name(output.name + f".{os.getpid()}.tmp")
+    try:
+        with open(tmp, 'wb') as f:
+            f.write(PREAMBLE.pack(MAGIC, SNAPSHOT_FORMAT, 0, 0))
+            offset = PREAMBLE.size
+
+            def write(data: bytes) -> List[int]:
+                nonlocal offset
+                f.write(data)
+                span = [offset, len(data)]
+                offset += len(data)
+                return span
+
+            for entry in catalog.entries:
+                scenario = catalog.get(entry['id'])
+                body = {
+                    "scenario": {field: scenario[field] for field in SCENARIO_FIELDS},
+                    "inputs": _plain(catalog.get_inputs(entry['id'])),
+                    "ground_truth": _plain(catalog.get_ground_truth(entry['id'])),
+                    "ground_truth_version": catalog.ground_truth_version(entry['id'])
+                }
+                blobs.append([
+                    write(json.dumps(body, separators=(',', ':')).encode('utf-8')),
+                    write(prompt_builder.render(scenario, cached=False).encode('utf-8')),
+                    write(prompt_builder.render(relevance.compact(scenario), cached=False).encode('utf-8'))
+                ])
+                (mtime_ns, size), digest = catalog.scenario_file(entry['id'])
+                files[entry['id']] = [size, mtime_ns, digest]
+
+            header = json.dumps({
+                "data_version": catalog.version,
+                "index_version": catalog._index_version,
+                "renderer": renderer_version(),
+                "built_at": time.time(),
+                "sources": sources,
+                "entries": _plain(catalog.entries),
+                "blobs": blobs,
+                "files": files
+            }, separators=(',', ':')).encode('utf-8')
+            header_offset = offset
+            f.write(header)
+            f.seek(0)
+            f.write(PREAMBLE.pack(MAGIC, SNAPSHOT_FORMAT, header_offset, len(header)))
+        os.replace(tmp, output)
+    finally:
+        if tmp.exists():
+            tmp.unlink()
+
+    return {
+        "path": str(output),
+        "data_version": catalog.version,
+        "scenarios": len(blobs),
+        "bytes": output.stat().st_size,
+        "seconds": round(time.perf_counter() - started, 3)
+    }
+
+
+class SnapshotScenario(Mapping):
+    """A scenario read from a snapshot; its `data` resolves through the source catalog on first access"""
+
+    def __init__(self, catalog: "SnapshotCatalog", fields: Mapping[str, Any]):
+        self._catalog = catalog
+        self._fields = fields
+
+    def __getitem__(self, key: str) -> Any:
+        if key == "data":
+            return self._catalog.source.get(self._fields['id'])['data']
+        return self._fields[key]
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self._fields
+        yield "data"
+
+    def __len__(self) -> int:
+        return len(self._fields) + 1
+
+
+class SnapshotCatalog(CatalogIndex):
+    """
+    ScenarioCatalog interface over a memory-mapped snapshot
+
+    Index queries, ground truth, rubrics and rendered prompts come from the
+    snapshot. Anything that needs the records themselves, or a scenario
+    whose file changed since the build, loads the regular catalog for the
+    data directory (once per process, via the repository).
+    """
+
+    def __init__(self, path: Path, data_dir: Path, buffer: mmap.mmap, header: Dict[str, Any]):
+        self.path = Path(path)
+        self.built_at = header['built_at']
+        self.renderer = header['renderer']
+        self.sources = header['sources']
+        self._buffer = buffer
+        self._blobs = header['blobs']
+        self._set_entries(header['entries'])
+        self._built = {
+            scenario_id: ((mtime_ns, size), digest) for scenario_id, (size, mtime_ns, digest) in header['files'].items()
+        }
+        self._track_files(data_dir, header['index_version'], self._built)
+        self._bodies: Dict[str, Mapping[str, Any]] = {}
+        self._scenarios: Dict[str, SnapshotScenario] = {}
+        self._rubrics: Dict[str, CompiledRubric] = {}
+        self._source: Optional[ScenarioCatalog] = None
+        self.ground_truth = CatalogGroundTruth(self)
+
+    def _blob(self, scenario_id: str, slot: int) -> bytes:
+        if scenario_id not in self._positions:
+            raise KeyError(f"Scenario {scenario_id} not found")
+        offset, length = self._blobs[self._positions[scenario_id]][slot]
+        return self._buffer[offset:offset + length]
+
+    def _body(self, scenario_id: str) -> Mapping[str, Any]:
+        body = self._bodies.get(scenario_id)
+        if body is None:
+            raw = json.loads(self._blob(scenario_id, BODY))
+            with self._lock:
+                body = self._bodies.get(scenario_id)
+                if body is None:
+                    self._rubrics[scenario_id] = CompiledRubric(raw['ground_truth'])
+                    body = self._bodies[scenario_id] = freeze(raw)
+                    self._scenarios[scenario_id] = SnapshotScenario(self, body['scenario'])
+        return body
+
+    @property
+    def source(self) -> ScenarioCatalog:
+        """The regular catalog for this data directory, loaded on first use"""
+        if self._source is None:
+            self._source = repository.get(self.data_dir, SOURCE_FILES, ScenarioCatalog)
+        return self._source
+
+    def recheck_files(self):
+        super().recheck_files()
+        if self._source is not None:
+            self._source.recheck_files()
+
+    def _changed(self, scenario_id: str) -> bool:
+        """Whether a scenario's file no longer matches the one the snapshot was built from"""
+        self._check(scenario_id)
+        return self._files[scenario_id][1] != self._built[scenario_id][1]
+
+    def __getattr__(self, name: str) -> Any:
+        if name in SOURCE_ATTRIBUTES:
+            return getattr(self.source, name)
+        raise AttributeError(name)
+
+    # -- ScenarioCatalog interface --
+
+    def get(self, scenario_id: str) -> Mapping[str, Any]:
+        if self._changed(scenario_id):
+            return self.source.get(scenario_id)
+        self._body(scenario_id)
+        return self._scenarios[scenario_id]
+
+    def get_ground_truth(self, scenario_id: str) -> Mapping[str, Any]:
+        if self._changed(scenario_id):
+            return self.source.get_ground_truth(scenario_id)
+        return self._body(scenario_id)['ground_truth']
+
+    def get_inputs(self, scenario_id: str) -> Mapping[str, Any]:
+        if self._changed(scenario_id):
+            return self.source.get_inputs(scenario_id)
+        return self._body(scenario_id)['inputs']
+
+    def ground_truth_version(self, scenario_id: str) -> str:
+        if self._changed(scenario_id):
+            return self.source.ground_truth_version(scenario_id)
+        return self._body(scenario_id)['ground_truth_version']
+
+    def get_rubric(self, scenario_id: str) -> CompiledRubric:
+        if self._changed(scenario_id):
+            return self.source.get_rubric(scenario_id)
+        self._body(scenario_id)
+        return self._rubrics[scenario_id]
+
+    def rendered_prompt(self, scenario_id: str, compact: bool = False) -> Optional[str]:
+        if scenario_id not in self._positions or self._changed(scenario_id):
+            return None
+        return self._blob(scenario_id, COMPACT_PROMPT if compact else PROMPT).decode('utf-8')
+
+
+def _read_header(buffer: mmap.mmap) -> Dict[str, Any]:
+    if len(buffer) < PREAMBLE.size:
+        raise ValueError("file is truncated")
+    magic, version, offset, length = PREAMBLE.unpack_from(buffer, 0)
+    if magic != MAGIC:
+        raise ValueError("not a scenario snapshot")
+    if version != SNAPSHOT_FORMAT:
+        raise ValueError(f"snapshot format {version}, expected {SNAPSHOT_FORMAT}")
+    if offset + length > len(buffer) or length == 0:
+        raise ValueError("file is truncated")
+    return json.loads(buffer[offset:offset + length])
+
+
+def _stale_reason(catalog: SnapshotCatalog, data_dir: Path) -> Optional[str]:
+    """Why a snapshot no longer matches the data directory and renderer (None if it does)"""
+    if catalog.renderer != renderer_version():
+        return "prompt templates changed since it was built"
+    if sorted(catalog.sources) != sorted(SOURCE_FILES):
+        return "built from a different set of source files"
+    for name, (size, mtime_ns, digest) in catalog.sources.items():
+        path = data_dir / name
+        if not path.exists():
+            return f"{name} is missing"
+        current_mtime, current_size = _file_signature(path)
+        if current_size != size or (current_mtime != mtime_ns and _file_hash(path) != digest):
+            return f"{name} changed since it was built"
+    return None
+
+
+_snapshots: Dict[Tuple[Path, Path], Tuple[Tuple[int, int], SnapshotCatalog]] = {}
+_snapshots_lock = threading.Lock()
+
+
+def open_snapshot(path: Path, data_dir: Path) -> Optional[SnapshotCatalog]:
+    """
+    Map a snapshot for `data_dir`, or None (with the reason printed) if it is missing or stale
+
+    The mapped catalog is shared by every caller in the process until the
+    snapshot file itself is replaced.
+    """
+    path = Path(path).resolve()
+    data_dir = Path(data_dir).resolve()
+    if not path.exists():
+        print(f"⚠️  Snapshot {path} not found; loading {data_dir} instead", file=sys.stderr)
+        return None
+
+    with _snapshots_lock:
+        signature = _file_signature(path)
+        cached = _snapshots.get((path, data_dir))
+        if cached is not None and cached[0] == signature:
+            catalog = cached[1]
+        else:
+            try:
+                with open(path, 'rb') as f:
+                    buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                catalog = SnapshotCatalog(path, data_dir, buffer, _read_header(buffer))
+            except (OSError, ValueError, KeyError) as e:
+                print(f"⚠️  Snapshot {path} unreadable ({e}); loading {data_dir} instead", file=sys.stderr)
+                return None
+            _snapshots[(path, data_dir)] = (signature, catalog)
+
+    reason = _stale_reason(catalog, data_dir)
+    if reason is not None:
+        print(f"⚠️  Snapshot {path} is stale ({reason}); loading {data_dir} instead", file=sys.stderr)
+        return None
+    return catalog
+
+
+def invalidate_snapshots():
+    """Forget every mapped snapshot (the next open_snapshot re-reads its file)"""
+    with _snapshots_lock:
+        _snapshots.clear()
+
+
+if __name__ == "__main__":
+    # Usage: python scenario_snapshot.py [data_dir] [output]
+    target = Path(sys.argv[1]) if len(sys.argv) > 1 else Path("../data")
+    summary = build_snapshot(target, Path(sys.argv[2]) if len(sys.argv) > 2 else None)
+    print(json.dumps(summary, indent=2))
@@ -0,0 +1,139 @@
+"""
+CTAE-Green Server State
+Versioned green agent slot and the SQLite file shared by server workers
+
+A request takes one AgentSnapshot at its start and uses it throughout, so a
+concurrent /reset never changes the agent under it. A reset builds the new
+agent first and then replaces the snapshot with a single reference swap.
+
+With several workers, the reset generation lives in the shared SQLite file.
+Each worker compares it with its own snapshot before serving a request and
+swaps in a fresh agent when another worker has reset. The same file holds
+background jobs and their results (see job_store.SQLiteJobStore), so any
+worker can report on a job started by another.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Optional, Union
+
+# Seconds a writer waits for another worker's transaction before failing
+BUSY_TIMEOUT_SECONDS = 5.0
+
+STATE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS server_state (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL,
+    updated_at REAL NOT NULL
+);
+"""
+
+
+class AgentSnapshot:
+    """A green agent together with the reset generation it was built for"""
+
+    __slots__ = ("generation", "agent", "created_at")
+
+    def __init__(self, generation: int, agent: Any):
+        self.generation = generation
+        self.agent = agent
+        self.created_at = time.time()
+
+
+class AgentSlot:
+    """Holds the current AgentSnapshot; readers never see a half-swapped agent"""
+
+    def __init__(self):
+        self._snapshot: Optional[AgentSnapshot] = None
+
+    def current(self) -> Optional[AgentSnapshot]:
+        return self._snapshot
+
+    def swap(self, snapshot: AgentSnapshot) -> Optional[AgentSnapshot]:
+        """Install `snapshot` and return the one it replaced"""
+        previous, self._snapshot = self._snapshot, snapshot
+        return previous
+
+
+class SQLiteDatabase:
+    """
+    SQLite file usable from several processes
+
+    Connections are opened per process (and re-opened after a fork) in WAL
+    mode, so readers never block the writer. Subclasses set `schema`.
+    """
+
+    schema = ""
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self._connection: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.RLock()
+
+    def connect(self) -> sqlite3.Connection:
+        """This process's connection (schema created on first use)"""
+        if self._connection is None or self._pid != os.getpid():
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(
+                str(self.path),
+                timeout=BUSY_TIMEOUT_SECONDS,
+                isolation_level=None,
+                check_same_thread=False
+            )
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.executescript(self.schema)
+            self._connection, self._pid = connection, os.getpid()
+        return self._connection
+
+    def execute(self, sql: str, params=()) -> sqlite3.Cursor:
+        with self._lock:
+            return self.connect().execute(sql, params)
+
+    def transaction(self):
+        """`with database.transaction() as db:` runs the block as one IMMEDIATE transaction"""
+        return _Transaction(self)
+
+
+class SharedState(SQLiteDatabase):
+    """Reset generation shared by the workers of one server"""
+
+    schema = STATE_SCHEMA
+
+    def generation(self) -> int:
+        """Current reset generation (0 before the first reset)"""
+        row = self.execute("SELECT value FROM server_state WHERE key = 'generation'").fetchone()
+        return row[0] if row else 0
+
+    def bump_generation(self) -> int:
+        """Advance the reset generation for every worker and return the new value"""
+        with self.transaction() as db:
+            db.execute(
+                "INSERT INTO server_state (key, value, updated_at) VALUES ('generation', 1, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = value + 1, updated_at = excluded.updated_at",
+                (time.time(),)
+            )
+            return db.execute("SELECT value FROM server_state WHERE key = 'generation'").fetchone()[0]
+
+
+class _Transaction:
+    def __init__(self, state: SQLiteDatabase):
+        self.state = state
+
+    def __enter__(self) -> sqlite3.Connection:
+        self.state._lock.acquire()
+        connection = self.state.connect()
+        connection.execute("BEGIN IMMEDIATE")
+        return connection
+
+    def __exit__(self, exc_type, exc, tb):
+        connection = self.state.connect()
+        try:
+            connection.execute("COMMIT" if exc_type is None else "ROLLBACK")
+        finally:
+            self.state._lock.release()
+        return False
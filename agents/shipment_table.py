@@ -0,0 +1,474 @@
+"""
+CTAE-Green Shipment Table
+Columnar, array-backed shipment manifest with indexes and exposure totals
+
+Numeric columns are stored in typed arrays; text columns are dictionary
+encoded (one array of codes plus the distinct values), so a manifest with
+millions of rows costs a few bytes per cell. Rows are exposed through
+lightweight ShipmentRow views, and the CSV text is only rendered on demand
+(e.g. for a scenario prompt), reproducing the source lines exactly.
+"""
+
+import csv
+import io
+from array import array
+from pathlib import Path
+from typing import Dict, Any, List, Iterable, Iterator, Optional, Sequence, Union
+
+# Columns with a value -> rows index
+INDEXED_COLUMNS = ("origin", "destination", "status")
+
+# Rows parsed before their cells are appended column by column
+LOAD_BATCH_ROWS = 65536
+
+ID_COLUMN = "shipment_id"
+VALUE_COLUMN = "value_usd"
+
+
+class _IntColumn:
+    __slots__ = ("data",)
+    kind = "int"
+
+    def __init__(self):
+        self.data = array("q")
+
+    def __getitem__(self, row: int) -> int:
+        return self.data[row]
+
+    def text(self, row: int) -> str:
+        return str(self.data[row])
+
+    def texts(self) -> Iterator[str]:
+        return map(str, self.data)
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+
+class _FloatColumn(_IntColumn):
+    __slots__ = ()
+    kind = "float"
+
+    def __init__(self):
+        self.data = array("d")
+
+    def text(self, row: int) -> str:
+        return repr(self.data[row])
+
+    def texts(self) -> Iterator[str]:
+        return map(repr, self.data)
+
+
+class _TextColumn:
+    """Dictionary-encoded text: codes[row] indexes into values"""
+
+    __slots__ = ("codes", "values", "lookup")
+    kind = "text"
+
+    def __init__(self):
+        self.codes = array("I")
+        self.values: List[str] = []
+        self.lookup: Dict[str, int] = {}
+
+    def append(self, value: str):
+        code = self.lookup.get(value)
+        if code is None:
+            code = self.lookup[value] = len(self.values)
+            self.values.append(value)
+        self.codes.append(code)
+
+    def extend(self, values: Sequence[str]):
+        lookup = self.lookup
+        for value in dict.fromkeys(values):
+            if value not in lookup:
+                lookup[value] = len(self.values)
+                self.values.append(value)
+        self.codes.extend(map(lookup.__getitem__, values))
+
+    def __getitem__(self, row: int) -> str:
+        return self.values[self.codes[row]]
+
+    text = __getitem__
+
+    def texts(self) -> Iterator[str]:
+        return map(self.values.__getitem__, self.codes)
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+
+class _ColumnBuilder:
+    """Appends cell text, narrowing to int, then float, then text as values require"""
+
+    def __init__(self):
+        self.column = _IntColumn()
+
+    def extend(self, values: Sequence[str]):
+        """Append a batch of cells, converting them in bulk while the column type holds"""
+        column = self.column
+        try:
+            if column.kind == "int":
+                numbers = array("q", map(int, values))
+                if list(map(str, numbers)) == list(values):
+                    column.data.extend(numbers)
+                    return
+            elif column.kind == "float":
+                numbers = array("d", map(float, values))
+                if list(map(repr, numbers)) == list(values):
+                    column.data.extend(numbers)
+                    return
+            else:
+                column.extend(values)
+                return
+        except (ValueError, OverflowError):
+            pass
+        for value in values:
+            self.append(value)
+
+    def append(self, value: str):
+        column = self.column
+        if column.kind == "int":
+            try:
+                number = int(value)
+                if str(number) == value:
+                    column.data.append(number)
+                    return
+            except (ValueError, OverflowError):
+                pass
+            column = self._widen(value)
+        if column.kind == "float":
+            try:
+                number = float(value)
+                if repr(number) == value:
+                    column.data.append(number)
+                    return
+            except ValueError:
+                pass
+            column = self._widen(value)
+        column.append(value)
+
+    def _widen(self, value: str):
+        """Switch to a column type in which `value` and every earlier value round-trip exactly"""
+        old = self.column
+        if old.kind == "int" and len(old) == 0:
+            try:
+                if repr(float(value)) == value:
+                    self.column = _FloatColumn()
+                    return self.column
+            except ValueError:
+                pass
+        new = _TextColumn()
+        for row in range(len(old)):
+            new.append(old.text(row))
+        self.column = new
+        return new
+
+
+class ShipmentRow:
+    """Read-only view of one manifest row (columns are attributes or keys)"""
+
+    __slots__ = ("_table", "_row")
+
+    def __init__(self, table: "ShipmentTable", row: int):
+        self._table = table
+        self._row = row
+
+    def __getattr__(self, name: str) -> Any:
+        column = self._table._columns.get(name)
+        if column is None:
+            raise AttributeError(name)
+        return column[self._row]
+
+    def __getitem__(self, name: str) -> Any:
+        return self._table._columns[name][self._row]
+
+    @property
+    def row(self) -> int:
+        return self._row
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: column[self._row] for name, column in self._table._columns.items()}
+
+    def __repr__(self) -> str:
+        return f"ShipmentRow({self.to_dict()!r})"
+
+
+class ShipmentTable:
+    """
+    Columnar shipment manifest
+
+    Lookups:
+        table.get("SHP-2025-1042")        row view by shipment id
+        table.by_origin("Shanghai")       row views departing a port
+        table.by_destination("Rotterdam") row views bound for a port
+        table.by_port("Shanghai")         either of the above
+        table.by_status("DELAYED")        row views in a status
+        table.exposure_by_status          {status: total value_usd}
+    """
+
+    def __init__(self, lines: Iterable[str]):
+        """Build from CSV lines (with line endings); the first line is the header"""
+        lines = iter(lines)
+        first = next(lines, "")
+        self.header_line = first[:-1] if first.endswith("\n") else first
+        self.header: List[str] = next(csv.reader([self.header_line])) if self.header_line.strip() else []
+        self._columns: Dict[str, Any] = {}
+        self._id_index: Dict[str, int] = {}
+        self._indexes: Dict[str, Dict[str, array]] = {}
+        self._raw_lines: Dict[int, str] = {}   # rows whose source line doesn't re-render identically
+        self.trailer = ""                      # text after the last row (final newline, blank lines)
+        self.total_exposure = 0
+        self.exposure_by_status: Dict[str, Union[int, float]] = {}
+        self._load(lines, "\n" if first.endswith("\n") else "")
+
+    @classmethod
+    def from_csv(cls, path: Union[str, Path]) -> "ShipmentTable":
+        """Load a manifest file, streaming it line by line"""
+        with open(path, 'r') as f:
+            return cls(f)
+
+    @classmethod
+    def from_text(cls, text: str) -> "ShipmentTable":
+        return cls(io.StringIO(text))
+
+    def _load(self, lines: Iterator[str], header_ending: str):
+        n_columns = len(self.header)
+        builders = [_ColumnBuilder() for _ in self.header]
+        pending_blank = ""
+        last_ending = header_ending
+        row = 0
+        batch: List[List[str]] = []
+
+        for line in lines:
+            if not line.strip():
+                pending_blank += line
+                continue
+            pending_blank = ""
+            last_ending = "\n" if line.endswith("\n") else ""
+            text = line[:-1] if last_ending else line
+
+            if '"' in text:
+                fields = next(csv.reader([text]))
+            else:
+                fields = text.split(",")
+            if len(fields) != n_columns:
+                fields = (fields + [""] * n_columns)[:n_columns]
+            if '"' in text or text.count(",") != n_columns - 1:
+                if _format_line(fields) != text:
+                    self._raw_lines[row] = text
+
+            batch.append(fields)
+            row += 1
+            if len(batch) == LOAD_BATCH_ROWS:
+                self._append_batch(builders, batch)
+                batch = []
+
+        self._append_batch(builders, batch)
+        self.row_count = row
+        self.trailer = last_ending + pending_blank
+        self._columns = {name: builder.column for name, builder in zip(self.header, builders)}
+        self._build_indexes()
+
+    @staticmethod
+    def _append_batch(builders: List[_ColumnBuilder], batch: List[List[str]]):
+        for builder, values in zip(builders, zip(*batch)):
+            builder.extend(values)
+
+    def _build_indexes(self):
+        ids = self._columns.get(ID_COLUMN)
+        if ids is not None:
+            # Later rows win, as with a dict built from the file
+            self._id_index = dict(zip(ids.texts(), range(self.row_count)))
+
+        for name in INDEXED_COLUMNS:
+            column = self._columns.get(name)
+            if column is None:
+                continue
+            if column.kind != "text":
+                index: Dict[str, array] = {}
+                for row, value in enumerate(column.texts()):
+                    index.setdefault(value, array("I")).append(row)
+            else:
+                by_code = [array("I") for _ in column.values]
+                for row, code in enumerate(column.codes):
+                    by_code[code].append(row)
+                index = dict(zip(column.values, by_code))
+            self._indexes[name] = index
+
+        values = self._columns.get(VALUE_COLUMN)
+        if values is not None and values.kind != "text":
+            self.total_exposure = sum(values.data)
+            statuses = self._indexes.get("status", {})
+            self.exposure_by_status = {
+                status: sum(map(values.data.__getitem__, rows))
+                for status, rows in statuses.items()
+            }
+
+    # -- Rows --
+
+    def __len__(self) -> int:
+        return self.row_count
+
+    def __getitem__(self, row: int) -> ShipmentRow:
+        if row < 0:
+            row += self.row_count
+        if not 0 <= row < self.row_count:
+            raise IndexError(row)
+        return ShipmentRow(self, row)
+
+    def __iter__(self) -> Iterator[ShipmentRow]:
+        return (ShipmentRow(self, row) for row in range(self.row_count))
+
+    def __contains__(self, shipment_id) -> bool:
+        return shipment_id in self._id_index
+
+    @property
+    def columns(self) -> List[str]:
+        return list(self.header)
+
+    def column(self, name: str) -> List[Any]:
+        """All values of one column, in row order"""
+        column = self._columns[name]
+        return [column[row] for row in range(self.row_count)]
+
+    # -- Indexed lookups --
+
+    def get(self, shipment_id: str) -> Optional[ShipmentRow]:
+        row = self._id_index.get(shipment_id)
+        return None if row is None else ShipmentRow(self, row)
+
+    def row_of(self, shipment_id: str) -> int:
+        """Row number of a shipment id (KeyError if unknown)"""
+        return self._id_index[shipment_id]
+
+    def rows_where(self, column: str, value: Any) -> List[int]:
+        """Row numbers whose `column` equals `value` (indexed columns use their index)"""
+        index = self._indexes.get(column)
+        if index is not None:
+            return list(index.get(str(value), ()))
+        values = self._columns[column]
+        return [row for row in range(self.row_count) if values[row] == value]
+
+    def by_origin(self, port: str) -> List[ShipmentRow]:
+        return [ShipmentRow(self, row) for row in self.rows_where("origin", port)]
+
+    def by_destination(self, port: str) -> List[ShipmentRow]:
+        return [ShipmentRow(self, row) for row in self.rows_where("destination", port)]
+
+    def by_port(self, port: str) -> List[ShipmentRow]:
+        rows = sorted(set(self.rows_where("origin", port)) | set(self.rows_where("destination", port)))
+        return [ShipmentRow(self, row) for row in rows]
+
+    def by_status(self, status: str) -> List[ShipmentRow]:
+        return [ShipmentRow(self, row) for row in self.rows_where("status", status)]
+
+    def exposure(self, rows: Iterable[int]) -> Union[int, float]:
+        """Total value_usd of the given rows"""
+        values = self._columns.get(VALUE_COLUMN)
+        if values is None or values.kind == "text":
+            return 0
+        return sum(map(values.data.__getitem__, rows))
+
+    # -- Selection and rendering --
+
+    def select(self, shipment_ids) -> "ShipmentSelection":
+        """Selection of shipments by id ("*" selects every row in file order)"""
+        if shipment_ids == "*":
+            return ShipmentSelection(self, None)
+        missing = [shipment_id for shipment_id in shipment_ids if shipment_id not in self._id_index]
+        if missing:
+            raise KeyError(f"Unknown record ids referenced by scenario: {missing}")
+        return ShipmentSelection(self, tuple(self._id_index[shipment_id] for shipment_id in shipment_ids))
+
+    def render_row(self, row: int) -> str:
+        """CSV line for one row (without line terminator)"""
+        raw = self._raw_lines.get(row)
+        if raw is not None:
+            return raw
+        return _format_line([column.text(row) for column in self._columns.values()])
+
+    def to_csv(self, rows: Optional[Iterable[int]] = None) -> str:
+        """
+        Render CSV text
+
+        Without `rows` this reproduces the source file; with `rows` it renders
+        the header plus those rows, newline-terminated.
+        """
+        if rows is None:
+            lines = [self.header_line]
+            lines.extend(self.render_row(row) for row in range(self.row_count))
+            return "\n".join(lines) + self.trailer
+        lines = [self.header_line]
+        lines.extend(self.render_row(row) for row in rows)
+        return "\n".join(lines) + "\n"
+
+
+class ShipmentSelection:
+    """
+    The shipments a scenario refers to: a table plus row numbers, rendered lazily
+
+    str() renders the CSV text, and repr() is the repr of that text, so the
+    selection prints exactly like the raw manifest string it replaces.
+    """
+
+    __slots__ = ("table", "rows")
+
+    def __init__(self, table: ShipmentTable, rows: Optional[tuple]):
+        self.table = table
+        self.rows = rows                 # None selects every row
+
+    def row_numbers(self) -> Iterable[int]:
+        return range(self.table.row_count) if self.rows is None else self.rows
+
+    def __len__(self) -> int:
+        return self.table.row_count if self.rows is None else len(self.rows)
+
+    def __iter__(self) -> Iterator[ShipmentRow]:
+        return (ShipmentRow(self.table, row) for row in self.row_numbers())
+
+    def __contains__(self, shipment_id) -> bool:
+        row = self.table._id_index.get(shipment_id)
+        return row is not None and (self.rows is None or row in self.rows)
+
+    @property
+    def total_exposure(self) -> Union[int, float]:
+        if self.rows is None:
+            return self.table.total_exposure
+        return self.table.exposure(self.rows)
+
+    def exposure_by_status(self) -> Dict[str, Union[int, float]]:
+        if self.rows is None:
+            return dict(self.table.exposure_by_status)
+        totals: Dict[str, Union[int, float]] = {}
+        for row in self.rows:
+            shipment = ShipmentRow(self.table, row)
+            totals[shipment.status] = totals.get(shipment.status, 0) + shipment.value_usd
+        return totals
+
+    def to_csv(self) -> str:
+        return self.table.to_csv(self.rows)
+
+    def __str__(self) -> str:
+        return self.to_csv()
+
+    def __repr__(self) -> str:
+        return repr(self.to_csv())
+
+    def __hash__(self) -> int:
+        return hash((id(self.table), self.rows))
+
+    def __eq__(self, other) -> bool:
+        return (
+            isinstance(other, ShipmentSelection)
+            and other.table is self.table
+            and other.rows == self.rows
+        )
+
+
+def _format_line(fields: List[str]) -> str:
+    """Join fields as minimally quoted CSV"""
+    if any(('"' in f or "," in f or "\n" in f or "\r" in f) for f in fields):
+        buffer = io.StringIO()
+        csv.writer(buffer, lineterminator="").writerow(fields)
+        return buffer.getvalue()
+    return ",".join(fields)
@@ -0,0 +1,95 @@
+"""
+CTAE Stub White Agent
+Local A2A white agent for exercising the green agent's HTTP client
+
+Replies to /task with the demo mock response for a configurable quality,
+after an optional delay, and can inject transient failures, verbose
+reasoning, markdown formatting and truncated replies. Configuration comes
+from the environment:
+
+    PORT           port to listen on (default 8001)
+    STUB_QUALITY   strong | weak | moderate (default strong)
+    STUB_DELAY     seconds to wait before replying (default 0)
+    STUB_FAIL_FIRST  number of initial /task calls answered with 503 (default 0)
+    STUB_PAD_BYTES   extra bytes appended to "reasoning" (default 0)
+    STUB_FORMAT      envelope | markdown (default envelope)
+    STUB_TRUNCATE_BYTES  cut each reply to this many bytes (default 0: whole reply)
+"""
+
+import asyncio
+import json
+import os
+from typing import Dict, Any, Optional
+
+import uvicorn
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import Response
+from pydantic import BaseModel
+
+from green_agent import mock_white_agent_response
+
+app = FastAPI(title="CTAE Stub White Agent", version="1.0.0")
+
+settings = {
+    "quality": os.environ.get("STUB_QUALITY", "strong"),
+    "delay": float(os.environ.get("STUB_DELAY", 0)),
+    "fail_first": int(os.environ.get("STUB_FAIL_FIRST", 0)),
+    "pad_bytes": int(os.environ.get("STUB_PAD_BYTES", 0)),
+    "format": os.environ.get("STUB_FORMAT", "envelope"),
+    "truncate_bytes": int(os.environ.get("STUB_TRUNCATE_BYTES", 0))
+}
+
+# Number of /task calls received since start (or the last reset)
+calls = 0
+
+
+class TaskRequest(BaseModel):
+    """A2A protocol task request"""
+    task: str
+    metadata: Optional[Dict[str, Any]] = None
+
+
+@app.get("/health")
+async def health():
+    """Health check endpoint"""
+    return {"name": "CTAE Stub White Agent", "status": "ready", "calls": calls, **settings}
+
+
+@app.post("/task")
+async def handle_task(request: TaskRequest):
+    """Answer a scenario prompt with the configured mock response"""
+    global calls
+    calls += 1
+    if calls <= settings["fail_first"]:
+        raise HTTPException(status_code=503, detail="Stub agent warming up")
+
+    if settings["delay"]:
+        await asyncio.sleep(settings["delay"])
+
+    result = mock_white_agent_response(request.task, settings["quality"])
+    if settings["pad_bytes"]:
+        result["reasoning"] += " " + "x" * settings["pad_bytes"]
+
+    if settings["format"] == "markdown":
+        body = f"Here is my analysis.\n\n```json\n{json.dumps(result, indent=2)}\n```\n"
+        media_type = "text/markdown"
+    else:
+        body = json.dumps({"status": "completed", "result": result})
+        media_type = "application/json"
+    if settings["truncate_bytes"]:
+        body = body.encode()[:settings["truncate_bytes"]].decode(errors="ignore")
+    return Response(content=body, media_type=media_type)
+
+
+@app.post("/reset")
+async def reset():
+    """Reset the call counter (A2A protocol)"""
+    global calls
+    calls = 0
+    return {"status": "success"}
+
+
+if __name__ == "__main__":
+    port = int(os.environ.get("PORT", 8001))
+    print(f"\nStub white agent ({settings['quality']}) on port {port}\n")
+    uvicorn.run(app, host="0.0.0.0", port=port)
@@ -0,0 +1,429 @@
+"""
+CTAE-Green White Agent Client
+Pooled keep-alive A2A client for white agents, in sync (launcher) and async (server) modes
+
+Each call POSTs {"task": prompt, "metadata": {scenario_id, time_limit}} to
+`{url}/task` and parses the reply as it streams in (see response_parser):
+raw JSON, A2A envelopes and ```json fenced markdown are accepted, and reading
+stops as soon as the scored fields are complete. Calls share one keep-alive
+connection pool per white agent URL, retry transient failures with
+exponential backoff, stop at a deadline of the scenario's time_limit, and give
+up on replies that pass max_response_bytes before the scored fields end.
+
+Reported timing is split so scoring only charges the white agent for its
+own time:
+
+    queue_seconds    waiting on our side (dispatch queue, connection pool,
+                     retry backoff and failed attempts)
+    connect_seconds  TCP/TLS connection setup
+    server_seconds   request sent -> reply fully received (successful attempt)
+
+throttle_seconds is the part of queue_seconds spent waiting on the white
+agent's rate limit and concurrency cap (see admission); callers that apply
+those limits set it.
+
+httpx is imported on the first call rather than with this module, so
+building a client (e.g. at server startup) stays cheap.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import codecs
+import threading
+import time
+from typing import Dict, Any, Optional, TYPE_CHECKING
+
+from metrics import observe_stage
+from response_parser import StreamingResponseParser
+
+if TYPE_CHECKING:
+    import httpx
+
+DEFAULT_MAX_RETRIES = 2
+DEFAULT_BACKOFF_SECONDS = 0.25
+DEFAULT_MAX_RESPONSE_BYTES = 1024 * 1024
+DEFAULT_CONNECTIONS_PER_AGENT = 16
+KEEPALIVE_EXPIRY_SECONDS = 30
+
+# Error bodies up to this size are read so their connection can be reused
+MAX_DRAIN_BYTES = 64 * 1024
+
+# Responses worth retrying: the agent is overloaded or briefly unreachable
+RETRY_STATUS_CODES = frozenset({429, 502, 503, 504})
+
+
+class WhiteAgentError(Exception):
+    """A white agent call failed; `timing` covers the time spent trying"""
+
+    def __init__(self, message: str, timing: "CallTiming" = None):
+        super().__init__(message)
+        self.timing = timing
+
+
+class WhiteAgentTimeout(WhiteAgentError):
+    """The white agent did not reply within the scenario time limit"""
+
+
+class CallTiming:
+    """Where the time of one white agent call went"""
+
+    __slots__ = ("queue_seconds", "connect_seconds", "server_seconds", "total_seconds", "attempts", "throttle_seconds")
+
+    def __init__(self, queue_seconds, connect_seconds, server_seconds, total_seconds, attempts, throttle_seconds=0.0):
+        self.queue_seconds: float = queue_seconds
+        self.connect_seconds: float = connect_seconds
+        self.server_seconds: float = server_seconds
+        self.total_seconds: float = total_seconds
+        self.attempts: int = attempts
+        self.throttle_seconds: float = throttle_seconds
+
+    @classmethod
+    def measure(cls, queued_at: float, connect_seconds: float, server_started: float, attempts: int) -> "CallTiming":
+        """Timing for a call finishing now (monotonic clock)"""
+        finished = time.monotonic()
+        total = finished - queued_at
+        server = finished - server_started
+        queue = max(0.0, total - connect_seconds - server)
+        return cls(queue, connect_seconds, server, total, attempts)
+
+    @classmethod
+    def replayed(cls, server_seconds: float) -> "CallTiming":
+        """Timing for a reply served from the response cache: the original server time, no attempts"""
+        return cls(0.0, 0.0, server_seconds, 0.0, 0)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "queue_seconds": round(self.queue_seconds, 4),
+            "throttle_seconds": round(self.throttle_seconds, 4),
+            "connect_seconds": round(self.connect_seconds, 4),
+            "server_seconds": round(self.server_seconds, 4),
+            "total_seconds": round(self.total_seconds, 4),
+            "attempts": self.attempts
+        }
+
+
+class WhiteAgentReply:
+    """Parsed white agent response plus its timing"""
+
+    __slots__ = ("response", "timing")
+
+    def __init__(self, response: Dict[str, Any], timing: CallTiming):
+        self.response = response
+        self.timing = timing
+
+
+class _AttemptTrace:
+    """Collects httpcore trace events for one request attempt"""
+
+    def __init__(self):
+        self.connect_seconds = 0.0
+        self.sent_at: Optional[float] = None
+        self._connect_started: Optional[float] = None
+
+    def record(self, event: str, info: Dict[str, Any]):
+        now = time.monotonic()
+        if event.startswith("connection."):
+            if event.endswith(".started"):
+                self._connect_started = now
+            elif self._connect_started is not None:
+                self.connect_seconds += now - self._connect_started
+                self._connect_started = None
+        elif event.endswith("send_request_headers.started") and self.sent_at is None:
+            self.sent_at = now
+
+    async def arecord(self, event: str, info: Dict[str, Any]):
+        self.record(event, info)
+
+
+class _ReplyReader:
+    """Decodes reply bytes into the streaming parser, enforcing the size limit and timing the parse"""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.parse_seconds = 0.0
+        self.parser = StreamingResponseParser()
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+
+    def feed(self, chunk: bytes) -> bool:
+        """Parse the next chunk; True once the scored fields are complete"""
+        self.size += len(chunk)
+        if self.size > self.max_bytes:
+            raise WhiteAgentError(
+                f"White agent response exceeded {self.max_bytes} bytes before the scored fields were complete"
+            )
+        started = time.perf_counter()
+        try:
+            return self.parser.feed(self._decoder.decode(chunk))
+        finally:
+            self.parse_seconds += time.perf_counter() - started
+
+    def close(self) -> Dict[str, Any]:
+        started = time.perf_counter()
+        self.parser.feed(self._decoder.decode(b"", final=True))
+        response = self.parser.close()
+        self.parse_seconds += time.perf_counter() - started
+        observe_stage("parse", self.parse_seconds, failed=not self.parser.found_json)
+        if not self.parser.found_json:
+            raise WhiteAgentError("White agent reply contained no JSON object")
+        return response
+
+
+class _WhiteAgentClientBase:
+    """Request building, reply parsing and retry policy shared by both clients"""
+
+    def __init__(
+        self,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        backoff_seconds: float = DEFAULT_BACKOFF_SECONDS,
+        max_response_bytes: int = DEFAULT_MAX_RESPONSE_BYTES,
+        connections_per_agent: int = DEFAULT_CONNECTIONS_PER_AGENT
+    ):
+        if max_retries < 0:
+            raise ValueError("max_retries must be non-negative")
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.max_response_bytes = max_response_bytes
+        self.connections_per_agent = connections_per_agent
+        self._clients: Dict[str, Any] = {}
+
+    def _limits(self) -> httpx.Limits:
+        import httpx
+        return httpx.Limits(
+            max_connections=self.connections_per_agent,
+            max_keepalive_connections=self.connections_per_agent,
+            keepalive_expiry=KEEPALIVE_EXPIRY_SECONDS
+        )
+
+    @staticmethod
+    def _pool_key(url: str) -> str:
+        return url.rstrip("/")
+
+    @staticmethod
+    def _payload(scenario: Dict[str, Any], prompt: str) -> Dict[str, Any]:
+        return {
+            "task": prompt,
+            "metadata": {
+                "scenario_id": scenario['id'],
+                "time_limit": scenario['time_limit']
+            }
+        }
+
+    @staticmethod
+    def _drainable(response: httpx.Response) -> bool:
+        """Whether an error body is small enough to read so its connection can be reused"""
+        declared = response.headers.get("content-length")
+        return declared is not None and declared.isdigit() and int(declared) <= MAX_DRAIN_BYTES
+
+    def _retry_delay(self, attempt: int, deadline: float) -> Optional[float]:
+        """Backoff before the next attempt, or None if no attempt is left"""
+        if attempt > self.max_retries:
+            return None
+        delay = self.backoff_seconds * (2 ** (attempt - 1))
+        if time.monotonic() + delay >= deadline:
+            return None
+        return delay
+
+    @staticmethod
+    def _timeout_error(scenario: Dict[str, Any], queued_at: float, connect: float, started: float, attempts: int):
+        return WhiteAgentTimeout(
+            f"White agent timed out after {scenario['time_limit']}s",
+            CallTiming.measure(queued_at, connect, started, attempts)
+        )
+
+
+class WhiteAgentClient(_WhiteAgentClientBase):
+    """Blocking white agent client (one keep-alive pool per URL, safe to share across threads)"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._lock = threading.Lock()
+
+    def _client_for(self, url: str) -> httpx.Client:
+        import httpx
+        key = self._pool_key(url)
+        client = self._clients.get(key)
+        if client is None:
+            with self._lock:
+                client = self._clients.get(key)
+                if client is None:
+                    client = self._clients[key] = httpx.Client(limits=self._limits())
+        return client
+
+    def _attempt(self, client: httpx.Client, endpoint: str, payload: Dict[str, Any],
+                 remaining: float, deadline: float, trace: _AttemptTrace):
+        """One POST; returns (status, reply reader or None for an error status)"""
+        import httpx
+        with client.stream(
+            "POST", endpoint, json=payload, timeout=remaining, extensions={"trace": trace.record}
+        ) as response:
+            status = response.status_code
+            if status >= 400:
+                if self._drainable(response):
+                    response.read()
+                return status, None
+            reader = _ReplyReader(self.max_response_bytes)
+            for chunk in response.iter_bytes():
+                if reader.feed(chunk):
+                    break
+                if time.monotonic() > deadline:
+                    raise httpx.ReadTimeout("Deadline exceeded while reading response")
+            return status, reader
+
+    def call(self, url: str, scenario: Dict[str, Any], prompt: str, queued_at: float = None) -> WhiteAgentReply:
+        """
+        Send one scenario prompt and wait for the reply
+
+        Args:
+            url: White agent base URL
+            scenario: Scenario being evaluated (its time_limit is the deadline)
+            prompt: Scenario prompt
+            queued_at: time.monotonic() when the scenario was queued (default: now)
+
+        Raises:
+            WhiteAgentTimeout: No reply within the time limit
+            WhiteAgentError: Every attempt failed, or the reply was unusable
+        """
+        import httpx
+        started = time.monotonic()
+        queued_at = started if queued_at is None else queued_at
+        deadline = started + scenario['time_limit']
+        client = self._client_for(url)
+        endpoint = self._pool_key(url) + "/task"
+        payload = self._payload(scenario, prompt)
+        connect = 0.0
+        attempt = 0
+
+        while True:
+            attempt += 1
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise self._timeout_error(scenario, queued_at, connect, started, attempt - 1)
+
+            trace = _AttemptTrace()
+            try:
+                status, reader = self._attempt(client, endpoint, payload, remaining, deadline, trace)
+                failure = f"HTTP {status}" if status in RETRY_STATUS_CODES else None
+            except httpx.TransportError as e:
+                failure = str(e) or type(e).__name__
+            except WhiteAgentError as e:
+                connect += trace.connect_seconds
+                e.timing = CallTiming.measure(queued_at, connect, trace.sent_at or started, attempt)
+                raise
+            connect += trace.connect_seconds
+
+            if failure is None:
+                timing = CallTiming.measure(queued_at, connect, trace.sent_at or started, attempt)
+                if reader is None:
+                    raise WhiteAgentError(f"White agent request failed: HTTP {status}", timing)
+                try:
+                    return WhiteAgentReply(reader.close(), timing)
+                except WhiteAgentError as e:
+                    e.timing = timing
+                    raise
+
+            delay = self._retry_delay(attempt, deadline)
+            if delay is None:
+                if time.monotonic() >= deadline:
+                    raise self._timeout_error(scenario, queued_at, connect, started, attempt)
+                raise WhiteAgentError(
+                    f"White agent request failed after {attempt} attempts: {failure}",
+                    CallTiming.measure(queued_at, connect, trace.sent_at or started, attempt)
+                )
+            time.sleep(delay)
+
+    def close(self):
+        for client in self._clients.values():
+            client.close()
+        self._clients.clear()
+
+
+class AsyncWhiteAgentClient(_WhiteAgentClientBase):
+    """Asyncio white agent client (one keep-alive pool per URL)"""
+
+    def _client_for(self, url: str) -> httpx.AsyncClient:
+        import httpx
+        key = self._pool_key(url)
+        client = self._clients.get(key)
+        if client is None:
+            client = self._clients[key] = httpx.AsyncClient(limits=self._limits())
+        return client
+
+    async def _attempt(self, client: httpx.AsyncClient, endpoint: str, payload: Dict[str, Any],
+                       remaining: float, trace: _AttemptTrace):
+        """One POST; returns (status, reply reader or None for an error status)"""
+        async with client.stream(
+            "POST", endpoint, json=payload, timeout=remaining, extensions={"trace": trace.arecord}
+        ) as response:
+            status = response.status_code
+            if status >= 400:
+                if self._drainable(response):
+                    await response.aread()
+                return status, None
+            reader = _ReplyReader(self.max_response_bytes)
+            async for chunk in response.aiter_bytes():
+                if reader.feed(chunk):
+                    break
+            return status, reader
+
+    async def call(self, url: str, scenario: Dict[str, Any], prompt: str, queued_at: float = None) -> WhiteAgentReply:
+        """Async equivalent of WhiteAgentClient.call (the deadline is enforced with wait_for)"""
+        import httpx
+        started = time.monotonic()
+        queued_at = started if queued_at is None else queued_at
+        deadline = started + scenario['time_limit']
+        client = self._client_for(url)
+        endpoint = self._pool_key(url) + "/task"
+        payload = self._payload(scenario, prompt)
+        connect = 0.0
+        attempt = 0
+
+        while True:
+            attempt += 1
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise self._timeout_error(scenario, queued_at, connect, started, attempt - 1)
+
+            trace = _AttemptTrace()
+            try:
+                status, reader = await asyncio.wait_for(
+                    self._attempt(client, endpoint, payload, remaining, trace),
+                    timeout=remaining
+                )
+                failure = f"HTTP {status}" if status in RETRY_STATUS_CODES else None
+            except asyncio.TimeoutError:
+                connect += trace.connect_seconds
+                raise self._timeout_error(scenario, queued_at, connect, started, attempt)
+            except httpx.TransportError as e:
+                failure = str(e) or type(e).__name__
+            except WhiteAgentError as e:
+                connect += trace.connect_seconds
+                e.timing = CallTiming.measure(queued_at, connect, trace.sent_at or started, attempt)
+                raise
+            connect += trace.connect_seconds
+
+            if failure is None:
+                timing = CallTiming.measure(queued_at, connect, trace.sent_at or started, attempt)
+                if reader is None:
+                    raise WhiteAgentError(f"White agent request failed: HTTP {status}", timing)
+                try:
+                    return WhiteAgentReply(reader.close(), timing)
+                except WhiteAgentError as e:
+                    e.timing = timing
+                    raise
+
+            delay = self._retry_delay(attempt, deadline)
+            if delay is None:
+                if time.monotonic() >= deadline:
+                    raise self._timeout_error(scenario, queued_at, connect, started, attempt)
+                raise WhiteAgentError(
+                    f"White agent request failed after {attempt} attempts: {failure}",
+                    CallTiming.measure(queued_at, connect, trace.sent_at or started, attempt)
+                )
+            await asyncio.sleep(delay)
+
+    async def aclose(self):
+        for client in self._clients.values():
+            await client.aclose()
+        self._clients.clear()
@@ -0,0 +1,118 @@
+"""Benchmarks for CTAEGreenAgent data load, prompting, scoring and reporting"""
+
+import json
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from green_agent import CTAEGreenAgent, mock_white_agent_response  # noqa: E402
+from prompt_builder import prompt_builder  # noqa: E402
+from scenario_repository import repository  # noqa: E402
+from scenario_snapshot import build_snapshot, invalidate_snapshots  # noqa: E402
+
+
+@pytest.fixture
+def agent(dataset):
+    """Green agent without the evaluation cache, so scoring benchmarks measure scoring"""
+    return CTAEGreenAgent(dataset.path, use_cache=False)
+
+
+@pytest.fixture
+def scored(agent):
+    """(scenario_id, response) pairs plus the results of scoring them"""
+    pairs = []
+    results = []
+    for scenario in agent.scenarios:
+        prompt = agent.create_scenario_prompt(scenario)
+        response = mock_white_agent_response(prompt, "strong")
+        pairs.append((scenario['id'], response))
+        results.append({
+            "scenario_name": scenario['name'],
+            "difficulty": scenario['difficulty'],
+            "scores": agent.evaluate_response(scenario['id'], response, 2.0)
+        })
+    return pairs, results
+
+
+def bench_init_data_load(benchmark, dataset):
+    """CTAEGreenAgent.__init__ in a fresh process: nothing cached but the on-disk email index"""
+    benchmark.group = f"init[{dataset.name}]"
+    benchmark.pedantic(
+        CTAEGreenAgent, args=(dataset.path,),
+        setup=repository.invalidate, rounds=dataset.rounds
+    )
+
+
+def bench_init_cached(benchmark, dataset):
+    """CTAEGreenAgent.__init__ when the process already holds the dataset"""
+    benchmark.group = f"init[{dataset.name}]"
+    CTAEGreenAgent(dataset.path)
+    benchmark(CTAEGreenAgent, dataset.path)
+
+
+def bench_init_snapshot(benchmark, dataset, tmp_path):
+    """CTAEGreenAgent.__init__ in a fresh process from a prebuilt snapshot (mapped, not parsed)"""
+    benchmark.group = f"init[{dataset.name}]"
+    path = build_snapshot(dataset.path, tmp_path / "snapshot.bin")['path']
+
+    def fresh():
+        repository.invalidate()
+        invalidate_snapshots()
+
+    benchmark.pedantic(
+        CTAEGreenAgent, args=(dataset.path,), kwargs={"snapshot": path},
+        setup=fresh, rounds=dataset.rounds
+    )
+
+
+def bench_create_scenario_prompt(benchmark, dataset, agent):
+    """create_scenario_prompt for every scenario (memoized prompts)"""
+    benchmark.group = f"prompt[{dataset.name}]"
+    scenarios = list(agent.scenarios)
+    benchmark(lambda: [agent.create_scenario_prompt(scenario) for scenario in scenarios])
+
+
+def bench_render_prompt_uncached(benchmark, dataset, agent):
+    """Full prompt render for every scenario, bypassing fragment and prompt caches"""
+    benchmark.group = f"prompt[{dataset.name}]"
+    scenarios = list(agent.scenarios)
+    benchmark(lambda: [prompt_builder.render(scenario, cached=False) for scenario in scenarios])
+
+
+def bench_render_compact_prompt(benchmark, dataset, agent):
+    """Relevance filtering plus compact render for every scenario, bypassing the prompt memo"""
+    benchmark.group = f"prompt[{dataset.name}]"
+    scenarios = list(agent.scenarios)
+    benchmark(lambda: [prompt_builder.render(agent.relevance.compact(scenario)) for scenario in scenarios])
+
+
+def bench_evaluate_response(benchmark, dataset, agent, scored):
+    """evaluate_response over one strong mock response per scenario"""
+    benchmark.group = f"evaluate[{dataset.name}]"
+    pairs, _ = scored
+    benchmark(lambda: [agent.evaluate_response(scenario_id, response, 2.0) for scenario_id, response in pairs])
+
+
+def bench_evaluate_raw_text(benchmark, dataset, agent, scored):
+    """evaluate_response on raw JSON text (tolerant streaming parse plus scoring)"""
+    benchmark.group = f"evaluate[{dataset.name}]"
+    pairs = [(scenario_id, json.dumps({"status": "completed", "result": response})) for scenario_id, response in scored[0]]
+    benchmark(lambda: [agent.evaluate_response(scenario_id, body, 2.0) for scenario_id, body in pairs])
+
+
+def bench_evaluate_raw_text_cached(benchmark, dataset, scored):
+    """evaluate_response on raw JSON text seen before (answered from the in-memory score cache)"""
+    benchmark.group = f"evaluate[{dataset.name}]"
+    pairs = [(scenario_id, json.dumps({"status": "completed", "result": response})) for scenario_id, response in scored[0]]
+    cached_agent = CTAEGreenAgent(dataset.path)
+    for scenario_id, body in pairs:
+        cached_agent.evaluate_response(scenario_id, body, 2.0)
+    benchmark(lambda: [cached_agent.evaluate_response(scenario_id, body, 2.0) for scenario_id, body in pairs])
+
+
+def bench_generate_evaluation_report(benchmark, dataset, agent, scored):
+    """Text report over 100 results per scenario"""
+    benchmark.group = f"report[{dataset.name}]"
+    results = scored[1] * 100
+    benchmark(agent.generate_evaluation_report, results)
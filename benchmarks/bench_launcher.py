@@ -0,0 +1,28 @@
+"""Benchmarks for CTAELauncher.run_full_evaluation with the mock white agents"""
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+import launcher  # noqa: E402
+
+
+@pytest.fixture
+def ready_launcher(dataset, quiet, monkeypatch):
+    # The pause between agents is for readability of the demo output only
+    monkeypatch.setattr(launcher.time, "sleep", lambda seconds: None)
+    instance = launcher.CTAELauncher(str(dataset.path))
+    with quiet:
+        assert instance.initialize()
+    return instance
+
+
+def bench_run_full_evaluation(benchmark, dataset, ready_launcher, quiet):
+    """Three mock agents x every scenario, including resets and the leaderboard"""
+    benchmark.group = f"launcher[{dataset.name}]"
+
+    def run():
+        with quiet:
+            ready_launcher.run_full_evaluation()
+
+    benchmark.pedantic(run, rounds=dataset.rounds, warmup_rounds=1)
@@ -0,0 +1,41 @@
+"""Benchmarks for the A2A server's /task round trip (in-process test client)"""
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+pytest.importorskip("httpx")
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+import green_agent_server  # noqa: E402
+from green_agent import CTAEGreenAgent  # noqa: E402
+from server_state import AgentSnapshot  # noqa: E402
+from results_store import ResultsStore  # noqa: E402
+
+
+@pytest.fixture
+def client(dataset, quiet, tmp_path, monkeypatch):
+    # Evaluations are recorded as they would be in production, into a throwaway database
+    monkeypatch.setattr(green_agent_server, "results_store", ResultsStore(tmp_path / "results.sqlite3"))
+    with quiet, TestClient(green_agent_server.app) as client:
+        green_agent_server.agent_slot.swap(AgentSnapshot(0, CTAEGreenAgent(dataset.path)))
+        yield client
+
+
+def bench_task_evaluate_agent(benchmark, dataset, client):
+    """evaluate_agent over every scenario with the built-in mock white agent (no white_agent_url)"""
+    benchmark.group = f"server[{dataset.name}]"
+    payload = {"task": "evaluate_agent", "metadata": {}}
+
+    def round_trip():
+        response = client.post("/task", json=payload)
+        assert response.status_code == 200 and response.json()["status"] == "success"
+
+    benchmark.pedantic(round_trip, rounds=dataset.rounds, warmup_rounds=1)
+
+
+def bench_task_list_scenarios(benchmark, dataset, client):
+    """list_scenarios (catalog index only)"""
+    benchmark.group = f"server[{dataset.name}]"
+    payload = {"task": "list_scenarios", "metadata": {}}
+    benchmark(lambda: client.post("/task", json=payload).raise_for_status())
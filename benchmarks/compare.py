@@ -0,0 +1,104 @@
+"""
+CTAE-Green Benchmark Comparison
+Fails when a benchmark got slower than its baseline by more than a threshold
+
+Usage:
+    python -m pytest benchmarks --benchmark-json=benchmarks/baselines/main.json
+    ... change code ...
+    python -m pytest benchmarks --benchmark-json=/tmp/current.json
+    python benchmarks/compare.py benchmarks/baselines/main.json /tmp/current.json --threshold 0.15
+
+Both files are pytest-benchmark JSON output. Benchmarks are matched by
+full name (test id including the dataset size). Exit status is 1 if any
+benchmark regressed past the threshold, 0 otherwise.
+"""
+
+import argparse
+import json
+import sys
+from typing import Dict, Any, List
+
+DEFAULT_THRESHOLD = 0.10
+DEFAULT_STAT = "median"
+
+
+def load_stats(path: str, stat: str) -> Dict[str, float]:
+    """{benchmark fullname: seconds} from a pytest-benchmark JSON file"""
+    with open(path, 'r') as f:
+        doc = json.load(f)
+    return {bench["fullname"]: bench["stats"][stat] for bench in doc.get("benchmarks", [])}
+
+
+def compare(baseline: Dict[str, float], current: Dict[str, float], threshold: float) -> List[Dict[str, Any]]:
+    """One row per benchmark in either run, with its ratio and verdict"""
+    rows = []
+    for name in sorted(set(baseline) | set(current)):
+        before = baseline.get(name)
+        after = current.get(name)
+        if before is None or after is None:
+            status = "new" if before is None else "missing"
+            rows.append({"name": name, "baseline": before, "current": after, "ratio": None, "status": status})
+            continue
+        ratio = after / before if before > 0 else float("inf")
+        if ratio > 1 + threshold:
+            status = "REGRESSED"
+        elif ratio < 1 - threshold:
+            status = "improved"
+        else:
+            status = "ok"
+        rows.append({"name": name, "baseline": before, "current": after, "ratio": ratio, "status": status})
+    return rows
+
+
+def _format_seconds(value) -> str:
+    if value is None:
+        return "-"
+    if value >= 1:
+        return f"{value:.3f}s"
+    if value >= 1e-3:
+        return f"{value * 1e3:.3f}ms"
+    return f"{value * 1e6:.1f}us"
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Compare pytest-benchmark results against a baseline")
+    parser.add_argument("baseline", help="Baseline pytest-benchmark JSON")
+    parser.add_argument("current", help="Current pytest-benchmark JSON")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help=f"Allowed slowdown as a fraction (default: {DEFAULT_THRESHOLD})"
+    )
+    parser.add_argument(
+        "--stat",
+        default=DEFAULT_STAT,
+        choices=["min", "median", "mean", "max"],
+        help=f"Statistic to compare (default: {DEFAULT_STAT})"
+    )
+    parser.add_argument("--fail-on-missing", action="store_true", help="Also fail if a baseline benchmark did not run")
+    args = parser.parse_args(argv)
+
+    rows = compare(load_stats(args.baseline, args.stat), load_stats(args.current, args.stat), args.threshold)
+
+    width = max([len(row["name"]) for row in rows] + [9])
+    print(f"{'Benchmark':<{width}}  {'Baseline':>12}  {'Current':>12}  {'Ratio':>7}  Status")
+    print("-" * (width + 48))
+    for row in rows:
+        ratio = "-" if row["ratio"] is None else f"{row['ratio']:.2f}x"
+        print(
+            f"{row['name']:<{width}}  {_format_seconds(row['baseline']):>12}  "
+            f"{_format_seconds(row['current']):>12}  {ratio:>7}  {row['status']}"
+        )
+
+    regressed = [row for row in rows if row["status"] == "REGRESSED"]
+    missing = [row for row in rows if row["status"] == "missing"]
+    print(f"\n{len(regressed)} regressed, {len(missing)} missing "
+          f"(threshold {args.threshold:.0%} on {args.stat})")
+    if regressed or (args.fail_on_missing and missing):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
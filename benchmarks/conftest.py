@@ -0,0 +1,63 @@
+"""
+Shared fixtures for the CTAE-Green benchmark suite
+
+Datasets are synthesized once per session with the seeded generator, at the
+sizes named in CTAE_BENCH_SIZES (comma separated, default "small").
+"""
+
+import contextlib
+import io
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "agents"))
+sys.path.insert(0, str(ROOT))
+
+from scenario_generator import DatasetGenerator  # noqa: E402
+
+BENCH_SEED = 2025
+
+# name -> (generator record counts, benchmark rounds for slow paths)
+DATASET_SIZES = {
+    "small": ({"emails": 20, "alerts": 5, "shipments": 50, "scenarios": 5}, 20),
+    "medium": ({"emails": 2_000, "alerts": 100, "shipments": 20_000, "scenarios": 20}, 5),
+    "large": ({"emails": 20_000, "alerts": 1_000, "shipments": 200_000, "scenarios": 50}, 3),
+}
+
+
+def selected_sizes():
+    names = [name.strip() for name in os.environ.get("CTAE_BENCH_SIZES", "small").split(",") if name.strip()]
+    unknown = [name for name in names if name not in DATASET_SIZES]
+    if unknown:
+        raise pytest.UsageError(f"Unknown CTAE_BENCH_SIZES {unknown}; choose from {list(DATASET_SIZES)}")
+    return names
+
+
+class Dataset:
+    def __init__(self, name: str, path: Path, counts, rounds: int):
+        self.name = name
+        self.path = path
+        self.counts = counts
+        self.rounds = rounds
+
+
+@pytest.fixture(scope="session", params=selected_sizes())
+def dataset(request, tmp_path_factory):
+    """A generated data directory; its email index is warmed by one load"""
+    counts, rounds = DATASET_SIZES[request.param]
+    path = tmp_path_factory.mktemp(f"data_{request.param}")
+    DatasetGenerator(seed=BENCH_SEED, **counts).write(path / "data")
+
+    from green_agent import CTAEGreenAgent
+    CTAEGreenAgent(path / "data")
+    return Dataset(request.param, path / "data", counts, rounds)
+
+
+@pytest.fixture
+def quiet():
+    """Silence the launcher's progress output while a benchmark runs"""
+    return contextlib.redirect_stdout(io.StringIO())
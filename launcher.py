@@ -4,23 +4,56 @@ CTAE-Green Launcher
 Orchestrates end-to-end evaluation: Green Agent evaluates White Agent(s)
 """
 
+import os
+import sqlite3
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
 from pathlib import Path
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Tuple
 
 # Add agents directory to path
 sys.path.insert(0, str(Path(__file__).parent / "agents"))
 
 from green_agent import CTAEGreenAgent, mock_white_agent_response
+from metrics import stage
+from prompt_builder import prompt_stats
+from rescoring import rescore_archive
+from scenario_generator import DatasetGenerator
+from scenario_snapshot import build_snapshot
+from report_writer import ReportAccumulator, performance_tier
+from white_agent_client import WhiteAgentClient, WhiteAgentReply, WhiteAgentError, CallTiming
+from admission import AgentLimiter, DEFAULT_AGENT_RATE, DEFAULT_AGENT_BURST, DEFAULT_AGENT_CONCURRENCY
+from results_store import ResultsStore
+from rubric import RUBRIC_VERSION
+
+# Launcher used by tournament worker processes (inherited on fork, rebuilt otherwise)
+_worker_launcher: Optional["CTAELauncher"] = None
 
 
 class CTAELauncher:
     """Launcher for CTAE-Green evaluation system"""
     
-    def __init__(self):
+    def __init__(
+        self,
+        data_dir: Optional[str] = None,
+        results_store: Optional[ResultsStore] = None,
+        use_cache: bool = True,
+        compact_prompts: bool = False,
+        agent_limiter: Optional[AgentLimiter] = None
+    ):
+        self.data_dir = data_dir
+        # Cache white agent replies (versioned agents only) and scores across runs
+        self.use_cache = use_cache
+        # Send only the emails, alerts and shipments relevant to each scenario
+        self.compact_prompts = compact_prompts
         self.green_agent: CTAEGreenAgent = None
         self.white_agents: Dict[str, Any] = {}
+        self.white_agent_client = WhiteAgentClient()
+        # Per-URL rate limit and concurrency cap for remote white agents (shared by tournament threads)
+        self.agent_limiter = agent_limiter or AgentLimiter()
+        # Where scored results are persisted (None: keep them in memory only)
+        self.results_store = results_store
         
     def initialize(self):
         """Initialize all agents"""
@@ -30,7 +63,7 @@ class CTAELauncher:
         print("\n[1/3] Initializing Green Agent...")
         
         try:
-            self.green_agent = CTAEGreenAgent()
+            self.green_agent = CTAEGreenAgent(self.data_dir, use_cache=self.use_cache, compact_prompts=self.compact_prompts)
             print(f"      ✓ Green Agent ready")
             print(f"      ✓ Loaded {len(self.green_agent.scenarios)} evaluation scenarios")
         except Exception as e:
@@ -77,7 +110,7 @@ class CTAELauncher:
         print("\n[RESET] Resetting agents to initial state...")
         
         # Reset green agent
-        self.green_agent = CTAEGreenAgent()
+        self.green_agent = CTAEGreenAgent(self.data_dir, use_cache=self.use_cache, compact_prompts=self.compact_prompts)
         print("        ✓ Green Agent reset")
         
         # In production, would send reset signals to white agents
@@ -99,7 +132,6 @@ class CTAELauncher:
             raise ValueError(f"Unknown agent: {agent_id}")
         
         agent_info = self.white_agents[agent_id]
-        agent_quality = agent_info["quality"]
         
         print(f"\n{'=' * 70}")
         print(f"EVALUATING: {agent_info['name']}")
@@ -109,7 +141,15 @@ class CTAELauncher:
         
         # Select scenarios
         if scenario_ids:
-            scenarios = [s for s in self.green_agent.scenarios if s['id'] in scenario_ids]
+            unknown = [sid for sid in scenario_ids if sid not in self.green_agent.catalog]
+            if unknown:
+                raise ValueError(f"Unknown scenarios: {', '.join(unknown)}")
+            wanted = set(scenario_ids)
+            scenarios = [
+                self.green_agent.get_scenario(entry['id'])
+                for entry in self.green_agent.list_scenarios()
+                if entry['id'] in wanted
+            ]
         else:
             scenarios = self.green_agent.scenarios
         
@@ -125,30 +165,36 @@ class CTAELauncher:
             # Step 1: Green agent creates scenario prompt
             print("  [Step 1/4] Green Agent preparing scenario...")
             prompt = self.green_agent.create_scenario_prompt(scenario)
-            print(f"            ✓ Scenario prompt ready ({len(prompt)} chars)")
+            size = prompt_stats(prompt)
+            print(f"            ✓ Scenario prompt ready ({size['chars']:,} chars, ~{size['estimated_tokens']:,} tokens)")
             
             # Step 2: Send to white agent
             print(f"  [Step 2/4] Sending to {agent_info['name']}...")
-            start_time = time.time()
-            
-            # In production: HTTP request to agent_info['url']
-            # For demo: Use quality-aware mock
-            if agent_quality == "strong":
-                white_response = self._mock_strong_response(scenario)
-            elif agent_quality == "weak":
-                white_response = self._mock_weak_response(scenario)
-            else:  # moderate
-                white_response = self._mock_moderate_response(scenario)
+            digest = None
+            try:
+                reply, digest = self._get_reply(agent_id, scenario, prompt)
+                white_response, timing = reply.response, reply.timing
+                if timing.attempts == 0:
+                    print(f"            ✓ Response replayed from cache (originally {timing.server_seconds:.2f}s)")
+                else:
+                    print(f"            ✓ Response received in {timing.server_seconds:.2f}s")
+            except WhiteAgentError as e:
+                white_response, timing = {}, e.timing
+                print(f"            ✗ {e}")
+            if timing.connect_seconds or timing.queue_seconds > 0.01:
+                print(f"              (queue {timing.queue_seconds:.2f}s incl. throttle {timing.throttle_seconds:.2f}s, "
+                      f"connect {timing.connect_seconds:.2f}s, {timing.attempts} attempt(s))")
             
-            response_time = time.time() - start_time
-            print(f"            ✓ Response received in {response_time:.2f}s")
+            # Only the white agent's own time counts towards response_time_score
+            response_time = timing.server_seconds
             
             # Step 3: Green agent evaluates response
             print("  [Step 3/4] Green Agent evaluating response...")
             scores = self.green_agent.evaluate_response(
                 scenario['id'],
                 white_response,
-                response_time
+                response_time,
+                response_digest=digest
             )
             print(f"            ✓ Evaluation complete")
             
@@ -162,48 +208,161 @@ class CTAELauncher:
             print(f"            - OVERALL SCORE:       {scores['overall_score']:.1f}/100")
             
             # Determine tier
-            overall = scores['overall_score']
-            tier = (
-                "EXCELLENT" if overall >= 80 else
-                "GOOD" if overall >= 60 else
-                "FAIR" if overall >= 40 else
-                "NEEDS IMPROVEMENT"
-            )
-            print(f"            - Performance Tier:    {tier}")
+            print(f"            - Performance Tier:    {performance_tier(scores['overall_score'])}")
             
             results.append({
                 "scenario_id": scenario['id'],
                 "scenario_name": scenario['name'],
                 "difficulty": scenario['difficulty'],
-                "scores": scores
+                "scores": scores,
+                "prompt": size
             })
         
         # Calculate aggregate
-        avg_overall = sum(r['scores']['overall_score'] for r in results) / len(results)
-        avg_extraction = sum(r['scores']['data_extraction_accuracy'] for r in results) / len(results)
-        avg_reasoning = sum(r['scores']['risk_reasoning_quality'] for r in results) / len(results)
-        avg_recommendations = sum(r['scores']['recommendation_coherence'] for r in results) / len(results)
+        agent_result = self._build_agent_result(agent_id, results)
+        agg = agent_result['aggregate']
+        self._record_results(agent_result)
         
         print(f"\n{'=' * 70}")
         print(f"AGGREGATE RESULTS: {agent_info['name']}")
         print(f"{'=' * 70}")
-        print(f"Average Overall Score:          {avg_overall:.2f}/100")
-        print(f"Average Data Extraction:        {avg_extraction:.2f}/100")
-        print(f"Average Risk Reasoning:         {avg_reasoning:.2f}/100")
-        print(f"Average Recommendation Quality: {avg_recommendations:.2f}/100")
+        print(f"Average Overall Score:          {agg['overall_score']:.2f}/100")
+        print(f"Average Data Extraction:        {agg['data_extraction']:.2f}/100")
+        print(f"Average Risk Reasoning:         {agg['risk_reasoning']:.2f}/100")
+        print(f"Average Recommendation Quality: {agg['recommendations']:.2f}/100")
+        if agent_result.get('run_id'):
+            print(f"Recorded as run {agent_result['run_id']} (rubric v{RUBRIC_VERSION})")
         print(f"{'=' * 70}\n")
         
+        return agent_result
+    
+    def _build_agent_result(self, agent_id: str, results: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Package per-scenario results with their aggregate averages"""
+        totals = ReportAccumulator()
+        for result in results:
+            totals.add(result['scores'])
+        averages = totals.averages()
+        
         return {
             "agent_id": agent_id,
-            "agent_name": agent_info['name'],
+            "agent_name": self.white_agents[agent_id]['name'],
             "scenarios_evaluated": len(results),
             "results": results,
-            "aggregate": {
-                "overall_score": round(avg_overall, 2),
-                "data_extraction": round(avg_extraction, 2),
-                "risk_reasoning": round(avg_reasoning, 2),
-                "recommendations": round(avg_recommendations, 2)
-            }
+            "aggregate": {key: round(value, 2) for key, value in averages.items()}
+        }
+    
+    def _record_results(self, agent_result: Dict[str, Any]):
+        """Persist an agent's per-scenario results, adding the run id to `agent_result`"""
+        if self.results_store is None:
+            return
+        try:
+            agent_result['run_id'] = self.results_store.record(
+                agent_result['agent_id'],
+                agent_result['results'],
+                agent_name=agent_result['agent_name'],
+                data_version=self.green_agent.data_version
+            )
+        except sqlite3.Error as e:
+            print(f"  ✗ Could not record results in {self.results_store.path}: {e}")
+
+    def register_white_agent(self, agent_id: str, url: str, name: str = None, description: str = None, version: str = None):
+        """
+        Register a white agent reachable over A2A at `url`
+        
+        With a `version` (the agent's build), its replies are cached per
+        prompt and a repeated prompt is not sent again.
+        """
+        self.white_agents[agent_id] = {
+            "name": name or agent_id,
+            "description": description or f"A2A white agent at {url}",
+            "quality": "remote",
+            "url": url,
+            "version": version
+        }
+    
+    def _get_reply(self, agent_id: str, scenario: Dict[str, Any], prompt: str) -> Tuple[WhiteAgentReply, Optional[str]]:
+        """
+        A white agent's reply to a prompt, plus its response hash when cached
+        
+        Replies from agents registered with a version go through the response
+        cache; the hash lets evaluate_response use the score cache too.
+        """
+        agent_info = self.white_agents[agent_id]
+        cache = self.green_agent.cache
+        if cache is None or not agent_info.get('version'):
+            return self._call_white_agent(agent_info, scenario, prompt), None
+        
+        key = cache.response_key(agent_id, agent_info['version'], prompt)
+        cached = cache.get_reply(key)
+        if cached is not None:
+            return WhiteAgentReply(cached[0], CallTiming.replayed(cached[1])), cached[2]
+        reply = self._call_white_agent(agent_info, scenario, prompt)
+        return reply, cache.put_reply(key, reply.response, reply.timing.server_seconds)
+    
+    def _call_white_agent(self, agent_info: Dict[str, Any], scenario: Dict[str, Any], prompt: str) -> WhiteAgentReply:
+        """Send a scenario to a white agent: over HTTP for http(s) URLs, otherwise the demo mocks"""
+        with stage("white_agent_call"):
+            if agent_info['url'].startswith(("http://", "https://")):
+                queued_at = time.monotonic()
+                with self.agent_limiter.slot(agent_info['url']) as throttled:
+                    try:
+                        reply = self.white_agent_client.call(agent_info['url'], scenario, prompt, queued_at)
+                    except WhiteAgentError as e:
+                        if e.timing is not None:
+                            e.timing.throttle_seconds = throttled
+                        raise
+                reply.timing.throttle_seconds = throttled
+                return reply
+            
+            started = time.monotonic()
+            response = self._get_white_response(agent_info, scenario)
+            return WhiteAgentReply(response, CallTiming.measure(started, 0.0, started, 1))
+    
+    def _get_white_response(self, agent_info: Dict[str, Any], scenario: Dict[str, Any]) -> Dict[str, Any]:
+        """Get a mock white agent's response to a scenario"""
+        # For demo: Use quality-aware mock
+        agent_quality = agent_info["quality"]
+        if agent_quality == "strong":
+            return self._mock_strong_response(scenario)
+        elif agent_quality == "weak":
+            return self._mock_weak_response(scenario)
+        else:  # moderate
+            return self._mock_moderate_response(scenario)
+    
+    def evaluate_cell(self, agent_id: str, scenario_id: str) -> Dict[str, Any]:
+        """
+        Evaluate one (white agent, scenario) cell of the tournament matrix
+        
+        Reads only the shared scenario and ground-truth data, so cells can
+        run concurrently against the same green agent.
+        """
+        cell_start = time.perf_counter()
+        
+        scenario = self.green_agent.get_scenario(scenario_id)
+        prompt = self.green_agent.create_scenario_prompt(scenario)
+        
+        digest = None
+        try:
+            reply, digest = self._get_reply(agent_id, scenario, prompt)
+            white_response, timing = reply.response, reply.timing
+        except WhiteAgentError as e:
+            white_response, timing = {}, e.timing
+        
+        scores = self.green_agent.evaluate_response(
+            scenario_id, white_response, timing.server_seconds, response_digest=digest
+        )
+        
+        return {
+            "agent_id": agent_id,
+            "scenario_id": scenario_id,
+            "scenario_name": scenario['name'],
+            "difficulty": scenario['difficulty'],
+            "prompt_chars": len(prompt),
+            "prompt_tokens": prompt_stats(prompt)['estimated_tokens'],
+            "scores": scores,
+            "queue_seconds": timing.queue_seconds,
+            "throttle_seconds": timing.throttle_seconds,
+            "cell_seconds": time.perf_counter() - cell_start
         }
     
     def run_full_evaluation(self):
@@ -230,6 +389,152 @@ class CTAELauncher:
         
         return all_results
     
+    def run_tournament(self, workers: int = None, executor: str = "thread") -> List[Dict[str, Any]]:
+        """
+        Run the full agents × scenarios matrix on a worker pool
+        
+        Args:
+            workers: Number of pool workers (default: CPU count)
+            executor: "thread" shares this process's preloaded data; "process"
+                      forks workers that inherit it
+        
+        Returns:
+            Per-agent results in the same shape as evaluate_agent()
+        """
+        workers = workers or os.cpu_count() or 1
+        scenario_ids = [entry['id'] for entry in self.green_agent.list_scenarios()]
+        cells = [(agent_id, scenario_id) for agent_id in self.white_agents for scenario_id in scenario_ids]
+        
+        print("\n" + "=" * 70)
+        print("TOURNAMENT: All White Agents × All Scenarios")
+        print("=" * 70)
+        print(f"Cells: {len(cells)} ({len(self.white_agents)} agents × {len(scenario_ids)} scenarios)")
+        print(f"Workers: {workers} ({executor})")
+        
+        global _worker_launcher
+        _worker_launcher = self
+        
+        if executor == "process":
+            pool = ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_init_tournament_worker,
+                initargs=(
+                    str(self.green_agent.data_dir), self.white_agents, self.use_cache, self.compact_prompts,
+                    (self.agent_limiter.rate, self.agent_limiter.burst, self.agent_limiter.concurrency)
+                )
+            )
+            cell_fn = _run_tournament_cell
+        elif executor == "thread":
+            pool = ThreadPoolExecutor(max_workers=workers)
+            cell_fn = self.evaluate_cell
+        else:
+            raise ValueError(f"Unknown executor: {executor}")
+        
+        start = time.perf_counter()
+        cell_results: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        with pool:
+            futures = [pool.submit(cell_fn, agent_id, scenario_id) for agent_id, scenario_id in cells]
+            for future in as_completed(futures):
+                cell = future.result()
+                cell_results[(cell['agent_id'], cell['scenario_id'])] = cell
+        wall_seconds = time.perf_counter() - start
+        
+        all_results = []
+        for agent_id in self.white_agents:
+            results = [
+                {
+                    "scenario_id": cell['scenario_id'],
+                    "scenario_name": cell['scenario_name'],
+                    "difficulty": cell['difficulty'],
+                    "scores": cell['scores']
+                }
+                for cell in (cell_results[(agent_id, scenario_id)] for scenario_id in scenario_ids)
+            ]
+            agent_result = self._build_agent_result(agent_id, results)
+            self._record_results(agent_result)
+            all_results.append(agent_result)
+        
+        self._display_leaderboard(all_results)
+        self._display_timing_matrix(cell_results, scenario_ids, wall_seconds)
+        
+        return all_results
+    
+    def _display_timing_matrix(self, cell_results: Dict[Tuple[str, str], Dict[str, Any]], scenario_ids: List[str], wall_seconds: float):
+        """Display per-cell evaluation time (ms) for each agent × scenario"""
+        print("=" * 70)
+        print("TIMING MATRIX: Per-Cell Evaluation Time (ms)")
+        print("=" * 70)
+        
+        print(f"\n{'Agent':<25} " + " ".join(f"{sid:>12}" for sid in scenario_ids))
+        print("-" * 70)
+        
+        total_cell_seconds = 0.0
+        throttle_seconds = 0.0
+        for agent_id, agent_info in self.white_agents.items():
+            row = []
+            for scenario_id in scenario_ids:
+                seconds = cell_results[(agent_id, scenario_id)]['cell_seconds']
+                total_cell_seconds += seconds
+                throttle_seconds += cell_results[(agent_id, scenario_id)]['throttle_seconds']
+                row.append(f"{seconds * 1000:>12.2f}")
+            print(f"{agent_info['name']:<25} " + " ".join(row))
+        
+        print("-" * 70)
+        print(f"Sum of cell times: {total_cell_seconds:.3f}s | Wall clock: {wall_seconds:.3f}s")
+        if throttle_seconds:
+            print(f"Waiting on white agent rate/concurrency limits: {throttle_seconds:.3f}s (not scored as response time)")
+        print("=" * 70 + "\n")
+    
+    def display_cache_stats(self):
+        """Print this process's evaluation cache hit/miss counts"""
+        cache = self.green_agent.cache
+        if cache is None:
+            return
+        for level, stats in cache.stats().items():
+            lookups = stats['memory_hit'] + stats['disk_hit'] + stats['miss']
+            if not lookups:
+                continue
+            print(f"Cache ({level}): {stats['memory_hit']} memory hits, {stats['disk_hit']} disk hits, "
+                  f"{stats['miss']} misses ({stats['hit_rate']:.0%} hit rate)")
+
+    def show_prompt_sizes(self, scenario_ids: List[str] = None):
+        """Print full vs compact prompt size per scenario, and the critical facts each keeps"""
+        catalog = self.green_agent.catalog
+        scenario_ids = scenario_ids or [entry['id'] for entry in catalog]
+        unknown = [sid for sid in scenario_ids if sid not in catalog]
+        if unknown:
+            raise ValueError(f"Unknown scenarios: {', '.join(unknown)}")
+
+        print("\n" + "=" * 70)
+        print("PROMPT SIZES: Full vs Compact (estimated tokens = chars / 4)")
+        print("=" * 70)
+        print(f"\n{'Scenario':<16} {'Full chars':>12} {'~Tokens':>10} {'Compact':>10} {'~Tokens':>9} {'Ratio':>7}  Facts")
+        print("-" * 70)
+
+        totals = {"full": 0, "compact": 0}
+        for scenario_id in scenario_ids:
+            scenario = self.green_agent.get_scenario(scenario_id)
+            full = self.green_agent.create_scenario_prompt(scenario, compact=False)
+            compact = self.green_agent.create_scenario_prompt(scenario, compact=True)
+            full_size, compact_size = prompt_stats(full), prompt_stats(compact)
+            totals["full"] += full_size['estimated_tokens']
+            totals["compact"] += compact_size['estimated_tokens']
+
+            # Critical facts stated verbatim in the full prompt, and how many survive compaction
+            facts = [fact.casefold() for fact in catalog.get_ground_truth(scenario_id)['critical_facts']]
+            stated = [fact for fact in facts if fact in full.casefold()]
+            kept = [fact for fact in stated if fact in compact.casefold()]
+            ratio = full_size['chars'] / compact_size['chars']
+            print(
+                f"{scenario_id:<16} {full_size['chars']:>12,} {full_size['estimated_tokens']:>10,} "
+                f"{compact_size['chars']:>10,} {compact_size['estimated_tokens']:>9,} {ratio:>6.1f}x  "
+                f"{len(kept)}/{len(stated)}"
+            )
+
+        print("-" * 70)
+        print(f"Total estimated tokens: {totals['full']:,} full, {totals['compact']:,} compact")
+        print("=" * 70 + "\n")
+
     def _display_leaderboard(self, results: List[Dict[str, Any]]):
         """Display leaderboard of all evaluated agents"""
         print("\n" + "=" * 70)
@@ -259,6 +564,38 @@ class CTAELauncher:
         
         print("=" * 70 + "\n")
     
+    def show_leaderboard(self, rubric_version: str = RUBRIC_VERSION, scenario_id: str = None, limit: int = None):
+        """Display the all-time leaderboard from the results store"""
+        start = time.perf_counter()
+        entries = self.results_store.leaderboard(rubric_version=rubric_version, scenario_id=scenario_id, limit=limit)
+        total = self.results_store.total_results(rubric_version)
+        query_ms = (time.perf_counter() - start) * 1000
+
+        print("\n" + "=" * 78)
+        scope = f", scenario {scenario_id}" if scenario_id else ""
+        print(f"LEADERBOARD: All Recorded Results (rubric v{rubric_version}{scope})")
+        print("=" * 78)
+
+        print(f"\n{'Rank':<6} {'Agent Name':<25} {'Results':>7}  {'Overall':<10} {'Extract':<10} {'Reason':<10} {'Recommend':<10}")
+        print("-" * 78)
+
+        for entry in entries:
+            agg = entry['aggregate']
+            print(
+                f"{entry['rank']:<6} {entry['agent_name']:<25} {entry['results']:>7,}  "
+                f"{agg['overall_score']:>6.1f}/100  "
+                f"{agg['data_extraction']:>6.1f}/100  "
+                f"{agg['risk_reasoning']:>6.1f}/100  "
+                f"{agg['recommendations']:>6.1f}/100"
+            )
+        if not entries:
+            print("  (no results recorded yet)")
+
+        print("-" * 78)
+        print(f"{total:,} results in {self.results_store.path} | query {query_ms:.2f}ms")
+        print("=" * 78 + "\n")
+        return entries
+
     def _mock_strong_response(self, scenario: Dict[str, Any]) -> Dict[str, Any]:
         """Generate strong performance mock response"""
         if "SHP-2025-1042" in str(scenario['data']):
@@ -378,6 +715,28 @@ class CTAELauncher:
         }
 
 
+def _init_tournament_worker(
+    data_dir: str,
+    white_agents: Dict[str, Any],
+    use_cache: bool = True,
+    compact_prompts: bool = False,
+    agent_limits: Tuple[Optional[float], int, int] = (DEFAULT_AGENT_RATE, DEFAULT_AGENT_BURST, DEFAULT_AGENT_CONCURRENCY)
+):
+    """Prepare a tournament worker process (no-op when state was inherited via fork)"""
+    global _worker_launcher
+    if _worker_launcher is None:
+        _worker_launcher = CTAELauncher(
+            use_cache=use_cache, compact_prompts=compact_prompts, agent_limiter=AgentLimiter(*agent_limits)
+        )
+        _worker_launcher.green_agent = CTAEGreenAgent(data_dir, use_cache=use_cache, compact_prompts=compact_prompts)
+        _worker_launcher.white_agents = white_agents
+
+
+def _run_tournament_cell(agent_id: str, scenario_id: str) -> Dict[str, Any]:
+    """Evaluate one tournament cell inside a worker process"""
+    return _worker_launcher.evaluate_cell(agent_id, scenario_id)
+
+
 def main():
     """Main entry point"""
     import argparse
@@ -385,43 +744,250 @@ def main():
     parser = argparse.ArgumentParser(description="CTAE-Green Evaluation Launcher")
     parser.add_argument(
         "command",
-        choices=["launch", "evaluate", "list"],
+        choices=["launch", "evaluate", "list", "tournament", "rescore", "generate", "leaderboard", "prompts",
+                 "build-snapshot"],
         help="Command to execute"
     )
     parser.add_argument(
         "--agent",
         help="Agent ID to evaluate (for 'evaluate' command)",
-        choices=["strong_analyst", "weak_extractor", "moderate_analyst"]
+        choices=["strong_analyst", "weak_extractor", "moderate_analyst", "remote_agent"]
+    )
+    parser.add_argument(
+        "--white-agent-url",
+        help="Also evaluate the A2A white agent at this URL (registered as 'remote_agent')"
     )
     parser.add_argument(
         "--scenarios",
         nargs="+",
-        help="Scenario IDs to run (default: all)",
-        choices=["scenario_01", "scenario_02", "scenario_03"]
+        help="Scenario IDs to run (default: all)"
+    )
+    
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="Worker count for 'tournament' and 'rescore' (default: CPU count)"
+    )
+    parser.add_argument(
+        "--executor",
+        choices=["thread", "process"],
+        default="thread",
+        help="Worker pool type for 'tournament' (default: thread)"
+    )
+    
+    parser.add_argument(
+        "--input",
+        help="JSONL archive of {scenario_id, response, response_time} records (for 'rescore' command)"
+    )
+    parser.add_argument(
+        "--output",
+        help="JSONL file to write scores to, in input order (for 'rescore'); new dataset directory (for 'generate'); "
+             "snapshot file (for 'build-snapshot', default: <data_dir>/.cache/scenario_snapshot.bin)"
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=1000,
+        help="Records per worker task for 'rescore' (default: 1000)"
+    )
+    
+    parser.add_argument(
+        "--data-dir",
+        help="Data directory to evaluate against (default: ./data)"
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=0,
+        help="Random seed for 'generate' (default: 0)"
+    )
+    parser.add_argument("--num-emails", type=int, default=100, help="Emails to generate (default: 100)")
+    parser.add_argument("--num-alerts", type=int, default=20, help="Risk alerts to generate (default: 20)")
+    parser.add_argument("--num-shipments", type=int, default=200, help="Shipments to generate (default: 200)")
+    parser.add_argument("--num-scenarios", type=int, default=10, help="Scenarios to generate (default: 10)")
+
+    parser.add_argument(
+        "--results-db",
+        help="SQLite results database (default: $CTAE_RESULTS_DB or ./ctae_results.sqlite3 next to launcher.py)"
+    )
+    parser.add_argument(
+        "--no-record",
+        action="store_true",
+        help="Do not persist scores from 'launch', 'evaluate' and 'tournament'"
+    )
+    parser.add_argument(
+        "--rubric-version",
+        default=RUBRIC_VERSION,
+        help=f"Rubric version to rank for 'leaderboard' (default: current, {RUBRIC_VERSION})"
+    )
+    parser.add_argument("--limit", type=int, help="Rows to show for 'leaderboard' (default: all)")
+    
+    parser.add_argument(
+        "--white-agent-version",
+        help="Build/version of the --white-agent-url agent; enables caching its replies per prompt"
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Do not use the response and score cache"
+    )
+    parser.add_argument(
+        "--clear-cache",
+        action="store_true",
+        help="Drop every cached response and score before running"
+    )
+    
+    parser.add_argument(
+        "--compact-prompts",
+        action="store_true",
+        help="Send only the emails, alerts and shipments relevant to each scenario's task"
+    )
+    
+    parser.add_argument(
+        "--agent-rate",
+        type=float,
+        default=DEFAULT_AGENT_RATE,
+        help=f"Calls per second allowed per remote white agent URL, 0 for no limit (default: {DEFAULT_AGENT_RATE:g})"
+    )
+    parser.add_argument(
+        "--agent-burst",
+        type=int,
+        default=DEFAULT_AGENT_BURST,
+        help=f"Calls a remote white agent may receive at once before the rate limit applies (default: {DEFAULT_AGENT_BURST})"
+    )
+    parser.add_argument(
+        "--agent-concurrency",
+        type=int,
+        default=DEFAULT_AGENT_CONCURRENCY,
+        help=f"Calls in flight per remote white agent URL (default: {DEFAULT_AGENT_CONCURRENCY}; "
+             "per worker process with --executor process)"
     )
     
     args = parser.parse_args()
     
+    if args.command == "generate":
+        # Synthetic dataset; needs no agents, so runs before initialization
+        if not args.output:
+            print("\n✗ Error: --output required for 'generate' command")
+            return 1
+        
+        print("\n" + "=" * 70)
+        print("GENERATE: Synthetic Evaluation Dataset")
+        print("=" * 70)
+        start = time.perf_counter()
+        try:
+            generator = DatasetGenerator(
+                seed=args.seed,
+                emails=args.num_emails,
+                alerts=args.num_alerts,
+                shipments=args.num_shipments,
+                scenarios=args.num_scenarios
+            )
+            counts = generator.write(args.output)
+        except (ValueError, FileExistsError) as e:
+            print(f"\n✗ Error: {e}")
+            return 1
+        summary = ", ".join(f"{count:,} {kind}" for kind, count in counts.items())
+        print(f"✓ Wrote {summary} (seed {args.seed}) in {time.perf_counter() - start:.2f}s")
+        print(f"✓ Evaluate with: python launcher.py launch --data-dir {args.output}")
+        return 0
+    
+    if args.command == "build-snapshot":
+        # Scenarios, ground truth and rendered prompts compiled for the server to map at boot
+        data_dir = Path(args.data_dir or Path(__file__).parent / "data")
+        print("\n" + "=" * 70)
+        print("BUILD SNAPSHOT: Precompiled Scenario Data")
+        print("=" * 70)
+        try:
+            summary = build_snapshot(data_dir, args.output)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"\n✗ Error: {e}")
+            return 1
+        print(f"✓ Wrote {summary['scenarios']} scenarios ({summary['bytes']:,} bytes, data version "
+              f"{summary['data_version'][:12]}) to {summary['path']} in {summary['seconds']:.2f}s")
+        print(f"✓ Serve with: cd agents && python green_agent_server.py --snapshot {Path(summary['path']).resolve()}")
+        return 0
+    
+    if args.command == "leaderboard":
+        # Historical rankings straight from the results database; no data load needed
+        launcher = CTAELauncher(args.data_dir, ResultsStore(args.results_db))
+        scenario_id = args.scenarios[0] if args.scenarios else None
+        launcher.show_leaderboard(args.rubric_version, scenario_id=scenario_id, limit=args.limit)
+        return 0
+
     # Initialize launcher
-    launcher = CTAELauncher()
+    results_store = None if args.no_record else ResultsStore(args.results_db)
+    launcher = CTAELauncher(
+        args.data_dir, results_store, use_cache=not args.no_cache, compact_prompts=args.compact_prompts,
+        agent_limiter=AgentLimiter(args.agent_rate or None, args.agent_burst, args.agent_concurrency)
+    )
     
     if not launcher.initialize():
         print("\n✗ Initialization failed")
         return 1
     
+    if args.clear_cache and launcher.green_agent.cache is not None:
+        launcher.green_agent.cache.invalidate()
+        print("      ✓ Evaluation cache cleared")
+    
+    if args.white_agent_url:
+        launcher.register_white_agent(
+            "remote_agent", args.white_agent_url, name="Remote Agent", version=args.white_agent_version
+        )
+        print(f"      ✓ Registered remote white agent at {args.white_agent_url}")
+    
     # Execute command
     if args.command == "launch":
         # Full evaluation
         launcher.run_full_evaluation()
+        launcher.display_cache_stats()
+        
+    elif args.command == "tournament":
+        # Parallel agents × scenarios matrix
+        launcher.run_tournament(workers=args.workers, executor=args.executor)
+        launcher.display_cache_stats()
+        
+    elif args.command == "rescore":
+        # Re-score archived white agent responses with the current rubric
+        if not args.input or not args.output:
+            print("\n✗ Error: --input and --output required for 'rescore' command")
+            return 1
+        
+        print("\n" + "=" * 70)
+        print("RESCORE: Archived White Agent Responses")
+        print("=" * 70)
+        stats = rescore_archive(
+            args.input,
+            args.output,
+            str(launcher.green_agent.data_dir),
+            workers=args.workers,
+            chunk_size=args.chunk_size
+        )
+        rate = stats['records'] / stats['seconds'] if stats['seconds'] > 0 else 0
+        print(f"✓ Scored {stats['records']} records ({stats['errors']} errors) in {stats['seconds']:.2f}s ({rate:,.0f} records/s)")
+        print(f"✓ Scores written to {args.output}")
         
     elif args.command == "evaluate":
         # Single agent evaluation
         if not args.agent:
             print("\n✗ Error: --agent required for 'evaluate' command")
-            print("   Available agents: strong_analyst, weak_extractor, moderate_analyst")
+            print("   Available agents: strong_analyst, weak_extractor, moderate_analyst, remote_agent (with --white-agent-url)")
             return 1
         
-        launcher.evaluate_agent(args.agent, args.scenarios)
+        try:
+            launcher.evaluate_agent(args.agent, args.scenarios)
+            launcher.display_cache_stats()
+        except ValueError as e:
+            print(f"\n✗ Error: {e}")
+            return 1
+        
+    elif args.command == "prompts":
+        # Full vs compact prompt size per scenario
+        try:
+            launcher.show_prompt_sizes(args.scenarios)
+        except ValueError as e:
+            print(f"\n✗ Error: {e}")
+            return 1
         
     elif args.command == "list":
         # List available agents and scenarios
@@ -437,7 +1003,7 @@ def main():
         print("\n" + "=" * 70)
         print("AVAILABLE SCENARIOS")
         print("=" * 70)
-        for scenario in launcher.green_agent.scenarios:
+        for scenario in launcher.green_agent.list_scenarios():
             print(f"\n  {scenario['id']}:")
             print(f"    Name: {scenario['name']}")
             print(f"    Difficulty: {scenario['difficulty']}")
@@ -0,0 +1,19 @@
+"""Shared fixtures for the CTAE-Green test suite"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "agents"))
+sys.path.insert(0, str(ROOT))
+
+DATA_DIR = ROOT / "data"
+
+
+@pytest.fixture(scope="session")
+def green_agent():
+    """Green agent over the bundled data, without the evaluation cache"""
+    from green_agent import CTAEGreenAgent
+    return CTAEGreenAgent(DATA_DIR, use_cache=False)
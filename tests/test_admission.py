@@ -0,0 +1,34 @@
+"""Admission limits and how the server reports them"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+import green_agent_server as server
+from admission import AdmissionQueue, AgentLimiter, _AgentLimiterBase
+from conftest import DATA_DIR
+
+
+def test_limiter_base_is_abstract():
+    with pytest.raises(TypeError):
+        _AgentLimiterBase()
+    with AgentLimiter(rate=None, concurrency=1).slot("http://agent") as waited:
+        assert waited >= 0
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(server, "data_dir", str(DATA_DIR))
+    monkeypatch.setattr(server, "snapshot_path", None)
+    monkeypatch.setattr(server, "admission", AdmissionQueue(max_pending=1))
+    with TestClient(server.app) as test_client:
+        yield test_client
+
+
+@pytest.mark.parametrize("path", ["/task", "/jobs"])
+def test_evaluation_larger_than_the_queue_is_a_client_error(client, path):
+    response = client.post(path, json={
+        "task": "evaluate_agent",
+        "metadata": {"white_agent_url": "http://localhost:9"}
+    })
+    assert response.status_code == 400
+    assert "exceed the admission limit" in response.json()["detail"]
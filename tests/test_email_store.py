@@ -0,0 +1,64 @@
+"""Email lookups read the mapped index in place"""
+
+import json
+
+import pytest
+
+from email_store import EmailStore
+
+
+def _write_corpus(path, emails, jsonl=False):
+    if jsonl:
+        path.write_text("".join(json.dumps(email) + "\n" for email in emails))
+    else:
+        path.write_text(json.dumps(emails, indent=2))
+
+
+EMAILS = [{"id": f"email_{i:03d}", "subject": f"Subject {i}", "body": "x" * i} for i in range(50)]
+
+
+@pytest.mark.parametrize("jsonl", [False, True])
+def test_lookup_by_id_from_a_saved_index(tmp_path, jsonl):
+    path = tmp_path / ("emails.jsonl" if jsonl else "emails.json")
+    _write_corpus(path, EMAILS, jsonl)
+    EmailStore(path)
+    store = EmailStore(path)  # maps the index saved by the first store
+    assert store._index_buffer is not None
+
+    assert len(store) == len(EMAILS)
+    for email in EMAILS:
+        record = store.get(email["id"])
+        assert record["id"] == email["id"]
+        assert dict(record) == email
+    assert "email_999" not in store
+    assert ["nope"] not in store
+    with pytest.raises(KeyError):
+        store.select(["email_001", "email_999"])
+    assert [record["id"] for record in store.select("*")] == [email["id"] for email in EMAILS]
+
+
+def test_later_duplicate_ids_win(tmp_path):
+    path = tmp_path / "emails.json"
+    _write_corpus(path, [{"id": "a", "n": 1}, {"id": "b", "n": 2}, {"id": "a", "n": 3}])
+    assert EmailStore(path).get("a")["n"] == 3
+
+
+def test_unwritable_cache_keeps_the_index_in_memory(tmp_path):
+    path = tmp_path / "emails.json"
+    _write_corpus(path, EMAILS)
+    blocker = tmp_path / "not_a_dir"
+    blocker.write_text("")
+    store = EmailStore(path, cache_dir=blocker)
+    assert store._index_buffer is None
+    assert store.get("email_042")["subject"] == "Subject 42"
+
+
+def test_records_hold_no_decoded_email(tmp_path):
+    path = tmp_path / "emails.json"
+    _write_corpus(path, EMAILS)
+    store = EmailStore(path, decoded_emails=4)
+    records = store.select("*")
+    for record in records:
+        assert record["body"] is not None
+    assert store.decoded.cache_info().currsize == 4
+    assert not hasattr(records[0], "__dict__")
@@ -0,0 +1,64 @@
+"""Shared job store writes stay off the event loop"""
+
+import asyncio
+import sqlite3
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+import green_agent_server as server
+from job_store import SQLiteJobStore
+from server_state import SharedState
+from conftest import DATA_DIR
+
+
+def test_job_updates_do_not_wait_for_a_locked_database(tmp_path):
+    state = SharedState(tmp_path / "state.sqlite3")
+    store = SQLiteJobStore(state)
+    job = store.create(None, ["scenario_01"])
+
+    blocker = sqlite3.connect(str(state.path), isolation_level=None)
+    blocker.execute("BEGIN IMMEDIATE")
+    try:
+        started = time.monotonic()
+        asyncio.run(job.start())
+        asyncio.run(job.add_result({"scenario_id": "scenario_01", "scores": {}}))
+        asyncio.run(job.complete({"average_overall_score": 0}))
+        assert time.monotonic() - started < 0.5
+        # Reads go through their own connection and are not held up either
+        assert store.get(job.id) is job
+    finally:
+        blocker.execute("COMMIT")
+        blocker.close()
+
+    store.flush()
+    other_worker = SQLiteJobStore(state)
+    shared = other_worker.get(job.id)
+    assert shared is not job
+    assert shared.status == "completed"
+    assert shared.results == [{"scenario_id": "scenario_01", "scores": {}}]
+
+
+@pytest.fixture
+def client(monkeypatch, tmp_path):
+    monkeypatch.setattr(server, "data_dir", str(DATA_DIR))
+    monkeypatch.setattr(server, "snapshot_path", None)
+    monkeypatch.setattr(server, "results_store", None)
+    monkeypatch.setattr(server, "job_store", SQLiteJobStore(SharedState(tmp_path / "state.sqlite3")))
+    with TestClient(server.app) as test_client:
+        yield test_client
+
+
+def test_background_job_on_the_shared_store(client):
+    created = client.post("/jobs", json={"task": "evaluate_agent", "metadata": {"scenario_id": "scenario_01"}})
+    assert created.status_code == 202
+
+    deadline = time.monotonic() + 10
+    while True:
+        job = client.get(created.json()["status_url"]).json()
+        if job["status"] in ("completed", "failed") or time.monotonic() > deadline:
+            break
+        time.sleep(0.05)
+    assert job["status"] == "completed"
+    assert [result["scenario_id"] for result in job["results"]] == ["scenario_01"]
@@ -0,0 +1,64 @@
+"""Prompt memo and fragment cache bounds"""
+
+import threading
+
+from prompt_builder import PromptBuilder
+
+
+def test_memo_is_capped_by_bytes(green_agent):
+    scenario = green_agent.get_scenario("scenario_01")
+    prompt = PromptBuilder().build(scenario, "v1")
+    budget = len(prompt.encode("utf-8")) * 3
+
+    builder = PromptBuilder(prompt_bytes=budget, fragment_bytes=budget)
+    for version in range(10):
+        assert builder.build(scenario, f"v{version}") == prompt
+
+    assert len(builder._prompts) == 3
+    assert builder._prompts._size <= budget
+    assert builder._fragments._size <= budget
+
+
+def test_fragments_of_different_versions_coexist(green_agent):
+    scenario = green_agent.get_scenario("scenario_01")
+    builder = PromptBuilder()
+    builder.build(scenario, "v1")
+    fragments = len(builder._fragments)
+
+    builder.build(scenario, "v2")
+    assert len(builder._fragments) == 2 * fragments
+
+    builder.clear()
+    assert builder.build(scenario, "v1", compact=None) == builder.render(scenario, cached=False)
+
+
+def test_render_runs_outside_the_lock(green_agent):
+    scenario = green_agent.get_scenario("scenario_01")
+    builder = PromptBuilder()
+    locked = []
+
+    def compact(s):
+        locked.append(builder._lock.locked())
+        return s
+
+    builder.build(scenario, "v1", compact=compact)
+    assert locked == [False]
+
+
+def test_concurrent_builds_agree(green_agent):
+    scenarios = [green_agent.get_scenario(s['id']) for s in green_agent.catalog.list()]
+    builder = PromptBuilder()
+    expected = {s['id']: builder.render(s, cached=False) for s in scenarios}
+    mismatches = []
+
+    def worker(version):
+        for s in scenarios:
+            if builder.build(s, version) != expected[s['id']]:
+                mismatches.append(s['id'])
+
+    threads = [threading.Thread(target=worker, args=(f"v{i % 2}",)) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert not mismatches
@@ -0,0 +1,59 @@
+"""Re-scoring archives that contain records which cannot be scored"""
+
+import json
+
+from green_agent import mock_white_agent_response
+from rescoring import rescore_archive, score_chunk
+from conftest import DATA_DIR
+
+
+def _archive_lines(green_agent, bad_line):
+    scenario = green_agent.get_scenario("scenario_01")
+    good = json.dumps({
+        "scenario_id": "scenario_01",
+        "response": mock_white_agent_response(green_agent.create_scenario_prompt(scenario), "strong"),
+        "response_time": 2.0
+    })
+    return [good + "\n", good + "\n", bad_line + "\n", good + "\n"]
+
+
+def test_malformed_response_shape_in_the_middle_of_an_archive(green_agent, tmp_path):
+    bad = json.dumps({"scenario_id": "scenario_01", "response": {"extracted_data": ["oops"]}, "response_time": 1.0})
+    archive = tmp_path / "responses.jsonl"
+    archive.write_text("".join(_archive_lines(green_agent, bad)))
+    output = tmp_path / "scores.jsonl"
+
+    stats = rescore_archive(str(archive), str(output), str(DATA_DIR), workers=1, chunk_size=10)
+
+    records = [json.loads(line) for line in output.read_text().splitlines()]
+    assert stats["records"] == len(records) == 4
+    assert all("scores" in record for record in records)
+    assert records[2]["scores"]["data_extraction_accuracy"] == 0
+
+
+def test_record_that_fails_scoring_becomes_an_error_line(green_agent, monkeypatch):
+    lines = _archive_lines(green_agent, json.dumps({"scenario_id": "scenario_01", "response": "BOOM", "response_time": 1.0}))
+    expected = score_chunk(1, [lines[0]], green_agent)[0][0]
+
+    evaluate_response = green_agent.evaluate_response
+    evaluate_batch = green_agent.evaluate_batch
+
+    def failing_response(scenario_id, response, response_time, response_digest=None):
+        if response == "BOOM":
+            raise RuntimeError("scoring exploded")
+        return evaluate_response(scenario_id, response, response_time, response_digest)
+
+    def failing_batch(scenario_ids, responses, response_times):
+        if "BOOM" in responses:
+            raise RuntimeError("scoring exploded")
+        return evaluate_batch(scenario_ids, responses, response_times)
+
+    monkeypatch.setattr(green_agent, "evaluate_response", failing_response)
+    monkeypatch.setattr(green_agent, "evaluate_batch", failing_batch)
+
+    output, errors = score_chunk(10, lines, green_agent)
+
+    assert errors == 1
+    assert len(output) == 4
+    assert json.loads(output[2]) == {"line": 12, "error": "Could not score response: scoring exploded"}
+    assert output[0] == output[1] == output[3] == expected
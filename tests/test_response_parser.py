@@ -0,0 +1,92 @@
+"""Incremental extraction of the scored fields from white agent replies"""
+
+import json
+
+import pytest
+
+from response_parser import StreamingResponseParser, parse_response, repair_json
+
+SCORED = {
+    "extracted_data": {"key_facts": ["Port of Shanghai closed", "Typhoon \"Haikui\" \\ landfall"]},
+    "risk_assessment": [{"risk_type": "port_delay", "severity": "high"}],
+    "recommendations": [{"action": "Reroute via Busan", "rationale": "Avoid the closure {temporarily}"}]
+}
+
+REPLIES = {
+    "raw": json.dumps({"reasoning": "skip me", **SCORED}),
+    "a2a": json.dumps({"status": "completed", "result": {"reasoning": "skip me", **SCORED}}),
+    "fenced": "Here is my analysis of the disruption.\n\n```json\n" + json.dumps(SCORED, indent=2) + "\n```\nDone.",
+    "prose": "My answer follows: " + json.dumps(SCORED) + " (end)",
+}
+
+
+def _feed(text, cuts):
+    parser = StreamingResponseParser()
+    start = 0
+    for cut in (*cuts, len(text)):
+        if parser.feed(text[start:cut]):
+            break
+        start = cut
+    return parser.close()
+
+
+@pytest.mark.parametrize("kind", REPLIES)
+def test_every_chunk_split_parses_the_same(kind):
+    text = REPLIES[kind]
+    assert parse_response(text) == SCORED
+    for cut in range(1, len(text)):
+        assert _feed(text, [cut]) == SCORED, f"split at {cut}"
+
+
+@pytest.mark.parametrize("kind", REPLIES)
+def test_one_character_chunks(kind):
+    text = REPLIES[kind]
+    assert _feed(text, range(1, len(text))) == SCORED
+
+
+def test_a2a_envelope_scores_its_result():
+    reply = {"jsonrpc": "2.0", "id": 7, "result": {**SCORED, "status": {"state": "completed"}}}
+    assert parse_response(json.dumps(reply)) == SCORED
+    # A "result" after a scored field is an ordinary field, not an envelope
+    reply = {"extracted_data": SCORED["extracted_data"], "result": {"risk_assessment": "nested"}}
+    assert parse_response(json.dumps(reply)) == {"extracted_data": SCORED["extracted_data"]}
+
+
+def test_truncated_reply_keeps_the_complete_parts():
+    text = json.dumps(SCORED)
+    cut = text.index("Reroute") + 3
+    response = parse_response(text[:cut])
+    assert response["extracted_data"] == SCORED["extracted_data"]
+    assert response["risk_assessment"] == SCORED["risk_assessment"]
+    assert response["recommendations"] == [{"action": "Rer"}]
+
+
+@pytest.mark.parametrize("text, expected", [
+    ('{"a": [1, 2', {"a": [1, 2]}),
+    ('{"a": "unterminated', {"a": "unterminated"}),
+    ('{"a": "ends in an escape\\', {"a": "ends in an escape"}),
+    ('{"a": [1, {"b": 2}, {"c":', {"a": [1, {"b": 2}]}),
+    ('{"a": 1, "b":', {"a": 1}),
+    ('[{"a": 1}, {"b"', [{"a": 1}]),
+])
+def test_repair_json(text, expected):
+    assert repair_json(text) == expected
+
+
+def test_repair_json_gives_up_on_nothing_parseable():
+    with pytest.raises(ValueError):
+        repair_json("not json at all")
+
+
+def test_stops_once_every_scored_field_is_complete():
+    parser = StreamingResponseParser()
+    head = json.dumps(SCORED)[:-1] + ', "reasoning": "'
+    assert parser.feed(head)
+    # Nothing after the last scored field is read
+    assert parser.feed("x" * 1024)
+    assert parser.close() == SCORED
+
+
+def test_null_scored_fields_are_dropped():
+    reply = {"extracted_data": None, "risk_assessment": [], "recommendations": None}
+    assert parse_response(json.dumps(reply)) == {"risk_assessment": []}
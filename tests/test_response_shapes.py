@@ -0,0 +1,42 @@
+"""Scoring replies whose scored fields have unexpected shapes"""
+
+import json
+
+import pytest
+
+from green_agent import mock_white_agent_response
+
+MALFORMED_REPLIES = [
+    {"risk_assessment": "high"},
+    {"recommendations": ["reroute"]},
+    {"recommendations": "reroute via Singapore"},
+    {"extracted_data": ["oops"]},
+    {"extracted_data": "none"},
+    {"extracted_data": {"key_facts": "Shanghai port delay"}},
+    {"extracted_data": {"key_facts": [42, None, {"fact": "x"}]}},
+    {"risk_assessment": [None, "port_delay", {"risk_type": ["port_delay"], "severity": {}}]},
+    {"recommendations": [{"action": 7, "rationale": ["because"]}]},
+]
+
+
+@pytest.mark.parametrize("reply", MALFORMED_REPLIES, ids=lambda reply: json.dumps(reply)[:40])
+def test_malformed_reply_scores_instead_of_raising(green_agent, reply):
+    for response in (reply, json.dumps(reply)):
+        scores = green_agent.evaluate_response("scenario_01", response, 1.0)
+        assert 0 <= scores["overall_score"] <= 100
+
+
+def test_malformed_entries_are_skipped_not_counted(green_agent):
+    good = mock_white_agent_response(green_agent.create_scenario_prompt(green_agent.get_scenario("scenario_01")), "strong")
+    noisy = json.loads(json.dumps(good))
+    noisy["extracted_data"]["key_facts"] += [42, None]
+    noisy["risk_assessment"] += ["port_delay", None]
+    noisy["recommendations"] += [["reroute"], 3]
+    assert green_agent.evaluate_response("scenario_01", noisy, 1.0) == green_agent.evaluate_response("scenario_01", good, 1.0)
+
+
+def test_batch_scoring_matches_single_scoring_on_malformed_replies(green_agent):
+    scenario_ids = ["scenario_01"] * len(MALFORMED_REPLIES)
+    batch = green_agent.evaluate_batch(scenario_ids, [json.dumps(reply) for reply in MALFORMED_REPLIES], [1.0] * len(MALFORMED_REPLIES))
+    single = [green_agent.evaluate_response("scenario_01", reply, 1.0) for reply in MALFORMED_REPLIES]
+    assert batch == single
@@ -0,0 +1,85 @@
+"""Catalog versioning follows edits to individual scenario files"""
+
+import json
+import shutil
+import subprocess
+import sys
+
+import pytest
+
+from green_agent import CTAEGreenAgent
+from scenario_catalog import CatalogIndex
+from scenario_snapshot import SnapshotCatalog, build_snapshot
+from conftest import DATA_DIR, ROOT
+
+
+def _edit_ground_truth(data_dir, fact):
+    path = data_dir / "scenarios" / "scenario_01.json"
+    doc = json.loads(path.read_text())
+    doc["ground_truth"]["critical_facts"].append(fact)
+    path.write_text(json.dumps(doc, indent=2))
+
+
+def test_scenario_file_edit_changes_version_without_reindexing(tmp_path):
+    data_dir = tmp_path / "data"
+    shutil.copytree(DATA_DIR, data_dir, ignore=shutil.ignore_patterns(".cache"))
+    before = CTAEGreenAgent(data_dir, use_cache=False)
+    before_version = before.data_version
+    before_ground_truth = before.catalog.ground_truth_version("scenario_01")
+    untouched = before.get_scenario("scenario_02")
+
+    _edit_ground_truth(data_dir, "A freshly added fact")
+    after = CTAEGreenAgent(data_dir, use_cache=False)
+
+    assert "A freshly added fact" in after.ground_truth["scenario_01"]["critical_facts"]
+    assert after.catalog.ground_truth_version("scenario_01") != before_ground_truth
+    assert after.data_version != before_version
+    # Only the edited scenario is re-resolved
+    assert after.get_scenario("scenario_02") is untouched
+
+
+def test_snapshot_serves_an_edited_scenario_from_its_file(tmp_path):
+    data_dir = tmp_path / "data"
+    shutil.copytree(DATA_DIR, data_dir, ignore=shutil.ignore_patterns(".cache"))
+    snapshot = tmp_path / "scenarios.snap"
+    build_snapshot(data_dir, snapshot)
+    mapped = CTAEGreenAgent(data_dir, use_cache=False, snapshot=snapshot)
+    assert isinstance(mapped.catalog, SnapshotCatalog)
+    before_version = mapped.data_version
+
+    _edit_ground_truth(data_dir, "A freshly added fact")
+    after = CTAEGreenAgent(data_dir, use_cache=False, snapshot=snapshot)
+    loaded = CTAEGreenAgent(data_dir, use_cache=False)
+
+    # The snapshot still opens; only the edited scenario falls back to its file
+    assert after.catalog is mapped.catalog
+    assert "A freshly added fact" in after.ground_truth["scenario_01"]["critical_facts"]
+    assert after.catalog.rendered_prompt("scenario_01") is None
+    assert after.catalog.rendered_prompt("scenario_02") is not None
+    assert after.data_version != before_version
+    assert after.data_version == loaded.data_version
+    assert after.catalog.ground_truth_version("scenario_01") == loaded.catalog.ground_truth_version("scenario_01")
+
+
+def test_snapshot_boot_does_not_import_the_record_stores(tmp_path):
+    data_dir = tmp_path / "data"
+    shutil.copytree(DATA_DIR, data_dir, ignore=shutil.ignore_patterns(".cache"))
+    snapshot = tmp_path / "scenarios.snap"
+    build_snapshot(data_dir, snapshot)
+
+    script = (
+        "import sys\n"
+        f"sys.path[:0] = [{str(ROOT / 'agents')!r}, {str(ROOT)!r}]\n"
+        "from green_agent import CTAEGreenAgent\n"
+        f"agent = CTAEGreenAgent({str(data_dir)!r}, use_cache=False, snapshot={str(snapshot)!r})\n"
+        "agent.create_scenario_prompt(agent.get_scenario('scenario_01'))\n"
+        "agent.evaluate_response('scenario_01', {}, 1.0)\n"
+        "print(sorted({'shipment_table', 'email_store', 'region_index'} & set(sys.modules)))\n"
+    )
+    result = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "[]"
+
+
+def test_catalog_index_requires_get():
+    with pytest.raises(TypeError):
+        CatalogIndex()
@@ -0,0 +1,10 @@
+"""Generated datasets are well formed"""
+
+from scenario_generator import DatasetGenerator
+
+
+def test_alert_regions_are_distinct():
+    generator = DatasetGenerator(seed=7, alerts=500)
+    for i in range(generator.counts["alerts"]):
+        regions = generator.alert(i)["affected_regions"]
+        assert len(regions) == len(set(regions)), regions
@@ -0,0 +1,140 @@
+"""White agent client against an in-process mock transport"""
+
+import asyncio
+import json
+import time
+
+import httpx
+import pytest
+
+from launcher import CTAELauncher
+from metrics import stage_seconds
+from white_agent_client import AsyncWhiteAgentClient, WhiteAgentClient, WhiteAgentError, WhiteAgentTimeout
+from conftest import DATA_DIR
+
+URL = "http://white-agent.test"
+
+SCENARIO = {"id": "scenario_01", "time_limit": 5}
+
+REPLY = {
+    "extracted_data": {"shipment_ids": ["SHP-1"], "commodities": ["oil"], "key_facts": ["fact"]},
+    "risk_assessment": [{"risk_type": "delay", "severity": "high"}],
+    "recommendations": [{"priority": "high", "action": "reroute", "rationale": "why"}],
+    "reasoning": "because"
+}
+
+
+def _client(handler, **kwargs) -> WhiteAgentClient:
+    client = WhiteAgentClient(**kwargs)
+    client._clients[URL] = httpx.Client(transport=httpx.MockTransport(handler))
+    return client
+
+
+def _call(mode: str, handler, scenario=SCENARIO, **kwargs):
+    """One call through the sync or async client, with `handler` standing in for the white agent"""
+    if mode == "sync":
+        return _client(handler, **kwargs).call(URL, scenario, "prompt")
+
+    async def run():
+        client = AsyncWhiteAgentClient(**kwargs)
+        client._clients[URL] = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        try:
+            return await client.call(URL, scenario, "prompt")
+        finally:
+            await client._clients[URL].aclose()
+
+    return asyncio.run(run())
+
+
+def _stage_count(name: str) -> int:
+    return stage_seconds.labels(name).snapshot()[2]
+
+
+def test_streamed_reply_records_the_parse_stage():
+    markdown = "Here is my analysis.\n\n```json\n" + json.dumps(REPLY) + "\n```\n"
+    client = _client(lambda request: httpx.Response(200, text=markdown))
+    before = _stage_count("parse")
+
+    reply = client.call(URL, SCENARIO, "prompt")
+
+    assert reply.response["recommendations"][0]["action"] == "reroute"
+    assert _stage_count("parse") == before + 1
+
+
+def test_launcher_records_the_white_agent_call_stage():
+    launcher = CTAELauncher(str(DATA_DIR), use_cache=False)
+    launcher.initialize()
+    before = _stage_count("white_agent_call")
+
+    launcher.evaluate_cell("strong_analyst", "scenario_01")
+
+    assert _stage_count("white_agent_call") == before + 1
+
+
+@pytest.mark.parametrize("mode", ["sync", "async"])
+def test_overloaded_agent_is_retried(mode):
+    statuses = iter([503, 200])
+
+    def handler(request):
+        status = next(statuses)
+        return httpx.Response(status, json=REPLY if status == 200 else {"error": "busy"})
+
+    reply = _call(mode, handler, backoff_seconds=0.01)
+
+    assert reply.timing.attempts == 2
+    assert reply.response["risk_assessment"][0]["risk_type"] == "delay"
+
+
+@pytest.mark.parametrize("mode", ["sync", "async"])
+def test_client_error_is_not_retried(mode):
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(404, json={"error": "no such route"})
+
+    with pytest.raises(WhiteAgentError, match="HTTP 404") as raised:
+        _call(mode, handler, backoff_seconds=0.01)
+
+    assert len(requests) == 1
+    assert raised.value.timing.attempts == 1
+
+
+def test_slow_reply_times_out_at_the_time_limit():
+    def trickle():
+        # Whitespace before the JSON: the parser keeps waiting for the object
+        for _ in range(50):
+            time.sleep(0.05)
+            yield b" "
+
+    started = time.monotonic()
+    with pytest.raises(WhiteAgentTimeout) as raised:
+        _call("sync", lambda request: httpx.Response(200, content=trickle()),
+              scenario={**SCENARIO, "time_limit": 0.3}, backoff_seconds=0.01)
+
+    assert time.monotonic() - started < 1.0
+    assert raised.value.timing.total_seconds >= 0.3
+
+
+def test_async_slow_reply_times_out_at_the_time_limit():
+    async def handler(request):
+        await asyncio.sleep(5)
+        return httpx.Response(200, json=REPLY)
+
+    started = time.monotonic()
+    with pytest.raises(WhiteAgentTimeout) as raised:
+        _call("async", handler, scenario={**SCENARIO, "time_limit": 0.3})
+
+    assert time.monotonic() - started < 1.0
+    assert raised.value.timing.attempts == 1
+
+
+@pytest.mark.parametrize("mode", ["sync", "async"])
+def test_oversized_reply_is_rejected(mode):
+    padded = json.dumps({"notes": "x" * 4096, **REPLY})
+
+    with pytest.raises(WhiteAgentError, match="exceeded 1024 bytes") as raised:
+        _call(mode, lambda request: httpx.Response(200, text=padded), max_response_bytes=1024)
+
+    assert not isinstance(raised.value, WhiteAgentTimeout)
+    assert raised.value.timing.attempts == 1